@@ -1,43 +1,43 @@
 import streamlit as st
 import pandas as pd
-import io
 import traceback
 import logging
 import sys
 import os
 from streamlit import runtime
 import gc
-from huggingface_hub import hf_hub_download
-from src.pages.comparar_cursos import main as comparar_cursos_main
+from src.utils.estado import conservar_estado_widgets
+from src.utils.registro import configurar_logging
+from src.utils.tiempos import iniciar_rerun, medir_seccion
+from src.utils.alumnos import FORMATOS_DESCARGA, leer_alumnos, anios_fin_disponibles, calcular_filtros, exportar_datos
+from src.utils.alumnos import filas_filtradas, seleccionar_filas
 from datetime import datetime, date
 
-# Configurar logging para mostrar en la consola
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('app_log.txt')
-    ]
-)
-
 logger = logging.getLogger(__name__)
 
-# Configuración de página
-# IMPORTANTE: st.set_page_config() debe ser la primera llamada a un comando de Streamlit.
-# Solo debe aparecer una vez en tu aplicación, idealmente en el script principal.
-try:
-    st.set_page_config(
-        page_title="CBA ME CAPACITA",
-        page_icon="🎓",
-        layout="wide",
-        initial_sidebar_state="expanded"
-    )
-except Exception as e:
-    logger.error(f"Error en configuración de página: {e}")
-
-# Aplicar estilos personalizados para mejorar la apariencia
-st.markdown("""
+# Si está definida, se lee este parquet local en lugar de descargarlo de Hugging Face
+# (desarrollo y pruebas de carga, ver benchmarks/carga_sesiones.py)
+VARIABLE_PARQUET_LOCAL = "CBAMECAPACITA_PARQUET"
+
+# Vistas de la app: en cada rerun solo se ejecuta la elegida
+VISTAS = ["📊 Dashboard Principal", "🔄 Comparación de Cursos"]
+
+# Widgets del dashboard cuyo valor se conserva al pasar a la comparación y volver
+CLAVES_ESTADO_DASHBOARD = ["filtro_curso", "filtro_sector", "filtro_institucion", "filtro_cuil", "filtro_anio_fin",
+                           "filas_por_pagina", "formato_descarga"]
+
+# La vista de comparación (SQLAlchemy, PyMySQL, pyarrow, scikit-learn) se importa recién la primera
+# vez que se abre, así el dashboard se dibuja sin esperar esas dependencias
+MODULO_COMPARACION = "src.pages.comparar_cursos"
+
+
+def claves_estado_comparacion() -> list:
+    # Si el proceso todavía no importó la vista, ninguna sesión la abrió y no hay estado que conservar
+    modulo = sys.modules.get(MODULO_COMPARACION)
+    return modulo.CLAVES_ESTADO_WIDGETS if modulo else []
+
+# Estilos personalizados para mejorar la apariencia (se aplican en main)
+ESTILOS = """
 <style>
     :root {
         --cordoba-azul: #004A93;
@@ -163,7 +163,7 @@ st.markdown("""
         border-radius: 6px;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
 # Verificar variables de entorno para Hugging Face
 def verificar_configuracion():
@@ -176,7 +176,9 @@ def verificar_configuracion():
         st.error("Error al cargar la configuración. Por favor, verifica las variables de entorno.")
         return None
 
-@st.cache_data(ttl=3600)  # Cache por 1 hora
+# Cache por 1 hora. cache_resource comparte el mismo DataFrame entre reruns y sesiones; cache_data
+# devolvía una copia deserializada en cada rerun. Nadie lo modifica: los filtros usan posiciones de filas
+@st.cache_resource(ttl=3600)
 def cargar_datos_huggingface(hf_token) -> pd.DataFrame:
     try:
         # Configuración para Hugging Face
@@ -184,52 +186,23 @@ def cargar_datos_huggingface(hf_token) -> pd.DataFrame:
         
         # Mostrar mensaje de carga
         with st.spinner("Cargando datos..."):
-            # Descargamos el archivo desde Hugging Face
-            logger.info(f"Descargando: {REPO_ID}")
-            file_path = hf_hub_download(
-                REPO_ID, 
-                filename="ALUMNOS_X_LOCALIDAD.parquet", 
-                token=hf_token, 
-                repo_type='dataset'
-            )
+            file_path = os.environ.get(VARIABLE_PARQUET_LOCAL)
+            if file_path:
+                logger.warning(f"Usando el parquet indicado en {VARIABLE_PARQUET_LOCAL} en lugar del de Hugging Face: {file_path}")
+            else:
+                # Descargamos el archivo desde Hugging Face (huggingface_hub se importa solo si hace falta)
+                from huggingface_hub import hf_hub_download
+                logger.info(f"Descargando: {REPO_ID}")
+                file_path = hf_hub_download(
+                    REPO_ID, 
+                    filename="ALUMNOS_X_LOCALIDAD.parquet", 
+                    token=hf_token, 
+                    repo_type='dataset'
+                )
             
             try:
-                # Leer el Parquet con optimizaciones
-                df = pd.read_parquet(
-                    file_path,
-                    engine='pyarrow',
-                    columns=[
-                        'N_CURSO',
-                        'N_SECTOR',
-                        'N_INSTITUCION',
-                        'CUIL',
-                        'NOMBRE_ALUMNO',
-                        'NRO_DOCUMENTO',
-                        'FEC_NACIMIENTO',
-                        'N_TIPO_SEXO',
-                        'N_LOCALIDAD',
-                        'BARRIO',
-                        'ASISTENCIA',
-                        'FEC_INICIO',
-                        'FEC_FIN',
-                        'N_TIPO',
-                        'NRO_EXPEDIENTE',
-                        'NRO_RESOLUCION',
-                        'CANTIDAD_HS',
-                        'EMAIL',
-                        'NRO_TELEFONO'
-                    ]
-                )
-                
-                # Renombrar algunas columnas para mejor legibilidad
-                df = df.rename(columns={
-                    'NOMBRE_ALUMNO': 'NOMBRE',
-                    'NRO_DOCUMENTO': 'DNI',
-                    'FEC_NACIMIENTO': 'FECHA_NAC',
-                    'N_TIPO_SEXO': 'SEXO',
-                    'FEC_INICIO': 'INICIO',
-                    'FEC_FIN': 'FIN'
-                })
+                # Leer el Parquet con las columnas del dashboard ya renombradas
+                df = leer_alumnos(file_path)
             
             except Exception as e:
                 st.error(f"Error al leer el archivo Parquet: {str(e)}")
@@ -248,52 +221,33 @@ def cargar_datos_huggingface(hf_token) -> pd.DataFrame:
             st.error(traceback.format_exc())
         return None
 
+@medir_seccion("app.crear_filtros_predictivos")
 def crear_filtros_predictivos(df: pd.DataFrame):
     st.markdown("<div class='filter-container'>", unsafe_allow_html=True)
     st.subheader("🔍 Filtros de búsqueda")
     
-    filtros = {}
     col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
         st.markdown("<h3 class='subheader'>📚 Cursos</h3>", unsafe_allow_html=True)
-        curso = st.text_input("Escribe el nombre del curso", placeholder="Ej: Programación")
-        filtros['N_CURSO'] = (
-            df[df['N_CURSO'].str.contains(curso, case=False, na=False)]['N_CURSO'].unique()
-            if curso else df['N_CURSO'].unique()
-        )
+        curso = st.text_input("Escribe el nombre del curso", placeholder="Ej: Programación", key="filtro_curso")
 
     with col2:
         st.markdown("<h3 class='subheader'>🏢 Sectores</h3>", unsafe_allow_html=True)
-        sector = st.text_input("Escribe el nombre del sector", placeholder="Ej: Tecnología")
-        filtros['N_SECTOR'] = (
-            df[df['N_SECTOR'].str.contains(sector, case=False, na=False)]['N_SECTOR'].unique()
-            if sector else df['N_SECTOR'].unique()
-        )
+        sector = st.text_input("Escribe el nombre del sector", placeholder="Ej: Tecnología", key="filtro_sector")
 
     with col3:
         st.markdown("<h3 class='subheader'>🏫 Instituciones</h3>", unsafe_allow_html=True)
-        institucion = st.text_input("Escribe el nombre de la institución", placeholder="Ej: Universidad")
-        filtros['N_INSTITUCION'] = (
-            df[df['N_INSTITUCION'].str.contains(institucion, case=False, na=False)]['N_INSTITUCION'].unique()
-            if institucion else df['N_INSTITUCION'].unique()
-        )
+        institucion = st.text_input("Escribe el nombre de la institución", placeholder="Ej: Universidad", key="filtro_institucion")
 
     with col4:
         st.markdown("<h3 class='subheader'>🔑 CUIL</h3>", unsafe_allow_html=True)
-        cuil = st.text_input("Escribe el CUIL", placeholder="Ej: 20123456789")
-        # Asegúrate de manejar la conversión a string antes de la búsqueda para CUIL
-        filtros['CUIL'] = (
-            df[df['CUIL'].astype(str).str.contains(cuil, case=False, na=False)]['CUIL'].unique()
-            if cuil else df['CUIL'].unique()
-        )
+        cuil = st.text_input("Escribe el CUIL", placeholder="Ej: 20123456789", key="filtro_cuil")
 
     with col5: # Nueva columna para el filtro de año
         st.markdown("<h3 class='subheader'>🗓️ Año de Fin</h3>", unsafe_allow_html=True)
         
-        # Asegúrate de que 'FIN' sea de tipo datetime y extrae los años
-        df['FIN'] = pd.to_datetime(df['FIN'], errors='coerce')
-        # Filtra los NaT antes de obtener los años únicos
-        available_years = sorted(df['FIN'].dropna().dt.year.unique(), reverse=True)
+        # Años de 'FIN' sin NaT (sin modificar el DataFrame en caché)
+        available_years = anios_fin_disponibles(df)
         
         if not available_years:
             st.warning("No hay años disponibles para filtrar.")
@@ -304,62 +258,36 @@ def crear_filtros_predictivos(df: pd.DataFrame):
             selected_year_str = st.selectbox(
                 "Selecciona un año:",
                 options=years_options,
-                index=0 # Por defecto "Todos"
+                index=0, # Por defecto "Todos"
+                key="filtro_anio_fin"
             )
             selected_year = int(selected_year_str) if selected_year_str != 'Todos' else None
         
-        # ALMACENAR EL AÑO SELECCIONADO DIRECTAMENTE
-        filtros['anio_fin'] = selected_year 
-
     st.markdown("</div>", unsafe_allow_html=True)
-    return filtros
-
-def aplicar_filtros(df: pd.DataFrame, filtros: dict) -> pd.DataFrame:
-    df_filtrado = df.copy()
+    return calcular_filtros(df, curso, sector, institucion, cuil, selected_year)
 
-    # --- Aplicar el filtro de año de fin primero y de forma explícita ---
-    # Asegurarse de que la columna 'FIN' sea datetime para poder extraer el año
-    df_filtrado['FIN'] = pd.to_datetime(df_filtrado['FIN'], errors='coerce')
-
-    if 'anio_fin' in filtros and filtros['anio_fin'] is not None:
-        selected_year = filtros['anio_fin']
-        # Filtra por el año de la columna 'FIN', ignorando NaT
-        df_filtrado = df_filtrado[df_filtrado['FIN'].dt.year == selected_year]
-    
-    # --- Aplicar los demás filtros (texto, CUIL) ---
-    for col, vals in filtros.items():
-        # Ignorar 'anio_fin' ya que lo manejamos arriba y no es una columna de df
-        if col == 'anio_fin':
-            continue 
-
-        # Asegurarse de que vals no sea None o vacío
-        if vals is not None and len(vals) > 0:
-            if col == 'CUIL':
-                # Convertir a string para la comparación si CUIL puede ser numérico en df
-                df_filtrado = df_filtrado[df_filtrado[col].astype(str).isin(vals.astype(str))]
-            else:
-                # Asegurarse de que la columna exista en el DataFrame antes de filtrar
-                if col in df_filtrado.columns:
-                    df_filtrado = df_filtrado[df_filtrado[col].isin(vals)]
-                else:
-                    logger.warning(f"La columna '{col}' no se encuentra en el DataFrame filtrado. Ignorando este filtro.")
-        else:
-            # Si el filtro predictivo para una columna de texto no encontró coincidencias,
-            # el resultado debe ser un DataFrame vacío para esa columna.
-            if col in df_filtrado.columns and not df[col].empty:
-                 df_filtrado = df_filtrado[df_filtrado[col].isin([])]
+@medir_seccion("app.aplicar_filtros")
+def aplicar_filtros(df: pd.DataFrame, filtros: dict):
+    # Solo las posiciones de las filas: se materializan la página visible y lo que se exporta
+    return filas_filtradas(df, filtros)
 
-    return df_filtrado
+def get_page_data(df: pd.DataFrame, posiciones, inicio: int, fin: int) -> pd.DataFrame:
+    # Sin st.cache_data: el recorte es inmediato y la caché hasheaba el DataFrame filtrado en cada página
+    return df.iloc[posiciones[inicio:fin]]
 
-@st.cache_data
-def get_page_data(df: pd.DataFrame, inicio: int, fin: int) -> pd.DataFrame:
-    return df.iloc[inicio:fin]
+def ir_a_pagina(pagina: int):
+    # Callback de los controles de paginación: corre antes del rerun, así no hace falta st.rerun()
+    st.session_state.pagina_actual = pagina
 
-def mostrar_tabla_paginada(df: pd.DataFrame, filas_por_pagina: int = 10):
+# Fragmento: paginar vuelve a ejecutar solo la tabla, con las mismas filas filtradas de la última
+# ejecución completa; la carga, los filtros y la exportación no se repiten
+@st.fragment
+@medir_seccion("app.mostrar_tabla_paginada")
+def mostrar_tabla_paginada(df: pd.DataFrame, posiciones, filas_por_pagina: int = 10):
     st.markdown("<div class='filter-container'>", unsafe_allow_html=True)
     
     # Mostrar número total de registros
-    total_registros = len(df)
+    total_registros = len(posiciones)
     st.markdown(f"<div class='pagination-info'>Total de registros: <b>{total_registros}</b></div>", unsafe_allow_html=True)
     
     # Si no hay registros, mostrar mensaje y salir
@@ -379,7 +307,7 @@ def mostrar_tabla_paginada(df: pd.DataFrame, filas_por_pagina: int = 10):
         filas_opciones = [10, 25, 50, 100]
         # Asegurarse de que el valor inicial sea válido si filas_por_pagina no está en las opciones
         current_filas_idx = filas_opciones.index(filas_por_pagina) if filas_por_pagina in filas_opciones else 0
-        filas_por_pagina = st.selectbox("Registros por página:", filas_opciones, index=current_filas_idx)
+        filas_por_pagina = st.selectbox("Registros por página:", filas_opciones, index=current_filas_idx, key="filas_por_pagina")
         
     with col2:
         # Mostrar la tabla con los datos de la página actual
@@ -405,7 +333,7 @@ def mostrar_tabla_paginada(df: pd.DataFrame, filas_por_pagina: int = 10):
         st.markdown(f"<div class='pagination-info'>Página <b>{st.session_state.pagina_actual}</b> de <b>{total_paginas if total_paginas > 0 else 1}</b></div>", unsafe_allow_html=True)
     
     # Obtener datos para la página actual
-    datos_pagina = get_page_data(df, inicio, fin)
+    datos_pagina = get_page_data(df, posiciones, inicio, fin)
     
     # Mostrar la tabla con los datos de la página actual
     st.dataframe(datos_pagina, use_container_width=True)
@@ -415,41 +343,35 @@ def mostrar_tabla_paginada(df: pd.DataFrame, filas_por_pagina: int = 10):
     
     with col1:
         # Botón para ir a la primera página
-        if st.button("⏮️ Primera"):
-            st.session_state.pagina_actual = 1
-            st.rerun()
+        st.button("⏮️ Primera", on_click=ir_a_pagina, args=(1,))
     
     with col2:
         # Botón para ir a la página anterior
-        if st.button("◀️ Anterior") and st.session_state.pagina_actual > 1:
-            st.session_state.pagina_actual -= 1
-            st.rerun()
+        st.button("◀️ Anterior", on_click=ir_a_pagina, args=(max(st.session_state.pagina_actual - 1, 1),))
     
     with col3:
         # Selector de página (input numérico)
         # Asegurarse de que el valor inicial sea el actual y los límites sean correctos
-        nueva_pagina = st.number_input("Ir a página:", min_value=1, max_value=total_paginas if total_paginas > 0 else 1, value=st.session_state.pagina_actual, step=1)
-        if nueva_pagina != st.session_state.pagina_actual:
-            st.session_state.pagina_actual = nueva_pagina
-            st.rerun()
+        st.session_state.ir_a_pagina = st.session_state.pagina_actual
+        st.number_input("Ir a página:", min_value=1, max_value=total_paginas if total_paginas > 0 else 1, step=1, key="ir_a_pagina",
+                        on_change=lambda: ir_a_pagina(st.session_state.ir_a_pagina))
     
     with col4:
         # Botón para ir a la página siguiente
-        if st.button("▶️ Siguiente") and st.session_state.pagina_actual < total_paginas:
-            st.session_state.pagina_actual += 1
-            st.rerun()
+        st.button("▶️ Siguiente", on_click=ir_a_pagina, args=(min(st.session_state.pagina_actual + 1, total_paginas),))
     
     with col5:
         # Botón para ir a la última página
-        if st.button("⏭️ Última"):
-            st.session_state.pagina_actual = total_paginas
-            st.rerun()
+        st.button("⏭️ Última", on_click=ir_a_pagina, args=(total_paginas,))
     
     # Mostrar información detallada de paginación
     st.markdown(f"<div class='pagination-info'>Mostrando registros <b>{inicio + 1}</b> a <b>{fin}</b> de <b>{total_registros}</b></div>", unsafe_allow_html=True)
     st.markdown("</div>", unsafe_allow_html=True)
 
-def descargar_datos(df: pd.DataFrame):
+# Fragmento: cambiar el formato solo genera el archivo nuevo, sin recargar ni filtrar
+@st.fragment
+@medir_seccion("app.descargar_datos")
+def descargar_datos(df: pd.DataFrame, posiciones):
     st.markdown("<div class='filter-container'>", unsafe_allow_html=True)
     st.subheader("📥 Descargar Datos")
     
@@ -457,36 +379,32 @@ def descargar_datos(df: pd.DataFrame):
     
     with col1:
         # Opciones de formato
-        formato = st.selectbox("Formato de descarga:", ["CSV", "Excel", "JSON"])
+        formato = st.selectbox("Formato de descarga:", FORMATOS_DESCARGA, key="formato_descarga")
     
     with col2:
+        # Las filas filtradas se materializan recién acá, para generar el archivo
+        df = seleccionar_filas(df, posiciones)
         # Botón de descarga. El botón debe ser un st.download_button directamente si se genera el archivo.
         if formato == "CSV":
-            csv = df.to_csv(index=False).encode('utf-8')
             st.download_button(
                 label="Descargar CSV",
-                data=csv,
+                data=exportar_datos(df, "CSV"),
                 file_name="datos_filtrados.csv",
                 mime="text/csv",
                 key="download_csv_button" # Añadir una key única
             )
         elif formato == "Excel":
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df.to_excel(writer, index=False, sheet_name='Datos')
-            excel_data = output.getvalue()
             st.download_button(
                 label="Descargar Excel",
-                data=excel_data,
+                data=exportar_datos(df, "Excel"),
                 file_name="datos_filtrados.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                 key="download_excel_button" # Añadir una key única
             )
         elif formato == "JSON":
-            json_str = df.to_json(orient='records')
             st.download_button(
                 label="Descargar JSON",
-                data=json_str,
+                data=exportar_datos(df, "JSON"),
                 file_name="datos_filtrados.json",
                 mime="application/json",
                 key="download_json_button" # Añadir una key única
@@ -494,14 +412,39 @@ def descargar_datos(df: pd.DataFrame):
     st.markdown("</div>", unsafe_allow_html=True)
 
 def main():
+    # Importar app.py no tiene efectos: el logging, las opciones de pandas y la página se configuran al ejecutarla
+    # Logging en la consola y en app_log.txt (rotado, escrito en segundo plano; ver src/utils/registro.py
+    # para el formato JSON y las variables de entorno). Solo la primera llamada del proceso lo configura
+    configurar_logging('app_log.txt')
+
+    # Copy-on-Write: las selecciones de columnas y filas comparten memoria con el DataFrame en caché
+    # hasta que algo las modifica, en lugar de copiarse en cada rerun
+    pd.set_option("mode.copy_on_write", True)
+
+    # Configuración de página
+    # IMPORTANTE: st.set_page_config() debe ser la primera llamada a un comando de Streamlit.
+    try:
+        st.set_page_config(
+            page_title="CBA ME CAPACITA",
+            page_icon="🎓",
+            layout="wide",
+            initial_sidebar_state="expanded"
+        )
+    except Exception as e:
+        logger.error(f"Error en configuración de página: {e}")
+    st.markdown(ESTILOS, unsafe_allow_html=True)
+
+    iniciar_rerun()
     try:
         # Título principal con estilo mejorado
         st.markdown("<h1>🎓 CBA ME CAPACITA - Dashboard de Alumnos</h1>", unsafe_allow_html=True)
         
-        # Crear pestañas para la navegación
-        tab1, tab2 = st.tabs(["📊 Dashboard Principal", "🔄 Comparación de Cursos"])
+        # Selector de vista. Con st.tabs se ejecutaban las dos vistas en cada rerun aunque se viera una
+        # sola; ahora solo corre la elegida y el estado de los widgets de la otra se conserva
+        conservar_estado_widgets(CLAVES_ESTADO_DASHBOARD + claves_estado_comparacion())
+        vista = st.radio("Vista", VISTAS, horizontal=True, key="vista_activa", label_visibility="collapsed")
         
-        with tab1:
+        if vista == VISTAS[0]:
             # Información del dashboard
             st.markdown("""
             <div style="background-color: #e9f5ff; padding: 1rem; border-radius: 10px; margin-bottom: 2rem;">
@@ -515,8 +458,9 @@ def main():
             if not hf_token:
                 st.stop()
 
-            # Cargar datos desde Hugging Face
-            df = cargar_datos_huggingface(hf_token)
+            # Cargar datos desde Hugging Face (medido por fuera de la caché: incluye los aciertos)
+            with medir_seccion("app.cargar_datos_huggingface"):
+                df = cargar_datos_huggingface(hf_token)
             
             # Verificar si se cargaron los datos correctamente
             if df is None:
@@ -528,17 +472,19 @@ def main():
             filtros = crear_filtros_predictivos(df)
 
             # Aplicar filtros
-            df_filtrado = aplicar_filtros(df, filtros)
+            filas = aplicar_filtros(df, filtros)
 
             # Mostrar tabla paginada
-            mostrar_tabla_paginada(df_filtrado)
+            mostrar_tabla_paginada(df, filas)
 
             # Descargar datos filtrados
-            descargar_datos(df_filtrado)
+            descargar_datos(df, filas)
 
-        with tab2:
+        else:
             # Asegúrate de que comparar_cursos_main no llame a st.set_page_config()
-            comparar_cursos_main()
+            with medir_seccion("comparar_cursos"):
+                from src.pages.comparar_cursos import main as comparar_cursos_main
+                comparar_cursos_main()
         
         
         # Pie de página
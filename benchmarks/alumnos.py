@@ -0,0 +1,159 @@
+"""Benchmarks del dashboard de alumnos (app.py) con datos sintéticos.
+
+Genera datos con la forma de ALUMNOS_X_LOCALIDAD.parquet (cardinalidades parecidas a las
+reales: miles de cursos, cientos de instituciones y localidades, ~0.6 CUIL distintos por
+fila) a partir de una semilla, y mide las funciones de src/utils/alumnos.py que usa la app:
+lectura del parquet, cálculo de filtros, aplicación de filtros, paginación y cada formato de
+descarga, más el trabajo de un rerun del dashboard (filtrar y armar la página visible). Cada
+caso registra también el pico de memoria que reserva (con Copy-on-Write activado, como en la
+app). No hace falta un servidor de Streamlit.
+
+`ejecutar` guarda los resultados en JSON; `comparar` contrasta dos JSON y termina con código
+1 si algún caso empeoró más que el umbral, para usarlo como control antes de un merge.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.alumnos ejecutar --filas 100000 1000000 --guardar base.json
+    python -m benchmarks.alumnos ejecutar --filas 100000 1000000 --guardar nuevo.json
+    python -m benchmarks.alumnos comparar base.json nuevo.json --umbral 0.2
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.comun import agregar_comando_comparar, guardar_resultados, medir
+from src.utils.alumnos import (COLUMNAS_ALUMNOS, FORMATOS_DESCARGA, aplicar_filtros, calcular_filtros,
+                               exportar_datos, filas_filtradas, leer_alumnos)
+
+PALABRAS_CURSO = ['Programación', 'Soldadura', 'Electricidad', 'Cocina', 'Panadería', 'Atención al Cliente',
+                  'Mecánica Automotor', 'Gestión Administrativa', 'Ventas', 'Carpintería', 'Enfermería',
+                  'Turismo', 'Peluquería', 'Marketing Digital', 'Excel', 'Inglés', 'Construcción en Seco']
+NIVELES = ['Inicial', 'Básica', 'Intermedia', 'Avanzada']
+SECTORES = ['Tecnología', 'Gastronomía', 'Salud', 'Construcción', 'Turismo', 'Industria', 'Comercio',
+            'Servicios', 'Agropecuario', 'Administración', 'Automotor', 'Textil', 'Energía', 'Educación',
+            'Estética', 'Logística', 'Seguridad', 'Cultura', 'Deportes', 'Medio Ambiente', 'Oficios',
+            'Idiomas', 'Finanzas', 'Comunicación', 'Economía Social']
+CURSOS, INSTITUCIONES, LOCALIDADES, BARRIOS, NOMBRES = 3000, 600, 400, 2000, 5000
+# Límite de filas de una hoja de Excel (incluida la fila de encabezados)
+FILAS_MAXIMAS_EXCEL = 1_048_576
+
+
+def generar_alumnos(filas: int, semilla: int = 42) -> pd.DataFrame:
+    """DataFrame con las columnas originales del parquet (antes de renombrar)"""
+    rng = np.random.default_rng(semilla)
+
+    def elegir(opciones, pesos=None):
+        opciones = np.asarray(opciones, dtype=object)
+        return opciones[rng.choice(len(opciones), filas, p=pesos)]
+
+    # Pocos cursos concentran muchas inscripciones, como en los datos reales
+    pesos_cursos = 1 / np.arange(1, CURSOS + 1) ** 0.8
+    cursos = [f"{PALABRAS_CURSO[i % len(PALABRAS_CURSO)]} {NIVELES[i % len(NIVELES)]} {i:04d}" for i in range(CURSOS)]
+    indice_curso = rng.choice(CURSOS, filas, p=pesos_cursos / pesos_cursos.sum())
+    # CUIL repartidos entre 20-... y 27-..., con alumnos que se repiten en varios cursos
+    cuils_distintos = max(1, int(filas * 0.6))
+    cuils = 20_100_000_000 + rng.integers(0, cuils_distintos, filas, dtype=np.int64) * (7_800_000_000 // cuils_distintos)
+    inicio = pd.Timestamp('2019-01-01') + pd.to_timedelta(rng.integers(0, 6 * 365, filas), 'D')
+    fin = inicio + pd.to_timedelta(rng.integers(15, 180, filas), 'D')
+    # Algunos cursos todavía no tienen fecha de fin
+    fin = fin.where(rng.random(filas) > 0.03)
+
+    return pd.DataFrame({
+        'N_CURSO': np.asarray(cursos, dtype=object)[indice_curso],
+        'N_SECTOR': np.asarray(SECTORES, dtype=object)[indice_curso % len(SECTORES)],
+        'N_INSTITUCION': elegir([f"Institución de Formación {i:03d}" for i in range(INSTITUCIONES)]),
+        'CUIL': cuils,
+        'NOMBRE_ALUMNO': elegir([f"APELLIDO{i % 900:03d}, NOMBRE{i:04d}" for i in range(NOMBRES)]),
+        'NRO_DOCUMENTO': (cuils // 10) % 100_000_000,
+        'FEC_NACIMIENTO': pd.Timestamp('1960-01-01') + pd.to_timedelta(rng.integers(0, 45 * 365, filas), 'D'),
+        'N_TIPO_SEXO': elegir(['MASCULINO', 'FEMENINO', 'X'], [0.48, 0.5, 0.02]),
+        'N_LOCALIDAD': elegir([f"Localidad {i:03d}" for i in range(LOCALIDADES)]),
+        'BARRIO': elegir([f"Barrio {i:04d}" for i in range(BARRIOS)]),
+        'ASISTENCIA': elegir(['SI', 'NO'], [0.85, 0.15]),
+        'FEC_INICIO': inicio,
+        'FEC_FIN': fin,
+        'N_TIPO': elegir(['PRESENCIAL', 'VIRTUAL', 'SEMIPRESENCIAL']),
+        'NRO_EXPEDIENTE': elegir([f"0{i:07d}/2024" for i in range(CURSOS)]),
+        'NRO_RESOLUCION': elegir([f"RES-{i:04d}" for i in range(CURSOS)]),
+        'CANTIDAD_HS': rng.choice([20, 40, 60, 80, 120], filas),
+        'EMAIL': pd.Series(cuils).astype(str).to_numpy(dtype=object) + '@correo.com',
+        'NRO_TELEFONO': elegir([f"351{i:07d}" for i in range(20_000)])
+    })[COLUMNAS_ALUMNOS]
+
+
+def rerun_dashboard(df: pd.DataFrame, filtros: dict, filas_por_pagina: int = 10) -> pd.DataFrame:
+    """Lo que hace app.py en cada rerun con los datos ya cargados: posiciones filtradas y página visible"""
+    posiciones = filas_filtradas(df, filtros)
+    pagina_media = len(posiciones) // filas_por_pagina // 2 * filas_por_pagina
+    return df.iloc[posiciones[pagina_media:pagina_media + filas_por_pagina]]
+
+
+def casos(df: pd.DataFrame, ruta_parquet: str):
+    """(nombre, función) de cada caso a medir sobre los datos ya leídos"""
+    filtros_vacios = calcular_filtros(df)
+    filtros_texto = calcular_filtros(df, curso="programación", institucion="01", anio_fin=2023)
+    filtrado = aplicar_filtros(df, filtros_vacios)
+    pagina_media = len(filtrado) // 2
+    yield 'carga_parquet', lambda: leer_alumnos(ruta_parquet)
+    yield 'calcular_filtros.vacios', lambda: calcular_filtros(df)
+    yield 'calcular_filtros.texto', lambda: calcular_filtros(df, curso="programación", sector="tec", institucion="01", cuil="2010")
+    yield 'aplicar_filtros.vacios', lambda: aplicar_filtros(df, filtros_vacios)
+    yield 'aplicar_filtros.texto', lambda: aplicar_filtros(df, filtros_texto)
+    yield 'rerun.vacios', lambda: rerun_dashboard(df, filtros_vacios)
+    yield 'rerun.texto', lambda: rerun_dashboard(df, filtros_texto)
+    yield 'paginacion', lambda: [filtrado.iloc[inicio:inicio + 100] for inicio in (0, pagina_media, len(filtrado) - 100)]
+    for formato in FORMATOS_DESCARGA:
+        if formato == "Excel" and len(filtrado) >= FILAS_MAXIMAS_EXCEL:
+            print(f"  descargar.{formato}: omitido, supera las {FILAS_MAXIMAS_EXCEL} filas de una hoja", file=sys.stderr)
+            continue
+        yield f'descargar.{formato}', lambda formato=formato: exportar_datos(filtrado, formato)
+
+
+def ejecutar(args):
+    # Igual que app.py: las selecciones y columnas derivadas no copian datos hasta que se modifican
+    pd.set_option("mode.copy_on_write", True)
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        for filas in args.filas:
+            print(f"{filas} filas: generando datos (semilla {args.semilla})...", file=sys.stderr)
+            ruta = os.path.join(directorio, f"alumnos_{filas}.parquet")
+            generar_alumnos(filas, args.semilla).to_parquet(ruta, index=False)
+            df = leer_alumnos(ruta)
+            resultados[str(filas)] = {}
+            for nombre, funcion in casos(df, ruta):
+                if args.casos and not any(nombre.startswith(c) for c in args.casos):
+                    continue
+                resultado = medir(funcion, args.repeticiones, args.presupuesto_s)
+                resultados[str(filas)][nombre] = resultado
+                print(f"{filas:>9} | {nombre:<26} {1000 * resultado['mediana_s']:>10.1f} ms (mín. {1000 * resultado['min_s']:.1f}) "
+                      f"{resultado['pico_mib']:>8.1f} MiB")
+            os.remove(ruta)
+
+    if args.guardar:
+        guardar_resultados(args.guardar, resultados, semilla=args.semilla)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    parser_ejecutar = subparsers.add_parser("ejecutar", help="Mide los casos y opcionalmente guarda un JSON")
+    parser_ejecutar.add_argument("--filas", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser_ejecutar.add_argument("--repeticiones", type=int, default=5)
+    parser_ejecutar.add_argument("--presupuesto_s", type=float, default=30, help="Tiempo máximo aproximado por caso")
+    parser_ejecutar.add_argument("--semilla", type=int, default=42)
+    parser_ejecutar.add_argument("--casos", nargs="+", help="Prefijos de los casos a medir (por defecto todos)")
+    parser_ejecutar.add_argument("--guardar", help="Archivo JSON donde guardar los resultados")
+    parser_ejecutar.set_defaults(funcion=ejecutar)
+
+    agregar_comando_comparar(subparsers)
+
+    args = parser.parse_args()
+    args.funcion(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Costo de buscar en IndiceNombres según el tamaño del catálogo.
+
+Genera catálogos sintéticos de nombres de cursos y mide el tiempo de construir el índice,
+el tiempo por búsqueda y la cantidad de opciones que se enviarían al navegador, que debe
+quedar acotada por RESULTADOS_POR_BUSQUEDA sin importar el tamaño del catálogo. Cada
+búsqueda se verifica contra un recorrido completo de los nombres.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.buscador --nombres 1000 10000 100000
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from src.utils.buscador import RESULTADOS_POR_BUSQUEDA, IndiceNombres, normalizar
+
+PALABRAS = ['Soldadura', 'Electricidad', 'Cocina', 'Panadería', 'Programación', 'Atención', 'Cliente', 'Mecánica',
+            'Automotor', 'Básica', 'Avanzada', 'Gestión', 'Ventas', 'Carpintería', 'Enfermería', 'Turismo', 'de', 'en', 'y']
+SECTORES = ['Gastronomía', 'Tecnología', 'Salud', 'Construcción', 'Turismo', 'Industria']
+BUSQUEDAS = ['sol', 'programacion bas', 'de', 'cocina y pan', 'ventas 12', 'xyz']
+
+
+def catalogo(cantidad: int, rng: random.Random):
+    nombres = [" ".join(rng.choice(PALABRAS) for _ in range(rng.randint(2, 6))) + f" {i}" for i in range(cantidad)]
+    return pd.Series(nombres), pd.Series([rng.choice(SECTORES) for _ in range(cantidad)])
+
+
+def coincide(nombre: str, palabras: list) -> bool:
+    """Misma regla que IndiceNombres: subcadena para 3+ letras, prefijo de palabra para 1-2"""
+    return all(p in nombre if len(p) >= 3 else any(t.startswith(p) for t in nombre.split()) for p in palabras)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nombres", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    print(f"{'nombres':>8} {'índice s':>9} | " + " ".join(f"{b[:12]:>14}" for b in BUSQUEDAS) + " | opciones máx.")
+    for cantidad in args.nombres:
+        nombres, sectores = catalogo(cantidad, rng)
+        inicio = time.perf_counter()
+        indice = IndiceNombres(nombres, sectores)
+        construccion = time.perf_counter() - inicio
+        normalizados = [normalizar(nombre) for nombre in indice.nombres]
+
+        tiempos, opciones = [], 0
+        for busqueda in BUSQUEDAS:
+            resultados, total, _ = indice.buscar(busqueda)
+            assert total == sum(coincide(n, normalizar(busqueda).split()) for n in normalizados), busqueda
+            opciones = max(opciones, len(resultados))
+            inicio = time.perf_counter()
+            for _ in range(args.repeticiones):
+                indice.buscar(busqueda)
+            tiempos.append(1000 * (time.perf_counter() - inicio) / args.repeticiones)
+        assert opciones <= RESULTADOS_POR_BUSQUEDA
+        print(f"{cantidad:>8} {construccion:>9.2f} | " + " ".join(f"{t:>11.2f} ms" for t in tiempos) + f" | {opciones:>13}")
+
+
+if __name__ == "__main__":
+    main()
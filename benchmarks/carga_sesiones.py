@@ -0,0 +1,346 @@
+"""Prueba de carga con sesiones concurrentes contra un servidor de Streamlit.
+
+Cada sesión es un cliente websocket sin interfaz que usa el mismo protocolo que el
+navegador (BackMsg/ForwardMsg de streamlit.proto): envía los valores de los widgets, espera
+el fin de cada rerun y mide su latencia. Las sesiones recorren un guion de operador
+(filtros, paginación, exportación y comparación de cursos) con pausas aleatorias entre pasos.
+Se prueban cantidades crecientes de sesiones simultáneas y mientras tanto se muestrean el RSS
+y la CPU del proceso del servidor. El resultado es una curva de capacidad: latencia
+p50/p95/p99 por cantidad de sesiones y la mayor cantidad que cumple el objetivo de p95, para
+dimensionar las réplicas.
+
+Por defecto levanta `streamlit run app.py` con datos sintéticos: un parquet generado con
+benchmarks.alumnos y una base local de src/utils/base_local.py. Con --url se apunta a un
+servidor que ya está corriendo (p. ej. una réplica de prueba), y con --pid se muestrea ese proceso.
+
+Requiere el paquete websockets (pip install websockets). El RSS y la CPU se leen de /proc (Linux).
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.carga_sesiones --sesiones 1 5 10 20 --duracion_s 60 --guardar carga.json
+    python -m benchmarks.carga_sesiones --url http://localhost:8501 --pid 1234 --sesiones 10 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from benchmarks.alumnos import generar_alumnos
+from src.utils.base_local import crear_base_local
+from src.utils.db import VARIABLE_URL_BASE
+
+# Igual que VARIABLE_PARQUET_LOCAL en app.py (no se importa app.py porque ejecuta la página)
+VARIABLE_PARQUET_LOCAL = "CBAMECAPACITA_PARQUET"
+PERCENTILES = (50, 95, 99)
+
+
+class SesionRemota:
+    """Una pestaña del navegador: los widgets del último rerun y los valores que eligió el operador"""
+
+    def __init__(self, url_ws: str, timeout_s: float):
+        self.url_ws = url_ws
+        self.timeout_s = timeout_s
+        self.widgets = {}     # (tipo, etiqueta) -> proto del widget en el último rerun
+        self.fragmentos = {}  # id del widget -> id del st.fragment que lo dibuja
+        self.valores = {}     # id del widget -> WidgetState con el valor elegido
+        self.excepciones = 0  # st.exception mostradas en el último rerun
+        self._ws = None
+
+    async def conectar(self) -> float:
+        import websockets
+
+        self._ws = await websockets.connect(self.url_ws, subprotocols=["streamlit"], max_size=None, open_timeout=self.timeout_s)
+        return await self.rerun()
+
+    async def cerrar(self):
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def rerun(self, disparos=(), fragmento: str = "") -> float:
+        """Envía los valores elegidos más los `disparos` (botones) y espera el fin del rerun; devuelve los segundos.
+
+        Con `fragmento`, como el navegador, pide volver a ejecutar solo ese st.fragment.
+        """
+        mensaje = BackMsg()
+        mensaje.rerun_script.widget_states.widgets.extend(list(self.valores.values()) + list(disparos))
+        if fragmento:
+            mensaje.rerun_script.fragment_id = fragmento
+        inicio = time.perf_counter()
+        await self._ws.send(mensaje.SerializeToString())
+
+        widgets, fragmentos, excepciones = {}, {}, 0
+        while True:
+            respuesta = ForwardMsg()
+            respuesta.ParseFromString(await asyncio.wait_for(self._ws.recv(), self.timeout_s))
+            tipo = respuesta.WhichOneof("type")
+            if tipo == "delta" and respuesta.delta.WhichOneof("type") == "new_element":
+                elemento = respuesta.delta.new_element
+                tipo_elemento = elemento.WhichOneof("type")
+                if tipo_elemento == "exception":
+                    excepciones += 1
+                    continue
+                proto = getattr(elemento, tipo_elemento)
+                if getattr(proto, "id", "") and hasattr(proto, "label"):
+                    widgets[(tipo_elemento, proto.label)] = proto
+                    if respuesta.delta.fragment_id:
+                        fragmentos[proto.id] = respuesta.delta.fragment_id
+            # Un st.rerun() del script termina la ejecución antes de tiempo y arranca otra
+            elif tipo == "script_finished" and respuesta.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        segundos = time.perf_counter() - inicio
+
+        if fragmento:
+            # Solo se redibujó el fragmento: el resto de la página sigue igual
+            widgets = {clave: proto for clave, proto in self.widgets.items()
+                       if self.fragmentos.get(proto.id) != fragmento} | widgets
+            fragmentos = {id_widget: id_fragmento for id_widget, id_fragmento in self.fragmentos.items()
+                          if id_fragmento != fragmento} | fragmentos
+        self.widgets, self.fragmentos = widgets, fragmentos
+        ids = {proto.id for proto in widgets.values()}
+        self.valores = {id_widget: estado for id_widget, estado in self.valores.items() if id_widget in ids}
+        self.excepciones = excepciones
+        return segundos
+
+    def _widget(self, tipo: str, etiqueta: str):
+        try:
+            return self.widgets[(tipo, etiqueta)]
+        except KeyError:
+            raise KeyError(f"No hay un {tipo} '{etiqueta}' en la página") from None
+
+    async def escribir(self, etiqueta: str, texto: str) -> float:
+        proto = self._widget("text_input", etiqueta)
+        self.valores[proto.id] = WidgetState(id=proto.id, string_value=texto)
+        return await self.rerun(fragmento=self.fragmentos.get(proto.id, ""))
+
+    async def elegir(self, etiqueta: str, opcion, tipo: str = "selectbox") -> float:
+        """Elige una opción de un selectbox (o de un radio, con `tipo="radio"`)"""
+        proto = self._widget(tipo, etiqueta)
+        self.valores[proto.id] = WidgetState(id=proto.id, string_value=str(opcion))
+        return await self.rerun(fragmento=self.fragmentos.get(proto.id, ""))
+
+    async def pulsar(self, etiqueta: str) -> float:
+        proto = self._widget("button", etiqueta)
+        return await self.rerun([WidgetState(id=proto.id, trigger_value=True)], self.fragmentos.get(proto.id, ""))
+
+
+# Guion de un operador: cada paso cambia un widget y provoca un rerun
+GUION = [
+    ('filtrar_curso', lambda s: s.escribir("Escribe el nombre del curso", "Programación")),
+    ('filtrar_institucion', lambda s: s.escribir("Escribe el nombre de la institución", "01")),
+    ('pagina_siguiente', lambda s: s.pulsar("▶️ Siguiente")),
+    ('filas_por_pagina', lambda s: s.elegir("Registros por página:", 50)),
+    ('exportar_excel', lambda s: s.elegir("Formato de descarga:", "Excel")),
+    ('exportar_json', lambda s: s.elegir("Formato de descarga:", "JSON")),
+    ('ir_a_comparacion', lambda s: s.elegir("Vista", "🔄 Comparación de Cursos", tipo="radio")),
+    ('ver_equivalencias', lambda s: s.pulsar("📋 Ver Equivalencias")),
+    ('buscar_equivalencia', lambda s: s.escribir("🔍 Buscar equivalencia", "Programación")),
+    ('volver_al_dashboard', lambda s: s.elegir("Vista", "📊 Dashboard Principal", tipo="radio")),
+    ('limpiar_curso', lambda s: s.escribir("Escribe el nombre del curso", "")),
+    ('limpiar_institucion', lambda s: s.escribir("Escribe el nombre de la institución", "")),
+    ('exportar_csv', lambda s: s.elegir("Formato de descarga:", "CSV")),
+]
+
+
+async def operador(url_ws: str, args, fin: float, eventos: list, rng: random.Random):
+    """Una sesión que repite el guion hasta `fin`; agrega (paso, segundos o None si falló, excepciones) a `eventos`"""
+    await asyncio.sleep(rng.uniform(0, args.pausa_s))
+    sesion = SesionRemota(url_ws, args.timeout_s)
+    try:
+        eventos.append(('abrir', await sesion.conectar(), sesion.excepciones))
+        paso = 0
+        while time.monotonic() < fin:
+            await asyncio.sleep(rng.expovariate(1 / args.pausa_s))
+            nombre, accion = GUION[paso % len(GUION)]
+            paso += 1
+            try:
+                eventos.append((nombre, await accion(sesion), sesion.excepciones))
+            except (KeyError, asyncio.TimeoutError) as e:
+                print(f"  {nombre}: {type(e).__name__} {e}", file=sys.stderr)
+                eventos.append((nombre, None, 0))
+    except Exception as e:
+        print(f"  sesión: {type(e).__name__} {e}", file=sys.stderr)
+        eventos.append(('abrir', None, 0))
+    finally:
+        await sesion.cerrar()
+
+
+def leer_proceso(pid: int):
+    """(segundos de CPU acumulados, RSS en MiB) del proceso, desde /proc"""
+    with open(f"/proc/{pid}/stat") as archivo:
+        campos = archivo.read().rsplit(")", 1)[1].split()
+    cpu = (int(campos[11]) + int(campos[12])) / os.sysconf("SC_CLK_TCK")
+    with open(f"/proc/{pid}/status") as archivo:
+        rss_kib = next(int(linea.split()[1]) for linea in archivo if linea.startswith("VmRSS:"))
+    return cpu, rss_kib / 1024
+
+
+async def muestrear(pid: int, intervalo_s: float, muestras: list, nivel: dict):
+    """Agrega a `muestras` el RSS y el % de CPU del servidor cada `intervalo_s`, con las sesiones activas"""
+    inicio = time.monotonic()
+    cpu_anterior, _ = leer_proceso(pid)
+    anterior = inicio
+    while True:
+        await asyncio.sleep(intervalo_s)
+        ahora = time.monotonic()
+        cpu, rss = leer_proceso(pid)
+        muestras.append({'t_s': round(ahora - inicio, 2), 'sesiones': nivel['sesiones'], 'rss_mib': round(rss, 1),
+                         'cpu_pct': round(100 * (cpu - cpu_anterior) / (ahora - anterior), 1)})
+        cpu_anterior, anterior = cpu, ahora
+
+
+def resumir(sesiones: int, eventos: list, muestras: list, segundos: float) -> dict:
+    latencias = np.array([1000 * s for paso, s, _ in eventos if paso != 'abrir' and s is not None])
+    aperturas = np.array([1000 * s for paso, s, _ in eventos if paso == 'abrir' and s is not None])
+    de_nivel = [m for m in muestras if m['sesiones'] == sesiones]
+    resumen = {
+        'sesiones': sesiones,
+        'reruns': len(latencias),
+        'reruns_por_s': round(len(latencias) / segundos, 2),
+        **{f'p{p}_ms': round(float(v), 1) for p, v in zip(PERCENTILES, np.percentile(latencias, PERCENTILES) if len(latencias) else [np.nan] * 3)},
+        'max_ms': round(float(latencias.max()), 1) if len(latencias) else np.nan,
+        'abrir_p95_ms': round(float(np.percentile(aperturas, 95)), 1) if len(aperturas) else np.nan,
+        'errores': sum(s is None for _, s, _ in eventos),
+        'excepciones': sum(e for _, _, e in eventos),
+        'rss_max_mib': max((m['rss_mib'] for m in de_nivel), default=np.nan),
+        'cpu_promedio_pct': round(float(np.mean([m['cpu_pct'] for m in de_nivel])), 1) if de_nivel else np.nan,
+    }
+    por_paso = defaultdict(list)
+    for paso, s, _ in eventos:
+        if s is not None:
+            por_paso[paso].append(1000 * s)
+    resumen['p95_ms_por_paso'] = {paso: round(float(np.percentile(v, 95)), 1) for paso, v in sorted(por_paso.items())}
+    return resumen
+
+
+async def probar_niveles(url_ws: str, pid, args) -> tuple:
+    rng = random.Random(args.semilla)
+    muestras, nivel = [], {'sesiones': 0}
+    muestreo = asyncio.create_task(muestrear(pid, args.intervalo_s, muestras, nivel)) if pid else None
+    resultados = []
+    try:
+        for sesiones in args.sesiones:
+            nivel['sesiones'] = sesiones
+            eventos = []
+            inicio = time.monotonic()
+            await asyncio.gather(*(operador(url_ws, args, inicio + args.duracion_s, eventos, random.Random(rng.random()))
+                                   for _ in range(sesiones)))
+            resumen = resumir(sesiones, eventos, muestras, time.monotonic() - inicio)
+            resultados.append(resumen)
+            print(f"{sesiones:>8} | {resumen['reruns']:>6} {resumen['reruns_por_s']:>8} | "
+                  f"{resumen['p50_ms']:>8} {resumen['p95_ms']:>8} {resumen['p99_ms']:>8} {resumen['max_ms']:>8} | "
+                  f"{resumen['errores']:>7} {resumen['excepciones']:>5} | {resumen['rss_max_mib']:>9} {resumen['cpu_promedio_pct']:>7}")
+    finally:
+        if muestreo is not None:
+            muestreo.cancel()
+    return resultados, muestras
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def levantar_servidor(args, directorio: str):
+    """Levanta `streamlit run app.py` con datos sintéticos; devuelve (proceso, url)"""
+    print(f"Generando {args.filas} alumnos y la base local...", file=sys.stderr)
+    ruta_parquet = os.path.join(directorio, "ALUMNOS_X_LOCALIDAD.parquet")
+    generar_alumnos(args.filas, args.semilla).to_parquet(ruta_parquet, index=False)
+    ruta_base = os.path.join(directorio, "cba_local.db")
+    crear_base_local(ruta_base, semilla=args.semilla)
+    ruta_secrets = os.path.join(directorio, "secrets.toml")
+    with open(ruta_secrets, "w", encoding="utf-8") as archivo:
+        # El token no se usa: el parquet es local
+        archivo.write('[HuggingFace]\nhuggingface_token = "local"\n')
+
+    puerto = puerto_libre()
+    entorno = dict(os.environ, **{VARIABLE_PARQUET_LOCAL: ruta_parquet, VARIABLE_URL_BASE: f"sqlite:///{ruta_base}"})
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", os.path.join(raiz, "app.py"),
+         "--server.headless", "true", "--server.port", str(puerto), "--browser.gatherUsageStats", "false",
+         "--server.fileWatcherType", "none", "--secrets.files", ruta_secrets],
+        # El log de la app (app_log.txt) queda en el directorio temporal
+        cwd=directorio, env=entorno, stdout=open(os.path.join(directorio, "servidor.log"), "w"), stderr=subprocess.STDOUT
+    )
+    url = f"http://127.0.0.1:{puerto}"
+    limite = time.monotonic() + 60
+    while True:
+        try:
+            with urllib.request.urlopen(f"{url}/_stcore/health", timeout=2):
+                return proceso, url
+        except OSError:
+            if proceso.poll() is not None or time.monotonic() > limite:
+                proceso.kill()
+                raise RuntimeError(f"El servidor no respondió; ver {directorio}/servidor.log")
+            time.sleep(0.5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sesiones", type=int, nargs="+", default=[1, 5, 10, 20], help="Sesiones simultáneas de cada nivel")
+    parser.add_argument("--duracion_s", type=float, default=60, help="Duración de cada nivel")
+    parser.add_argument("--pausa_s", type=float, default=2, help="Pausa media del operador entre pasos")
+    parser.add_argument("--objetivo_p95_ms", type=float, default=2000, help="Latencia p95 aceptable de un rerun")
+    parser.add_argument("--timeout_s", type=float, default=120, help="Tiempo máximo de un rerun antes de contarlo como error")
+    parser.add_argument("--intervalo_s", type=float, default=1, help="Intervalo de muestreo de RSS y CPU")
+    parser.add_argument("--filas", type=int, default=200_000, help="Alumnos sintéticos del servidor local")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--url", help="Servidor ya levantado (por defecto se levanta uno local)")
+    parser.add_argument("--pid", type=int, help="Proceso del servidor indicado en --url, para muestrear RSS y CPU")
+    parser.add_argument("--guardar", help="Archivo JSON con la curva de capacidad y las series de RSS y CPU")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        proceso = None
+        if args.url:
+            url, pid = args.url.rstrip("/"), args.pid
+        else:
+            proceso, url = levantar_servidor(args, directorio)
+            pid = proceso.pid
+        url_ws = url.replace("http", "ws", 1) + "/_stcore/stream"
+        print(f"{'sesiones':>8} | {'reruns':>6} {'por s':>8} | {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'máx ms':>8} | "
+              f"{'errores':>7} {'exc.':>5} | {'RSS MiB':>9} {'CPU %':>7}")
+        try:
+            resultados, muestras = asyncio.run(probar_niveles(url_ws, pid, args))
+        finally:
+            if proceso is not None:
+                proceso.terminate()
+                proceso.wait(timeout=30)
+
+    aceptables = [r['sesiones'] for r in resultados if r['p95_ms'] <= args.objetivo_p95_ms and r['errores'] == 0]
+    if aceptables:
+        print(f"\nCapacidad estimada por réplica: {max(aceptables)} sesiones simultáneas con p95 <= {args.objetivo_p95_ms:.0f} ms")
+    else:
+        print(f"\nNingún nivel cumplió p95 <= {args.objetivo_p95_ms:.0f} ms sin errores")
+    pasos = pd.DataFrame({r['sesiones']: r['p95_ms_por_paso'] for r in resultados})
+    print("\np95 por paso (ms) según sesiones simultáneas:")
+    print(pasos.to_string())
+
+    if args.guardar:
+        with open(args.guardar, 'w', encoding='utf-8') as archivo:
+            json.dump({
+                'fecha': pd.Timestamp.now().isoformat(timespec='seconds'),
+                'parametros': {k: v for k, v in vars(args).items() if k != 'guardar'},
+                'capacidad_sesiones': max(aceptables) if aceptables else 0,
+                'niveles': resultados,
+                'muestras': muestras
+            }, archivo, ensure_ascii=False, indent=2, default=float)
+        print(f"Resultados guardados en {args.guardar}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
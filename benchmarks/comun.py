@@ -0,0 +1,100 @@
+"""Medición, resultados en JSON y comparación de líneas base compartidos por los benchmarks."""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow
+import sqlalchemy
+
+
+def medir(funcion, repeticiones: int, presupuesto_s: float) -> dict:
+    """Mediana y mínimo en segundos de hasta `repeticiones` llamadas, después de una de calentamiento.
+
+    Los casos lentos (p. ej. Excel con muchas filas) hacen menos repeticiones para no pasarse
+    de `presupuesto_s`; la cantidad usada queda registrada en el resultado. Al final se hace una
+    llamada más para medir el pico de memoria: en total son hasta `repeticiones + 2` llamadas, a
+    tener en cuenta en los casos que consumen datos preparados de antemano.
+    """
+    inicio = time.perf_counter()
+    funcion()
+    calentamiento = time.perf_counter() - inicio
+    repeticiones = max(1, min(repeticiones, int(presupuesto_s / max(calentamiento, 1e-9))))
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return {'mediana_s': statistics.median(tiempos), 'min_s': min(tiempos), 'repeticiones': repeticiones,
+            'pico_mib': medir_memoria(funcion)}
+
+
+def medir_memoria(funcion) -> float:
+    """Pico de memoria en MiB que reserva una llamada (tracemalloc cuenta también los arreglos de numpy)"""
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico / 2 ** 20
+
+
+def guardar_resultados(ruta: str, resultados: dict, **datos):
+    """Guarda `resultados` ({escala: {caso: medición}}) junto con las versiones del entorno"""
+    salida = {
+        'fecha': pd.Timestamp.now().isoformat(timespec='seconds'),
+        **datos,
+        'entorno': {'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+                    'pyarrow': pyarrow.__version__, 'sqlalchemy': sqlalchemy.__version__,
+                    'plataforma': platform.platform(), 'cpus': os.cpu_count()},
+        'resultados': resultados
+    }
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(salida, archivo, ensure_ascii=False, indent=2)
+    print(f"Resultados guardados en {ruta}", file=sys.stderr)
+
+
+def comparar(args):
+    """Compara las medianas de dos JSON; termina con código 1 si algún caso empeoró más que el umbral"""
+    with open(args.base, encoding='utf-8') as archivo:
+        base = json.load(archivo)
+    with open(args.nuevo, encoding='utf-8') as archivo:
+        nuevo = json.load(archivo)
+    if base['entorno'] != nuevo['entorno']:
+        print("Aviso: los resultados se tomaron en entornos distintos", file=sys.stderr)
+
+    regresiones = []
+    print(f"{'escala':>9} | {'caso':<30} {'base ms':>10} {'nuevo ms':>10} {'cambio':>8} {'base MiB':>10} {'nuevo MiB':>10}")
+    for escala, casos_base in base['resultados'].items():
+        for nombre, resultado_base in casos_base.items():
+            resultado_nuevo = nuevo['resultados'].get(escala, {}).get(nombre)
+            if resultado_nuevo is None:
+                continue
+            antes, despues = resultado_base['mediana_s'], resultado_nuevo['mediana_s']
+            cambio = despues / antes - 1 if antes else 0
+            # Los casos muy rápidos se ignoran: su variación es ruido de medición
+            regresion = cambio > args.umbral and 1000 * despues >= args.minimo_ms
+            if regresion:
+                regresiones.append((escala, nombre))
+            # Los JSON anteriores a la medición de memoria no tienen 'pico_mib'
+            memoria = "".join(f" {resultado.get('pico_mib', float('nan')):>10.1f}" for resultado in (resultado_base, resultado_nuevo))
+            print(f"{escala:>9} | {nombre:<30} {1000 * antes:>10.1f} {1000 * despues:>10.1f} {cambio:>+8.0%}{memoria}" + ("  REGRESIÓN" if regresion else ""))
+
+    if regresiones:
+        print(f"{len(regresiones)} caso(s) empeoraron más de {args.umbral:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+def agregar_comando_comparar(subparsers):
+    parser_comparar = subparsers.add_parser("comparar", help="Compara dos JSON de resultados")
+    parser_comparar.add_argument("base")
+    parser_comparar.add_argument("nuevo")
+    parser_comparar.add_argument("--umbral", type=float, default=0.2, help="Aumento relativo de la mediana tolerado (0.2 = 20%%)")
+    parser_comparar.add_argument("--minimo_ms", type=float, default=5, help="No se marcan regresiones en casos más rápidos que esto")
+    parser_comparar.set_defaults(funcion=comparar)
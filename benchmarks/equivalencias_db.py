@@ -0,0 +1,191 @@
+"""Latencia de las consultas de comparar_cursos.py y rendimiento de las altas en lote, contra una base local.
+
+Crea una base SQLite con src/utils/base_local.py: las mismas tablas que MySQL y los
+procedimientos de auditoría emulados. Los datos sintéticos salen de una semilla, así que
+dos corridas con los mismos argumentos usan exactamente la misma base. La app se apunta a
+esa base con CBAMECAPACITA_DB_URL (ver src/utils/db.py) y se miden las mismas funciones que
+usan load_data, "Crear Equivalencia" y mostrar_equivalencias_existentes: datos de
+referencia, sincronización de equivalencias, conteo, páginas, exportación, altas en lote de
+distintos tamaños y bajas. Al final se muestran los percentiles por sentencia que registra
+src/utils/metricas.py.
+
+Los resultados se guardan en el mismo formato que benchmarks.alumnos y se comparan con el
+mismo comando.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.equivalencias_db ejecutar --cursos 5000 --equivalencias 20000 --guardar base.json
+    python -m benchmarks.equivalencias_db comparar base.json nuevo.json --umbral 0.2
+    python -m benchmarks.equivalencias_db ejecutar --conservar cba_local.db  # para usarla después con la app
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+
+from sqlalchemy import text
+
+from benchmarks.comun import agregar_comando_comparar, guardar_resultados, medir
+from src.utils.base_local import crear_base_local
+from src.utils.db import VARIABLE_URL_BASE
+
+
+def lotes_nuevos(pares_existentes, cursos: int, certificaciones: int, tamaño: int, cantidad: int, rng: random.Random):
+    """`cantidad` lotes de `tamaño` equivalencias que todavía no existen (ni entre sí)"""
+    usados = set(pares_existentes)
+    lotes = []
+    for _ in range(cantidad):
+        lote = []
+        while len(lote) < tamaño:
+            par = (rng.randint(1, cursos), rng.randint(1, certificaciones))
+            if par in usados:
+                continue
+            usados.add(par)
+            lote.append({'id_curso': par[0], 'n_curso': f"Curso {par[0]}", 'id_certificacion': par[1],
+                         'n_certificacion': f"Certificación {par[1]}", 'observaciones': "benchmark"})
+        lotes.append(lote)
+    return lotes
+
+
+def casos(args, engine, rng):
+    # Se importa después de apuntar CBAMECAPACITA_DB_URL a la base local
+    from src.pages import comparar_cursos as cc
+    from src.utils.equivalencias import EquivalenciasSincronizadas
+
+    def datos_referencia():
+        cc.consultar_datos_referencia.clear()
+        cc.consultar_datos_referencia()
+
+    def contar(busqueda):
+        cc.contar_equivalencias.clear()
+        return cc.contar_equivalencias(engine, busqueda)
+
+    def pagina(busqueda="", despues_de=None):
+        cc.obtener_pagina_equivalencias.clear()
+        return cc.obtener_pagina_equivalencias(engine, busqueda, despues_de)
+
+    # Clave (fecha, id) de la mitad del recorrido, para medir una página profunda
+    total = contar("")
+    sql, params = cc._consulta_equivalencias("", limite=1)
+    with engine.connect() as conn:
+        mitad = conn.execute(text(sql + " OFFSET :desde"), {**params, "desde": total // 2}).fetchone()
+    despues_de = (mitad.fecha_creacion, mitad.ID_EQUIVALENCIA)
+
+    yield 'consultar_datos_referencia', datos_referencia
+    yield 'sincronizar.completa', lambda: EquivalenciasSincronizadas().sincronizar(engine)
+    yield 'contar_equivalencias', lambda: contar("")
+    yield 'contar_equivalencias.busqueda', lambda: contar("Programación")
+    yield 'pagina.primera', lambda: pagina()
+    yield 'pagina.profunda', lambda: pagina(despues_de=despues_de)
+    yield 'pagina.busqueda', lambda: pagina("Programación")
+    yield 'exportar_csv', lambda: cc.exportar_equivalencias_csv(engine)
+
+    sincronizadas = EquivalenciasSincronizadas().sincronizar(engine)
+    for tamaño in args.lotes:
+        # Dos casos por tamaño, cada uno con la llamada de calentamiento y la de memoria además de las repeticiones
+        pendientes = iter(lotes_nuevos(sincronizadas.sincronizar(engine).pares(), args.cursos, args.certificaciones,
+                                       tamaño, 2 * (args.repeticiones + 2), rng))
+
+        def crear_lote(pendientes=pendientes):
+            exito, resultados = cc.crear_equivalencias_con_auditoria(engine, next(pendientes), "benchmark")
+            assert exito, resultados
+
+        yield f'crear_lote.{tamaño}', crear_lote
+
+        def sincronizar_cambios(pendientes=pendientes):
+            crear_lote()
+            sincronizadas.marcar_desactualizada()
+            sincronizadas.sincronizar(engine)
+
+        yield f'crear_lote.{tamaño}+sincronizar', sincronizar_cambios
+
+    activas = iter(sorted(sincronizadas.sincronizar(engine).df['ID_EQUIVALENCIA'].tolist(), reverse=True))
+    yield 'eliminar', lambda: cc.eliminar_equivalencia_con_auditoria(engine, next(activas), "benchmark")
+
+
+def verificar_lote_con_duplicado(engine, cc_modulo):
+    """Un lote con un par ya activo debe revertirse completo, sin dejar equivalencias ni auditoría"""
+    with engine.connect() as conn:
+        antes = conn.execute(text("SELECT (SELECT COUNT(*) FROM T_EQUIVALENCIAS_CURSOS), (SELECT COUNT(*) FROM T_AUDITORIA_EQUIVALENCIAS)")).fetchone()
+        existente = conn.execute(text("SELECT ID_CURSO_HISTORICO, ID_CERTIFICACION FROM T_EQUIVALENCIAS_CURSOS WHERE ID_ESTADO = 1 LIMIT 1")).fetchone()
+    lote = [{'id_curso': 1, 'n_curso': "Nuevo", 'id_certificacion': 10 ** 6, 'n_certificacion': "Nueva", 'observaciones': ""},
+            {'id_curso': existente[0], 'n_curso': "Duplicado", 'id_certificacion': existente[1], 'n_certificacion': "Duplicada", 'observaciones': ""}]
+    # El error es el esperado: no se registra en el log
+    logger = logging.getLogger(cc_modulo.__name__)
+    logger.disabled = True
+    try:
+        exito, resultados = cc_modulo.crear_equivalencias_con_auditoria(engine, lote, "benchmark")
+    finally:
+        logger.disabled = False
+    with engine.connect() as conn:
+        despues = conn.execute(text("SELECT (SELECT COUNT(*) FROM T_EQUIVALENCIAS_CURSOS), (SELECT COUNT(*) FROM T_AUDITORIA_EQUIVALENCIAS)")).fetchone()
+    assert not exito and [r['estado'] for r in resultados] == ['revertida', 'error'] and tuple(antes) == tuple(despues), resultados
+
+
+def ejecutar(args):
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = args.conservar or os.path.join(directorio, "cba_local.db")
+        print(f"Creando la base local en {ruta} (semilla {args.semilla})...", file=sys.stderr)
+        crear_base_local(ruta, cursos=args.cursos, alumnos=args.alumnos, certificaciones=args.certificaciones,
+                         equivalencias=args.equivalencias, semilla=args.semilla)
+        os.environ[VARIABLE_URL_BASE] = f"sqlite:///{ruta}"
+
+        from src.pages import comparar_cursos as cc
+        from src.utils.metricas import obtener_registro_metricas
+
+        engine = cc.get_database_connection()
+        verificar_lote_con_duplicado(engine, cc)
+        registro = obtener_registro_metricas()
+        registro.reiniciar()
+
+        escala = str(args.equivalencias)
+        resultados = {escala: {}}
+        for nombre, funcion in casos(args, engine, random.Random(args.semilla)):
+            if args.casos and not any(nombre.startswith(c) for c in args.casos):
+                continue
+            resultado = medir(funcion, args.repeticiones, args.presupuesto_s)
+            tamaño = nombre.split('.')[1].split('+')[0] if nombre.startswith('crear_lote.') else None
+            if tamaño:
+                resultado['equivalencias_por_s'] = round(int(tamaño) / resultado['mediana_s'], 1)
+            resultados[escala][nombre] = resultado
+            print(f"{escala:>9} | {nombre:<30} {1000 * resultado['mediana_s']:>10.1f} ms (mín. {1000 * resultado['min_s']:.1f}) "
+                  f"{resultado['pico_mib']:>8.1f} MiB" + (f"  {resultado['equivalencias_por_s']:.0f} equivalencias/s" if tamaño else ""))
+
+        resumen = registro.resumen_consultas()
+        if not resumen.empty:
+            print("\nSentencias (src/utils/metricas.py):")
+            print(resumen.head(15).to_string(index=False))
+        engine.dispose()
+
+    if args.guardar:
+        guardar_resultados(args.guardar, resultados, semilla=args.semilla, escala={
+            'cursos': args.cursos, 'alumnos': args.alumnos, 'certificaciones': args.certificaciones, 'equivalencias': args.equivalencias})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    parser_ejecutar = subparsers.add_parser("ejecutar", help="Crea la base local, mide los casos y opcionalmente guarda un JSON")
+    parser_ejecutar.add_argument("--cursos", type=int, default=5_000)
+    parser_ejecutar.add_argument("--alumnos", type=int, default=100_000)
+    parser_ejecutar.add_argument("--certificaciones", type=int, default=800)
+    parser_ejecutar.add_argument("--equivalencias", type=int, default=20_000)
+    parser_ejecutar.add_argument("--lotes", type=int, nargs="+", default=[1, 10, 50], help="Tamaños de lote de las altas")
+    parser_ejecutar.add_argument("--repeticiones", type=int, default=10)
+    parser_ejecutar.add_argument("--presupuesto_s", type=float, default=30, help="Tiempo máximo aproximado por caso")
+    parser_ejecutar.add_argument("--semilla", type=int, default=42)
+    parser_ejecutar.add_argument("--casos", nargs="+", help="Prefijos de los casos a medir (por defecto todos)")
+    parser_ejecutar.add_argument("--conservar", help="Crea la base en este archivo y no la borra al terminar")
+    parser_ejecutar.add_argument("--guardar", help="Archivo JSON donde guardar los resultados")
+    parser_ejecutar.set_defaults(funcion=ejecutar)
+
+    agregar_comando_comparar(subparsers)
+
+    args = parser.parse_args()
+    args.funcion(args)
+
+
+if __name__ == "__main__":
+    main()
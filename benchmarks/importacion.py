@@ -0,0 +1,104 @@
+"""Tiempo de importación de los scripts de la app (arranque en frío), medido con `python -X importtime`.
+
+Importa cada módulo en un proceso nuevo, varias veces, y toma la mediana del tiempo acumulado.
+Muestra las dependencias que más pesan y termina con código 1 si algún módulo supera el
+presupuesto o si al importarlo se cargó alguna dependencia que debería importarse recién
+al usarse (por defecto SQLAlchemy, PyMySQL, scikit-learn, huggingface_hub, plotly.express y
+la vista de comparación), para usarlo como control antes de un merge o de un despliegue.
+
+Los procesos se ejecutan en un directorio temporal, para que cualquier archivo que se cree al
+importar (no debería haber ninguno) no quede en el repositorio.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.importacion
+    python -m benchmarks.importacion --modulos app --presupuesto_ms 800 --repeticiones 10
+
+tests/test_importacion.py aplica el mismo control con pytest.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PRESUPUESTO_MS = 1000
+PROHIBIDOS = ["sqlalchemy", "pymysql", "sklearn", "huggingface_hub", "plotly.express", "src.pages.comparar_cursos"]
+# import time: self [us] | cumulative | nombre (la sangría indica quién lo importó)
+LINEA_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def medir_importacion(modulo: str, raiz: str, directorio: str) -> list:
+    """(nombre, microsegundos acumulados, profundidad) de cada módulo cargado al importar `modulo` en un proceso nuevo.
+
+    Están en el orden de -X importtime: cada módulo aparece después de los que importó.
+    """
+    entorno = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [raiz, os.environ.get("PYTHONPATH")])))
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"], cwd=directorio,
+                             env=entorno, capture_output=True, text=True)
+    if proceso.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {modulo}:\n{proceso.stderr[-2000:]}")
+    tiempos = []
+    for linea in proceso.stderr.splitlines():
+        coincidencia = LINEA_IMPORTTIME.match(linea)
+        if coincidencia:
+            tiempos.append((coincidencia.group(4), int(coincidencia.group(2)), len(coincidencia.group(3)) // 2))
+    return tiempos
+
+
+def tiempo_importacion_ms(tiempos: list, modulo: str) -> float:
+    """Milisegundos acumulados de la importación de `modulo` (incluye todo lo que importó)"""
+    return next(microsegundos for nombre, microsegundos, profundidad in tiempos
+                if nombre == modulo and profundidad == 0) / 1000
+
+
+def dependencias_directas(tiempos: list, modulo: str) -> list:
+    """(microsegundos, nombre) de los módulos que importó `modulo` directamente, del más pesado al más liviano"""
+    posicion = next(i for i, (nombre, _, profundidad) in enumerate(tiempos) if nombre == modulo and profundidad == 0)
+    directas = []
+    for nombre, microsegundos, profundidad in reversed(tiempos[:posicion]):
+        if profundidad == 0:
+            break
+        if profundidad == 1:
+            directas.append((microsegundos, nombre))
+    return sorted(directas, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modulos", nargs="+", default=["app", "cursos"], help="Módulos a importar")
+    parser.add_argument("--presupuesto_ms", type=float, default=PRESUPUESTO_MS, help="Mediana máxima aceptable de cada importación")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--prohibidos", nargs="*", default=PROHIBIDOS,
+                        help="Módulos que no deben cargarse al importar (vacío para no controlarlo)")
+    parser.add_argument("--mostrar", type=int, default=10, help="Cantidad de dependencias directas a listar")
+    args = parser.parse_args()
+
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    fallas = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for modulo in args.modulos:
+            corridas = [medir_importacion(modulo, raiz, directorio) for _ in range(args.repeticiones)]
+            mediana_ms = statistics.median(tiempo_importacion_ms(corrida, modulo) for corrida in corridas)
+            ultima = corridas[-1]
+            print(f"{modulo}: {mediana_ms:.0f} ms (mediana de {args.repeticiones}, presupuesto {args.presupuesto_ms:.0f} ms)")
+
+            for microsegundos, nombre in dependencias_directas(ultima, modulo)[:args.mostrar]:
+                print(f"  {microsegundos / 1000:>8.1f} ms  {nombre}")
+
+            if mediana_ms > args.presupuesto_ms:
+                fallas.append(f"{modulo} tarda {mediana_ms:.0f} ms en importarse (presupuesto {args.presupuesto_ms:.0f} ms)")
+            importados = {nombre for nombre, _, _ in ultima}
+            cargados = [prohibido for prohibido in args.prohibidos if prohibido in importados and prohibido != modulo]
+            if cargados:
+                fallas.append(f"{modulo} carga al importarse: {', '.join(cargados)}")
+
+    for falla in fallas:
+        print(falla, file=sys.stderr)
+    if fallas:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Memoria pico y tiempo de `pd.read_sql` contra `leer_sql_por_bloques`.
+
+Genera una base SQLite con una tabla de equivalencias sintética (nombres largos, sector con
+pocos valores distintos, fechas) y lee la tabla completa con cada método en un proceso
+separado, para que el pico de memoria (ru_maxrss) de uno no afecte al otro.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.lectura_sql --filas 100000 500000
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import sqlite3
+import tempfile
+import time
+
+SECTORES = ['Gastronomía', 'Tecnología', 'Salud', 'Construcción', 'Turismo', 'Industria']
+
+QUERY = """
+    SELECT ID_EQUIVALENCIA, N_CURSO_HISTORICO, N_SECTOR, N_CERTIF_ACTUAL, FECH_EQUIVALENCIA, OBSERVACIONES
+    FROM T_EQUIVALENCIAS_CURSOS
+"""
+
+
+def crear_base(ruta: str, filas: int, semilla: int = 42):
+    rng = random.Random(semilla)
+    conn = sqlite3.connect(ruta)
+    conn.execute("""
+        CREATE TABLE T_EQUIVALENCIAS_CURSOS (
+            ID_EQUIVALENCIA INTEGER PRIMARY KEY,
+            N_CURSO_HISTORICO TEXT,
+            N_SECTOR TEXT,
+            N_CERTIF_ACTUAL TEXT,
+            FECH_EQUIVALENCIA TEXT,
+            OBSERVACIONES TEXT
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO T_EQUIVALENCIAS_CURSOS VALUES (?, ?, ?, ?, ?, ?)",
+        ((i, f"CURSO HISTÓRICO DE CAPACITACIÓN NÚMERO {rng.randint(1, 20000):05d}", rng.choice(SECTORES),
+          f"CERTIFICACIÓN EN OFICIO {rng.randint(1, 3000):04d}", f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 10:00:00",
+          rng.choice(["", "Equivalencia revisada por el área", None])) for i in range(1, filas + 1))
+    )
+    conn.commit()
+    conn.close()
+
+
+def _medir(metodo: str, ruta: str, salida):
+    import pandas as pd
+    from sqlalchemy import create_engine
+
+    from src.utils.lectura import leer_sql_por_bloques
+
+    engine = create_engine(f"sqlite:///{ruta}")
+    with engine.connect():
+        pass
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    if metodo == "pd.read_sql":
+        df = pd.read_sql(QUERY, engine, parse_dates=['FECH_EQUIVALENCIA'])
+    else:
+        df = leer_sql_por_bloques(engine, QUERY, categoricas=['N_SECTOR'], fechas=['FECH_EQUIVALENCIA'])
+    segundos = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en KiB en Linux
+    salida.put((len(df), (pico - base) / 1024, df.memory_usage(deep=True).sum() / 2 ** 20, segundos))
+
+
+def medir(metodo: str, ruta: str):
+    """Devuelve (filas, MiB de pico adicional, MiB del DataFrame, segundos) leyendo en un proceso nuevo"""
+    contexto = multiprocessing.get_context("spawn")
+    salida = contexto.Queue()
+    proceso = contexto.Process(target=_medir, args=(metodo, ruta, salida))
+    proceso.start()
+    resultado = salida.get()
+    proceso.join()
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, nargs="+", default=[100_000, 500_000])
+    args = parser.parse_args()
+
+    print(f"{'filas':>9} | {'método':<20} {'pico MiB':>9} {'df MiB':>8} {'segundos':>9}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for filas in args.filas:
+            ruta = os.path.join(directorio, f"equivalencias_{filas}.db")
+            crear_base(ruta, filas)
+            for metodo in ("pd.read_sql", "leer_sql_por_bloques"):
+                leidas, pico, memoria_df, segundos = medir(metodo, ruta)
+                assert leidas == filas
+                print(f"{filas:>9} | {metodo:<20} {pico:>9.1f} {memoria_df:>8.1f} {segundos:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Fixture SQLite para T_RESUMEN_HORAS_CURSO.
+
+Crea las tablas de cursos e inscripciones con la versión SQLite de los triggers de
+migrations/001_resumen_horas_curso.sql, carga inscripciones a distintas escalas y compara
+el costo de la consulta anterior (JOIN + GROUP BY sobre T_ALUMNOS_X_CURSOS) con la actual
+(JOIN contra el resumen). El costo se mide en instrucciones de la VM de SQLite, que no
+dependen de la máquina, además del tiempo.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.resumen_horas --cursos 2000 --inscripciones 10000 100000 500000
+"""
+import argparse
+import random
+import sqlite3
+import time
+
+from src.pages.comparar_cursos import QUERY_HISTORICO
+
+# Consulta que usaba load_data antes del resumen
+QUERY_HISTORICO_ANTERIOR = """
+    SELECT cs.ID_CURSO, cs.N_CURSO, cs.ID_SECTOR, cs.N_SECTOR, COALESCE(ac.CANTIDAD_HS, 0) AS CANTIDAD_HS
+    FROM T_CURSOS_X_SECTOR cs
+    LEFT JOIN T_ALUMNOS_X_CURSOS ac ON cs.N_CURSO = ac.N_CURSO
+    GROUP BY cs.ID_CURSO, cs.N_CURSO, cs.ID_SECTOR, cs.N_SECTOR, ac.CANTIDAD_HS
+    ORDER BY cs.N_CURSO
+"""
+
+ESQUEMA_SQLITE = """
+CREATE TABLE T_CURSOS_X_SECTOR (
+    ID_CURSO INTEGER PRIMARY KEY,
+    N_CURSO TEXT NOT NULL,
+    ID_SECTOR INTEGER,
+    N_SECTOR TEXT
+);
+CREATE INDEX IX_CURSOS_X_SECTOR_N_CURSO ON T_CURSOS_X_SECTOR (N_CURSO);
+
+CREATE TABLE T_ALUMNOS_X_CURSOS (
+    ID_ALUMNO_CURSO INTEGER PRIMARY KEY,
+    N_CURSO TEXT NOT NULL,
+    CUIL TEXT,
+    CANTIDAD_HS INTEGER
+);
+CREATE INDEX IX_ALUMNOS_X_CURSOS_N_CURSO ON T_ALUMNOS_X_CURSOS (N_CURSO);
+
+CREATE TABLE T_RESUMEN_HORAS_CURSO (
+    ID_CURSO INTEGER NOT NULL PRIMARY KEY,
+    CANTIDAD_HS INTEGER NOT NULL DEFAULT 0,
+    FECH_ACTUALIZACION TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TRIGGER TR_ALUMNOS_X_CURSOS_AI_RESUMEN_HS
+AFTER INSERT ON T_ALUMNOS_X_CURSOS
+BEGIN
+    INSERT INTO T_RESUMEN_HORAS_CURSO (ID_CURSO, CANTIDAD_HS)
+    SELECT cs.ID_CURSO, COALESCE(NEW.CANTIDAD_HS, 0)
+    FROM T_CURSOS_X_SECTOR cs
+    WHERE cs.N_CURSO = NEW.N_CURSO
+    ON CONFLICT (ID_CURSO) DO UPDATE SET
+        CANTIDAD_HS = MAX(CANTIDAD_HS, excluded.CANTIDAD_HS),
+        FECH_ACTUALIZACION = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER TR_ALUMNOS_X_CURSOS_AU_RESUMEN_HS
+AFTER UPDATE ON T_ALUMNOS_X_CURSOS
+BEGIN
+    INSERT INTO T_RESUMEN_HORAS_CURSO (ID_CURSO, CANTIDAD_HS)
+    SELECT cs.ID_CURSO, (
+        SELECT COALESCE(MAX(ac.CANTIDAD_HS), 0) FROM T_ALUMNOS_X_CURSOS ac WHERE ac.N_CURSO = cs.N_CURSO
+    )
+    FROM T_CURSOS_X_SECTOR cs
+    WHERE cs.N_CURSO IN (NEW.N_CURSO, OLD.N_CURSO)
+    ON CONFLICT (ID_CURSO) DO UPDATE SET
+        CANTIDAD_HS = excluded.CANTIDAD_HS,
+        FECH_ACTUALIZACION = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER TR_CURSOS_X_SECTOR_AI_RESUMEN_HS
+AFTER INSERT ON T_CURSOS_X_SECTOR
+BEGIN
+    INSERT INTO T_RESUMEN_HORAS_CURSO (ID_CURSO, CANTIDAD_HS)
+    SELECT NEW.ID_CURSO, COALESCE(MAX(ac.CANTIDAD_HS), 0)
+    FROM T_ALUMNOS_X_CURSOS ac
+    WHERE ac.N_CURSO = NEW.N_CURSO
+    ON CONFLICT (ID_CURSO) DO UPDATE SET
+        CANTIDAD_HS = MAX(CANTIDAD_HS, excluded.CANTIDAD_HS),
+        FECH_ACTUALIZACION = CURRENT_TIMESTAMP;
+END;
+"""
+
+SECTORES = ['Gastronomía', 'Tecnología', 'Salud', 'Construcción', 'Turismo', 'Industria']
+
+
+def crear_base(cursos: int, semilla: int = 42) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(ESQUEMA_SQLITE)
+    conn.executemany(
+        "INSERT INTO T_CURSOS_X_SECTOR (ID_CURSO, N_CURSO, ID_SECTOR, N_SECTOR) VALUES (?, ?, ?, ?)",
+        [(i, f"CURSO {i:05d}", i % len(SECTORES), SECTORES[i % len(SECTORES)]) for i in range(1, cursos + 1)]
+    )
+    conn.commit()
+    return conn
+
+
+def cargar_inscripciones(conn: sqlite3.Connection, cantidad: int, cursos: int, rng: random.Random):
+    """Inserta inscripciones nuevas; los triggers actualizan el resumen de forma incremental"""
+    filas = []
+    for _ in range(cantidad):
+        curso = rng.randint(1, cursos)
+        # Algunos cursos tienen más de una carga horaria registrada
+        filas.append((f"CURSO {curso:05d}", f"20{rng.randint(10000000, 49999999)}{rng.randint(0, 9)}", rng.choice([40, 40, 40, 60, 80])))
+    conn.executemany("INSERT INTO T_ALUMNOS_X_CURSOS (N_CURSO, CUIL, CANTIDAD_HS) VALUES (?, ?, ?)", filas)
+    conn.commit()
+
+
+def medir(conn: sqlite3.Connection, query: str):
+    """Devuelve (filas, instrucciones de la VM, segundos) de una consulta"""
+    instrucciones = [0]
+
+    def contar():
+        instrucciones[0] += 1000
+        return 0
+
+    conn.set_progress_handler(contar, 1000)
+    inicio = time.perf_counter()
+    filas = conn.execute(query).fetchall()
+    segundos = time.perf_counter() - inicio
+    conn.set_progress_handler(None, 0)
+    return filas, instrucciones[0], segundos
+
+
+def verificar_resumen(conn: sqlite3.Connection):
+    """El resumen incremental debe coincidir con recalcular todo desde cero (0 horas si no quedan inscripciones)"""
+    diferencias = conn.execute("""
+        SELECT COUNT(*) FROM (
+            SELECT cs.ID_CURSO, COALESCE(MAX(ac.CANTIDAD_HS), 0) AS HS
+            FROM T_CURSOS_X_SECTOR cs LEFT JOIN T_ALUMNOS_X_CURSOS ac ON cs.N_CURSO = ac.N_CURSO
+            GROUP BY cs.ID_CURSO
+        ) esperado
+        LEFT JOIN T_RESUMEN_HORAS_CURSO rh ON rh.ID_CURSO = esperado.ID_CURSO
+        WHERE COALESCE(rh.CANTIDAD_HS, 0) <> esperado.HS
+    """).fetchone()[0]
+    assert diferencias == 0, f"{diferencias} cursos con horas distintas al recálculo completo"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cursos", type=int, default=2000)
+    parser.add_argument("--inscripciones", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    conn = crear_base(args.cursos, args.semilla)
+    cargadas = 0
+
+    print(f"{'inscripciones':>13} | {'filas ant.':>10} {'instr. ant.':>12} {'ms ant.':>8} | {'filas act.':>10} {'instr. act.':>12} {'ms act.':>8}")
+    for total in sorted(args.inscripciones):
+        cargar_inscripciones(conn, total - cargadas, args.cursos, rng)
+        cargadas = total
+        verificar_resumen(conn)
+
+        filas_ant, instr_ant, seg_ant = medir(conn, QUERY_HISTORICO_ANTERIOR)
+        filas_act, instr_act, seg_act = medir(conn, QUERY_HISTORICO)
+        assert len(filas_act) == args.cursos, "La consulta actual debe devolver una fila por curso"
+        print(f"{total:>13} | {len(filas_ant):>10} {instr_ant:>12} {seg_ant * 1000:>8.1f} | {len(filas_act):>10} {instr_act:>12} {seg_act * 1000:>8.1f}")
+
+    # Corrección de horas: el trigger de UPDATE recalcula solo el curso afectado
+    conn.execute("UPDATE T_ALUMNOS_X_CURSOS SET CANTIDAD_HS = 120 WHERE ID_ALUMNO_CURSO = 1")
+    conn.commit()
+    verificar_resumen(conn)
+
+    # Inscripciones que pasan a otro curso: el curso anterior se recalcula (aquí queda sin inscripciones)
+    conn.execute("UPDATE T_ALUMNOS_X_CURSOS SET N_CURSO = 'CURSO 00002' WHERE N_CURSO = 'CURSO 00001'")
+    conn.commit()
+    verificar_resumen(conn)
+
+
+if __name__ == "__main__":
+    main()
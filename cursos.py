@@ -1,13 +1,14 @@
 import streamlit as st
 import pandas as pd
-from huggingface_hub import hf_hub_download
-import plotly.express as px
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
+from src.utils.docentes import calcular_analitica_docentes, top_n_con_otros
+from src.utils.intervalos import construir_indice_cursos, serie_concurrencia
+from src.utils.cruce import construir_hechos_docentes_cursos, calcular_carga_docente
+from src.utils.tablas import mostrar_tabla_por_paginas
+from src.utils.tiempos import iniciar_rerun, medir_seccion
+from src.utils.admin import es_admin, mostrar_tiempos_secciones
 
-# Page configuration
-st.set_page_config(page_title="Cursos CBAME", page_icon="📚", layout="wide")
-
-st.markdown("""
+ESTILOS = """
 <style>
     .main {
         padding: 2rem 3rem;
@@ -49,18 +50,17 @@ st.markdown("""
         background-color: #e9ecef;
     }
 </style>
-""", unsafe_allow_html=True)
-
-# Title and description
-st.title("📚 Dashboard de Cursos CBAME")
-st.markdown("""---""")
+"""
 
 # Configuration for Hugging Face
 REPO_ID = "Dir-Tecno/CBAMECAPACITA"
-HF_TOKEN = st.secrets["HuggingFace"]["huggingface_token"]
 
 # Function to load data from HuggingFace
+# En caché como en app.py: sin ella cada rerun volvía a consultar Hugging Face y a leer los CSV
+@st.cache_data(ttl=3600, show_spinner="Descargando datos...")
 def load_data_from_huggingface(repo_id, token):
+    # Importado al usarse, como en app.py: importar la página no carga huggingface_hub
+    from huggingface_hub import hf_hub_download
     file_path_1 = hf_hub_download(repo_id, filename="VT_CURSOS_X_LOCALIDAD.csv", token=token, repo_type='dataset')
     file_path_2 = hf_hub_download(repo_id, filename="VT_DOCENTES_X_CURSO.csv", token=token, repo_type='dataset')
     file_path_geojson = hf_hub_download(repo_id, filename="capa_gobiernoslocales_2010.geojson", token=token, repo_type='dataset')
@@ -74,57 +74,54 @@ def load_data_from_huggingface(repo_id, token):
 def load_data():
     try:
         # Load data using the helper function
-        dfs, file_dates = load_data_from_huggingface(REPO_ID, token=HF_TOKEN)
+        dfs, file_dates = load_data_from_huggingface(REPO_ID, token=st.secrets["HuggingFace"]["huggingface_token"])
         
         # Assign dataframes
         df_cursos = dfs[0]  # Assuming VT_CURSO_X_LOCALIDAD.csv is the first file
         df_docentes = dfs[1]  # Assuming VT_DOCENTES_X_CURSO.csv is the second file
         geojson_path = dfs[2]  # Assuming capa_gobiernoslocales_2010.geojson is the third file
         
-        return df_cursos, df_docentes, geojson_path
+        # La ruta local de hf_hub_download incluye la revisión del dataset, sirve como versión del archivo
+        versiones = {'cursos': file_dates[0], 'docentes': file_dates[1]}
+        
+        return df_cursos, df_docentes, geojson_path, versiones
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        return None, None, None
+        return None, None, None, None
 
-# Load the data
-df_cursos, df_docentes, geojson_path = load_data()
 
-if df_cursos is not None and df_docentes is not None:
+# Pestaña de análisis de cursos, con los filtros de la barra lateral
+def mostrar_analisis_cursos(df_cursos, df_docentes, geojson_path, versiones):
+    import plotly.express as px  # Importado al dibujar los gráficos, no al importar la página
 
-    # Convertir fechas permitiendo valores nulos en FEC_FIN
-    df_cursos['FEC_INICIO'] = pd.to_datetime(df_cursos['FEC_INICIO'], format='%d/%m/%Y %H:%M', errors='coerce')
-    df_cursos['FEC_FIN'] = pd.to_datetime(df_cursos['FEC_FIN'], format='%d/%m/%Y %H:%M', errors='coerce')
+    st.title("📊 Reporte de Cursos CBAME")
+    
+    # Sidebar filters
+    st.sidebar.title("Filtros")
+    
+    # Sector Productivo filter
+    sectores = ['Todos'] + sorted(df_cursos['N_SECTOR_PRODUCTIVO'].unique().tolist())
+    sector_selected = st.sidebar.selectbox("Sector Productivo", sectores)
+    
+    # Localidad filter
+    localidades = ['Todas'] + sorted(df_cursos['N_LOCALIDAD'].unique().tolist())
+    localidad_selected = st.sidebar.selectbox("Localidad", localidades)
+    
+    # Apply filters: una máscara combinada y una sola selección de filas (ninguna si no hay filtros)
+    mascara = pd.Series(True, index=df_cursos.index)
+    if sector_selected != 'Todos':
+        mascara &= df_cursos['N_SECTOR_PRODUCTIVO'] == sector_selected
+    if localidad_selected != 'Todas':
+        mascara &= df_cursos['N_LOCALIDAD'] == localidad_selected
+    filtered_cursos = df_cursos if mascara.all() else df_cursos[mascara]
 
-    # Tabs
-    tab1, tab2 = st.tabs(["📊 Análisis de Cursos", "👨‍🏫 Análisis de Docentes"])
+    # Main dashboard content
+    col1, col2 = st.columns(2)
     
-    with tab1:
-        st.title("📊 Reporte de Cursos CBAME")
-        
-        # Sidebar filters
-        st.sidebar.title("Filtros")
-        
-        # Sector Productivo filter
-        sectores = ['Todos'] + sorted(df_cursos['N_SECTOR_PRODUCTIVO'].unique().tolist())
-        sector_selected = st.sidebar.selectbox("Sector Productivo", sectores)
-        
-        # Localidad filter
-        localidades = ['Todas'] + sorted(df_cursos['N_LOCALIDAD'].unique().tolist())
-        localidad_selected = st.sidebar.selectbox("Localidad", localidades)
-        
-        # Apply filters
-        filtered_cursos = df_cursos
-        if sector_selected != 'Todos':
-            filtered_cursos = filtered_cursos[filtered_cursos['N_SECTOR_PRODUCTIVO'] == sector_selected]
-        if localidad_selected != 'Todas':
-            filtered_cursos = filtered_cursos[filtered_cursos['N_LOCALIDAD'] == localidad_selected]
-
-        # Main dashboard content
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Cursos por Sector Productivo
-            st.subheader("Cursos por Sector Productivo")
+    with col1:
+        # Cursos por Sector Productivo
+        st.subheader("Cursos por Sector Productivo")
+        with medir_seccion("cursos.grafico_sector"):
             fig_sector = px.pie(
                 filtered_cursos,
                 names='N_SECTOR_PRODUCTIVO',
@@ -132,10 +129,11 @@ if df_cursos is not None and df_docentes is not None:
                 title='Distribución de Cupos por Sector Productivo'
             )
             st.plotly_chart(fig_sector, use_container_width=True)
-        
-        with col2:
-            # Cursos por Localidad
-            st.subheader("Cursos por Localidad")
+    
+    with col2:
+        # Cursos por Localidad
+        st.subheader("Cursos por Localidad")
+        with medir_seccion("cursos.grafico_localidad"):
             fig_localidad = px.bar(
                 filtered_cursos.groupby('N_LOCALIDAD').size().reset_index(name='count'),
                 x='N_LOCALIDAD',
@@ -146,18 +144,19 @@ if df_cursos is not None and df_docentes is not None:
 
 
 
-        # Mapa de cursos por localidad
-        st.subheader("Mapa de Cursos por Localidad")
-        try:
-          with open(geojson_path) as f:
-              geojson_data = f.read()
-        except Exception as e:
-          st.error(f"Error reading geojson file: {e}")
+    # Mapa de cursos por localidad
+    st.subheader("Mapa de Cursos por Localidad")
+    try:
+      with open(geojson_path) as f:
+          geojson_data = f.read()
+    except Exception as e:
+      st.error(f"Error reading geojson file: {e}")
 
-        
-        # Asegúrate de que 'N_LOCALIDAD' coincida con 'properties.NOMBRE' en el GeoJSON
-        locality_counts = filtered_cursos.groupby('N_LOCALIDAD').size().reset_index(name='count')
-        
+    
+    # Asegúrate de que 'N_LOCALIDAD' coincida con 'properties.NOMBRE' en el GeoJSON
+    locality_counts = filtered_cursos.groupby('N_LOCALIDAD').size().reset_index(name='count')
+    
+    with medir_seccion("cursos.mapa_localidades"):
         fig_map = px.choropleth_mapbox(
             locality_counts,
             geojson=geojson_data,
@@ -172,80 +171,211 @@ if df_cursos is not None and df_docentes is not None:
         )
         st.plotly_chart(fig_map, use_container_width=True)
 
-
-        
-        # Detailed information
-        st.markdown("""---""")
-        st.subheader("Detalle de Cursos")
+    # Cursos activos en el tiempo
+    st.markdown("""---""")
+    st.subheader("Cursos Activos en el Tiempo")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        agrupar_por = st.radio("Agrupar por", ["Sector Productivo", "Localidad"], horizontal=True)
+    with col2:
+        medida = st.radio("Medida", ["CUPO", "CURSOS"], horizontal=True)
+    
+    columna_grupo = 'N_SECTOR_PRODUCTIVO' if agrupar_por == "Sector Productivo" else 'N_LOCALIDAD'
+    filtros_activos = tuple(
+        (columna, valor) for columna, valor in [('N_SECTOR_PRODUCTIVO', sector_selected), ('N_LOCALIDAD', localidad_selected)]
+        if valor not in ('Todos', 'Todas')
+    )
+    with medir_seccion("cursos.grafico_activos"):
+        indices_cursos = construir_indice_cursos(df_cursos, versiones['cursos'], columna_grupo, filtros_activos)
         
-        # Display filtered courses in a table
-        st.dataframe(
-            filtered_cursos[[ 
-                'N_CURSO', 'N_CERTIFICACION', 'N_TRAYECTO_FORMATIVO',
-                'N_SECTOR_PRODUCTIVO', 'CUPO', 'FEC_INICIO', 'FEC_FIN',
-                'N_LOCALIDAD', 'N_BARRIO'
-            ]]
+        concurrencia = serie_concurrencia(indices_cursos)
+        fig_activos = px.line(
+            concurrencia,
+            x='FECHA',
+            y=medida,
+            color='GRUPO',
+            title=f'{medida} activos por semana según {agrupar_por}'
         )
+        st.plotly_chart(fig_activos, use_container_width=True)
+    
+    # Cursos activos en una fecha puntual
+    fecha_consulta = st.date_input("Cursos activos al", value=date.today())
+    indice_general = indices_cursos['general']
+    col1, col2 = st.columns(2)
+    col1.metric("Cursos activos", indice_general.contar_activos(fecha_consulta))
+    col2.metric("Cupo activo", int(indice_general.sumar_activos(fecha_consulta)))
+    mostrar_tabla_por_paginas(
+        indices_cursos['cursos'],
+        filas=indice_general.activos_en(fecha_consulta),
+        columnas=['N_CURSO', 'N_SECTOR_PRODUCTIVO', 'CUPO', 'FEC_INICIO', 'FEC_FIN', 'N_LOCALIDAD'],
+        key="cursos_activos",
+        hide_index=True
+    )
 
- # Download buttons for dataframes
-        st.sidebar.subheader("Descargar Datos Cursos")
-        csv_cursos = df_cursos.to_csv(index=False).encode('utf-8')
-        st.sidebar.download_button(
-            label="Descargar Cursos",
-            data=csv_cursos,
-            file_name='cursos.csv',
-            mime='text/csv'
-        )
-        
-        csv_docentes = df_docentes.to_csv(index=False).encode('utf-8')
-        st.sidebar.download_button(
-            label="Descargar Docentes",
-            data=csv_docentes,
-            file_name='docentes.csv',
-            mime='text/csv'
-        )
 
+    
+    # Detailed information
+    st.markdown("""---""")
+    st.subheader("Detalle de Cursos")
+    
+    # Display filtered courses in a table (solo la página visible)
+    mostrar_tabla_por_paginas(
+        filtered_cursos,
+        key="detalle_cursos",
+        columnas=[
+            'N_CURSO', 'N_CERTIFICACION', 'N_TRAYECTO_FORMATIVO',
+            'N_SECTOR_PRODUCTIVO', 'CUPO', 'FEC_INICIO', 'FEC_FIN',
+            'N_LOCALIDAD', 'N_BARRIO'
+        ],
+        columnas_busqueda=['N_CURSO', 'N_CERTIFICACION', 'N_TRAYECTO_FORMATIVO', 'N_BARRIO']
+    )
 
+    # Download buttons for dataframes
+    st.sidebar.subheader("Descargar Datos Cursos")
+    csv_cursos = df_cursos.to_csv(index=False).encode('utf-8')
+    st.sidebar.download_button(
+        label="Descargar Cursos",
+        data=csv_cursos,
+        file_name='cursos.csv',
+        mime='text/csv'
+    )
     
-    with tab2:
-        st.title("👨‍🏫 Análisis de Docentes")
-        
-        # Filter out rows without 'ID_DOCENTE'
-        filtered_docentes = df_docentes.dropna(subset=['ID_DOCENTE'])
-        
-        # Calculate total number of unique docentes
-        total_docentes = filtered_docentes['ID_DOCENTE'].nunique()
-        
-        # Display total number of docentes
-        st.metric(label="Total de Docentes", value=total_docentes)
-        
-        # Group docentes by course
-        docentes_por_curso = filtered_docentes.groupby('N_CURSO')['NRO_DOCUMENTO'].nunique().reset_index()
-        
-        # Layout with two columns
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Display docentes by course as a pie chart
-            st.subheader("Docentes por Curso")
+    csv_docentes = df_docentes.to_csv(index=False).encode('utf-8')
+    st.sidebar.download_button(
+        label="Descargar Docentes",
+        data=csv_docentes,
+        file_name='docentes.csv',
+        mime='text/csv'
+    )
+
+
+def mostrar_analisis_docentes(df_docentes, versiones):
+    import plotly.express as px  # Importado al dibujar los gráficos, no al importar la página
+
+    st.title("👨‍🏫 Análisis de Docentes")
+    
+    # Agregados precalculados por versión del archivo de docentes
+    analitica = calcular_analitica_docentes(df_docentes, versiones['docentes'])
+    
+    # Display total number of docentes
+    st.metric(label="Total de Docentes", value=analitica['total_docentes'])
+    
+    top_n = st.slider("Cantidad de elementos en los rankings", min_value=5, max_value=30, value=10, step=5)
+    
+    # Layout with two columns
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Ranking de cursos por cantidad de docentes, el resto agrupado en "Otros"
+        st.subheader("Docentes por Curso")
+        with medir_seccion("cursos.grafico_docentes_curso"):
             fig_docentes_curso = px.pie(
-                docentes_por_curso,
+                top_n_con_otros(analitica['por_curso'], 'N_CURSO', 'DOCENTES', n=top_n),
                 names='N_CURSO',
-                values='NRO_DOCUMENTO',
-                title='Distribución de Docentes por Curso'
+                values='DOCENTES',
+                title=f'Distribución de Docentes por Curso (top {top_n})'
             )
             st.plotly_chart(fig_docentes_curso, use_container_width=True)
-        
-        with col2:
-            # Detailed information
-            st.subheader("Detalle de Docentes")
-            
-            # Display docentes details in a table
-            st.dataframe(
-                filtered_docentes[[ 
-                    'NRO_DOCUMENTO', 'ID_DOCENTE', 'N_CURSO', 'HS_ASIGNADAS'
-                ]]
+    
+    with col2:
+        # Ranking de docentes por horas asignadas
+        st.subheader("Docentes con más Horas Asignadas")
+        top_docentes = analitica['por_docente'].head(top_n).astype({'NRO_DOCUMENTO': str})
+        with medir_seccion("cursos.grafico_docentes_horas"):
+            fig_docentes_horas = px.bar(
+                top_docentes,
+                x='HS_TOTALES',
+                y='NRO_DOCUMENTO',
+                orientation='h',
+                hover_data=['CURSOS'],
+                title=f'Top {top_n} docentes por horas asignadas'
             )
+            fig_docentes_horas.update_yaxes(type='category', autorange='reversed')
+            st.plotly_chart(fig_docentes_horas, use_container_width=True)
+    
+    # Horas totales y cursos por docente
+    st.subheader("Carga por Docente")
+    mostrar_tabla_por_paginas(analitica['por_docente'], key="carga_docentes", hide_index=True)
+    
+    # Detailed information
+    st.subheader("Detalle de Docentes")
+    mostrar_tabla_por_paginas(analitica['detalle'], key="detalle_docentes", hide_index=True)
+
+
+def mostrar_carga_docente(df_cursos, df_docentes, versiones):
+    import plotly.express as px  # Importado al dibujar los gráficos, no al importar la página
+
+    st.title("🗺️ Carga Docente por Localidad")
+    
+    # Tabla de hechos docente × curso × localidad, cacheada por versión de ambos archivos
+    version_cruce = (versiones['cursos'], versiones['docentes'])
+    hechos = construir_hechos_docentes_cursos(df_cursos, df_docentes, version_cruce)
+    
+    agrupar_carga = st.radio("Agrupar por", ["Localidad", "Sector Productivo"], horizontal=True, key="agrupar_carga")
+    columna_carga = 'N_LOCALIDAD' if agrupar_carga == "Localidad" else 'N_SECTOR_PRODUCTIVO'
+    carga = calcular_carga_docente(df_cursos, hechos, version_cruce, columna_carga)
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Asignaciones docente-curso", len(hechos))
+    col2.metric("Docentes con curso", hechos['ID_DOCENTE'].nunique())
+    col3.metric("Horas asignadas", int(carga['HS_ASIGNADAS'].sum()))
+    
+    with medir_seccion("cursos.grafico_carga"):
+        fig_carga = px.bar(
+            carga.dropna(subset=['ALUMNOS_POR_DOCENTE']).head(20),
+            x=columna_carga,
+            y='ALUMNOS_POR_DOCENTE',
+            hover_data=['CUPO', 'DOCENTES', 'HS_ASIGNADAS'],
+            title=f'Alumnos por docente según {agrupar_carga} (top 20)'
+        )
+        st.plotly_chart(fig_carga, use_container_width=True)
+    
+    mostrar_tabla_por_paginas(carga, key="carga_por_grupo", hide_index=True)
+
+
+def main():
+    # Page configuration
+    st.set_page_config(page_title="Cursos CBAME", page_icon="📚", layout="wide")
+    # Copy-on-Write: selecciones y subconjuntos comparten memoria con los datos hasta que se modifican
+    pd.set_option("mode.copy_on_write", True)
+    iniciar_rerun()
+
+    st.markdown(ESTILOS, unsafe_allow_html=True)
+
+    # Title and description
+    st.title("📚 Dashboard de Cursos CBAME")
+    st.markdown("""---""")
+
+    # Load the data
+    with medir_seccion("cursos.load_data"):
+        df_cursos, df_docentes, geojson_path, versiones = load_data()
+
+    if df_cursos is not None and df_docentes is not None:
+
+        # Convertir fechas permitiendo valores nulos en FEC_FIN
+        df_cursos['FEC_INICIO'] = pd.to_datetime(df_cursos['FEC_INICIO'], format='%d/%m/%Y %H:%M', errors='coerce')
+        df_cursos['FEC_FIN'] = pd.to_datetime(df_cursos['FEC_FIN'], format='%d/%m/%Y %H:%M', errors='coerce')
+
+        # Tabs
+        tab1, tab2, tab3 = st.tabs(["📊 Análisis de Cursos", "👨‍🏫 Análisis de Docentes", "🗺️ Carga Docente por Localidad"])
+        with tab1:
+            mostrar_analisis_cursos(df_cursos, df_docentes, geojson_path, versiones)
+
+        with tab2:
+            mostrar_analisis_docentes(df_docentes, versiones)
+
+        with tab3:
+            mostrar_carga_docente(df_cursos, df_docentes, versiones)
+
+        # Panel de administración, solo visible con el token de administrador
+        if es_admin():
+            with st.expander("🛠️ Panel de administración"):
+                mostrar_tiempos_secciones()
+
+    else:
+        st.error("No se pudieron cargar los datos. Por favor, verifica la conexión y los archivos.")
+
 
-else:
-    st.error("No se pudieron cargar los datos. Por favor, verifica la conexión y los archivos.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,62 @@
+-- Resumen de horas por curso histórico (una fila por ID_CURSO).
+--
+-- Reemplaza el LEFT JOIN T_CURSOS_X_SECTOR -> T_ALUMNOS_X_CURSOS + GROUP BY que hacía
+-- comparar_cursos.py en cada carga: esa consulta recorría toda la tabla de inscripciones
+-- y devolvía una fila por cada CANTIDAD_HS distinta del mismo curso. Acá se guarda la
+-- mayor CANTIDAD_HS registrada para el curso y los triggers la mantienen al día a
+-- medida que llegan inscripciones nuevas, sin recalcular todo.
+--
+-- Ejecutar una sola vez sobre la base CBAMECAPACITA (MySQL 5.7+ / 8.x).
+-- Cada sentencia es independiente y no requiere cambiar el DELIMITER.
+
+CREATE TABLE IF NOT EXISTS T_RESUMEN_HORAS_CURSO (
+    ID_CURSO INT NOT NULL,
+    CANTIDAD_HS INT NOT NULL DEFAULT 0,
+    FECH_ACTUALIZACION TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (ID_CURSO)
+);
+
+-- Los triggers y la carga inicial buscan el curso por nombre: sin este índice cada
+-- inscripción nueva o corregida recorrería toda la tabla de cursos
+CREATE INDEX IX_CURSOS_X_SECTOR_N_CURSO ON T_CURSOS_X_SECTOR (N_CURSO);
+
+-- Carga inicial a partir de las inscripciones existentes
+INSERT INTO T_RESUMEN_HORAS_CURSO (ID_CURSO, CANTIDAD_HS)
+SELECT cs.ID_CURSO, COALESCE(MAX(ac.CANTIDAD_HS), 0)
+FROM T_CURSOS_X_SECTOR cs
+JOIN T_ALUMNOS_X_CURSOS ac ON cs.N_CURSO = ac.N_CURSO
+GROUP BY cs.ID_CURSO
+ON DUPLICATE KEY UPDATE CANTIDAD_HS = GREATEST(T_RESUMEN_HORAS_CURSO.CANTIDAD_HS, VALUES(CANTIDAD_HS));
+
+-- Inscripción nueva: actualiza solo el curso afectado
+CREATE TRIGGER TR_ALUMNOS_X_CURSOS_AI_RESUMEN_HS
+AFTER INSERT ON T_ALUMNOS_X_CURSOS
+FOR EACH ROW
+INSERT INTO T_RESUMEN_HORAS_CURSO (ID_CURSO, CANTIDAD_HS)
+SELECT cs.ID_CURSO, COALESCE(NEW.CANTIDAD_HS, 0)
+FROM T_CURSOS_X_SECTOR cs
+WHERE cs.N_CURSO = NEW.N_CURSO
+ON DUPLICATE KEY UPDATE CANTIDAD_HS = GREATEST(T_RESUMEN_HORAS_CURSO.CANTIDAD_HS, VALUES(CANTIDAD_HS));
+
+-- Corrección de una inscripción existente: se recalcula su curso y, si la inscripción pasó
+-- a otro curso, también el anterior (OLD.N_CURSO), que puede quedar con menos horas o sin inscripciones
+CREATE TRIGGER TR_ALUMNOS_X_CURSOS_AU_RESUMEN_HS
+AFTER UPDATE ON T_ALUMNOS_X_CURSOS
+FOR EACH ROW
+INSERT INTO T_RESUMEN_HORAS_CURSO (ID_CURSO, CANTIDAD_HS)
+SELECT cs.ID_CURSO, (
+    SELECT COALESCE(MAX(ac.CANTIDAD_HS), 0) FROM T_ALUMNOS_X_CURSOS ac WHERE ac.N_CURSO = cs.N_CURSO
+)
+FROM T_CURSOS_X_SECTOR cs
+WHERE cs.N_CURSO IN (NEW.N_CURSO, OLD.N_CURSO)
+ON DUPLICATE KEY UPDATE CANTIDAD_HS = VALUES(CANTIDAD_HS);
+
+-- Curso nuevo con inscripciones cargadas previamente
+CREATE TRIGGER TR_CURSOS_X_SECTOR_AI_RESUMEN_HS
+AFTER INSERT ON T_CURSOS_X_SECTOR
+FOR EACH ROW
+INSERT INTO T_RESUMEN_HORAS_CURSO (ID_CURSO, CANTIDAD_HS)
+SELECT NEW.ID_CURSO, COALESCE(MAX(ac.CANTIDAD_HS), 0)
+FROM T_ALUMNOS_X_CURSOS ac
+WHERE ac.N_CURSO = NEW.N_CURSO
+ON DUPLICATE KEY UPDATE CANTIDAD_HS = GREATEST(T_RESUMEN_HORAS_CURSO.CANTIDAD_HS, VALUES(CANTIDAD_HS));
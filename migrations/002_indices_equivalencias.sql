@@ -0,0 +1,12 @@
+-- Índices para "Ver Equivalencias" (búsqueda y paginación en el servidor).
+--
+-- - IX_EQUIVALENCIAS_ESTADO_FECHA: permite recorrer las equivalencias de un estado en el
+--   orden (FECH_EQUIVALENCIA, ID_EQUIVALENCIA) de la paginación por clave sin ordenar en memoria.
+-- - La búsqueda por texto usa LIKE '%texto%' (encuentra fragmentos de palabras, como el filtro
+--   anterior en pandas) y se resuelve sobre las filas que recorre la paginación; no usa un
+--   índice FULLTEXT, que solo encuentra prefijos de palabras y depende de las stopwords.
+--
+-- Ejecutar una sola vez sobre la base CBAMECAPACITA (MySQL 5.7+ / 8.x, InnoDB).
+
+CREATE INDEX IX_EQUIVALENCIAS_ESTADO_FECHA
+    ON T_EQUIVALENCIAS_CURSOS (ID_ESTADO, FECH_EQUIVALENCIA, ID_EQUIVALENCIA);
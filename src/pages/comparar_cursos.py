@@ -1,19 +1,25 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import logging
 import traceback
-import sys
+import io
+import time
+from src.utils.tablas import mostrar_tabla_por_paginas
+from src.utils.db import obtener_engine
+from src.utils.admin import es_admin, mostrar_estadisticas_pool, mostrar_metricas_consultas, mostrar_tiempos_secciones
+from src.utils.indices import construir_indices_referencia, indexar_por
+from src.utils.sugerencias import calcular_sugerencias, excluir_pares_existentes
+from src.utils.equivalencias import obtener_equivalencias_sincronizadas
+from src.utils.lectura import leer_sql_por_bloques
+from src.utils.metricas import registrar_consulta_por_bloques
+from src.utils.buscador import construir_indice_nombres, selector_con_busqueda
+from src.utils.tiempos import medir_seccion
 
-# Configuración de la página
-st.set_page_config(
-    page_title="Comparación de Cursos",
-    page_icon="🔄",
-    layout="wide"
-)
-
-# Estilo con colores del Gobierno de la Provincia de Córdoba
-st.markdown("""
+# Estilo con colores del Gobierno de la Provincia de Córdoba. Se aplica en main() y no al importar
+# el módulo: un st.markdown en la importación solo llegaba a la primera sesión del proceso
+ESTILOS = """
     <style>
     :root {
         --cordoba-azul: #004A93;
@@ -178,27 +184,74 @@ st.markdown("""
         border-radius: 6px;
     }
     </style>
-""", unsafe_allow_html=True)
-
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('comparacion_log.txt')
-    ]
-)
+"""
 
+# Sin logging.basicConfig: lo configura el script que se ejecuta (app.py, o el bloque final de este
+# archivo si se corre solo). Al importar, tomaba la configuración antes que app.py
 logger = logging.getLogger(__name__)
 
+# Tiempo máximo (segundos) que se reutilizan los datos de referencia sin volver a consultar la base
+TTL_DATOS_REFERENCIA = 600
+
+# Cursos históricos con sus horas desde T_RESUMEN_HORAS_CURSO (una fila por ID_CURSO,
+# mantenida por triggers, ver migrations/001_resumen_horas_curso.sql)
+QUERY_HISTORICO = """
+    SELECT cs.ID_CURSO, cs.N_CURSO, cs.ID_SECTOR, cs.N_SECTOR, COALESCE(rh.CANTIDAD_HS, 0) AS CANTIDAD_HS
+    FROM T_CURSOS_X_SECTOR cs
+    LEFT JOIN T_RESUMEN_HORAS_CURSO rh ON rh.ID_CURSO = cs.ID_CURSO
+    ORDER BY cs.N_CURSO
+"""
+
+# Equivalencias activas; la búsqueda, la paginación y el orden se agregan en _consulta_equivalencias
+QUERY_EQUIVALENCIAS = """
+    SELECT 
+        eq.ID_EQUIVALENCIA,
+        eq.N_CURSO_HISTORICO as curso_historico,
+        cs.N_SECTOR as sector_curso,
+        eq.N_CERTIF_ACTUAL as certificacion_actual,
+        eq.FECH_EQUIVALENCIA as fecha_creacion,
+        eq.OBSERVACIONES as observaciones,
+        ee.N_ESTADO as estado
+    FROM T_EQUIVALENCIAS_CURSOS eq
+    JOIN T_ESTADOS_EQUIVALENCIAS ee ON eq.ID_ESTADO = ee.ID_ESTADO
+    LEFT JOIN T_CURSOS_X_SECTOR cs ON eq.ID_CURSO_HISTORICO = cs.ID_CURSO
+    WHERE ee.N_ESTADO = 'ACTIVO'
+"""
+
+QUERY_CONTAR_EQUIVALENCIAS = """
+    SELECT COUNT(*)
+    FROM T_EQUIVALENCIAS_CURSOS eq
+    JOIN T_ESTADOS_EQUIVALENCIAS ee ON eq.ID_ESTADO = ee.ID_ESTADO
+    WHERE ee.N_ESTADO = 'ACTIVO'
+"""
+
+FILAS_POR_PAGINA_EQUIVALENCIAS = 25
+SUGERENCIAS_POR_CURSO = 3
+SUGERENCIAS_POR_PAGINA = 20
+FILAS_POR_CHUNK_EXPORTACION = 5000
+
+# Widgets de esta vista cuyo valor se conserva al pasar al dashboard y volver (ver src/utils/estado.py)
+CLAVES_ESTADO_WIDGETS = [
+    "busqueda_historicos", "sector_historicos", "busqueda_certificaciones", "sector_certificaciones",
+    "observacion_equivalencia", "busqueda_equivalencias",
+    "sector_sugerencias", "similitud_sugerencias", "sugerencias_por_curso", "pagina_sugerencias"
+] + [f"{tabla}_{campo}" for tabla in ("tabla_historicos", "tabla_certificaciones")
+     for campo in ("busqueda", "orden", "descendente", "pagina")] + [
+    f"{selector}_{campo}" for selector in ("cursos_equivalencia", "certificacion_equivalencia")
+    for campo in ("texto", "sector", "seleccion")]
+
+# Certificaciones actuales
+QUERY_CERTIFICACIONES = """
+    SELECT cl.ID_CERTIFICACION, cl.N_CERTIFICACION
+    FROM T_CERTIF_X_LOCALIDAD cl
+    GROUP BY cl.N_CERTIFICACION, cl.ID_CERTIFICACION
+    ORDER BY cl.N_CERTIFICACION
+"""
+
 def get_database_connection():
     try:
-        # Obtener credenciales desde secrets.toml
-        db_credentials = st.secrets["db_credentials"]
-        connection_string = f"mysql+pymysql://{db_credentials['DB_USER']}:{db_credentials['DB_PASSWORD']}@{db_credentials['DB_HOST']}:{db_credentials['DB_PORT']}/{db_credentials['DB_NAME']}"
-        engine = create_engine(connection_string)
-        return engine
+        # Engine compartido por todo el proceso (ver src/utils/db.py), no se crea uno por llamada
+        return obtener_engine()
     except Exception as e:
         st.error(f"Error al conectar con la base de datos: {str(e)}")
         return None
@@ -211,64 +264,108 @@ def eliminar_equivalencia_con_auditoria(engine, id_equivalencia, usuario):
             {"id_equivalencia": id_equivalencia, "usuario": usuario}
         )
         conn.commit()
+    obtener_equivalencias_sincronizadas().marcar_desactualizada()
+
+def crear_equivalencias_con_auditoria(engine, equivalencias, usuario):
+    """Crea varias equivalencias con su auditoría en una sola conexión y una sola transacción.
+
+    `equivalencias` es una lista de dicts con id_curso, n_curso, id_certificacion,
+    n_certificacion y observaciones. Si alguna falla se revierte el lote completo.
+    Devuelve (exito, resultados), con un dict por equivalencia que incluye su 'estado'
+    ('creada', 'error', 'revertida' o 'no procesada').
+    """
+    resultados = [dict(equivalencia, estado='no procesada') for equivalencia in equivalencias]
+    sentencia = text("CALL FN_INSERTA_EQUIVALENCIA_AUDITA (:id_curso, :n_curso, :id_certificacion, :n_certificacion, :observaciones, :usuario)")
+
+    with engine.connect() as conn:
+        transaccion = conn.begin()
+        try:
+            for resultado in resultados:
+                # Las llamadas a procedimientos no se pueden agrupar en un executemany,
+                # pero todas comparten la conexión y el commit final
+                result = conn.execute(sentencia, {
+                    "id_curso": int(resultado['id_curso']),
+                    "n_curso": resultado['n_curso'],
+                    "id_certificacion": int(resultado['id_certificacion']),
+                    "n_certificacion": resultado['n_certificacion'],
+                    "observaciones": resultado['observaciones'],
+                    "usuario": usuario
+                })
+                resultado['resultado'] = result.fetchone() if result.returns_rows else None
+                result.close()
+                resultado['estado'] = 'creada'
+            transaccion.commit()
+        except Exception as e:
+            transaccion.rollback()
+            logger.error(f"Error al crear equivalencias en lote, se revierte la transacción: {traceback.format_exc()}")
+            # La primera no procesada es la que falló; si no hay, falló el commit
+            fallida = next((r for r in resultados if r['estado'] == 'no procesada'), None)
+            for resultado in resultados:
+                if resultado['estado'] == 'creada':
+                    resultado['estado'] = 'revertida'
+                    if fallida is None:
+                        resultado['error'] = str(e)
+            if fallida is not None:
+                fallida['estado'] = 'error'
+                fallida['error'] = str(e)
+            return False, resultados
+
+    obtener_equivalencias_sincronizadas().marcar_desactualizada()
+    return True, resultados
 
 def crear_equivalencia_con_auditoria(engine, id_curso, n_curso, id_certificacion, n_certificacion, observaciones, usuario):
     """Crea una equivalencia y registra la acción en la tabla de auditoría"""
-    with engine.connect() as conn:
-        result = conn.execute(
-            text("CALL FN_INSERTA_EQUIVALENCIA_AUDITA (:id_curso, :n_curso, :id_certificacion, :n_certificacion, :observaciones, :usuario)"),
-            {
-                "id_curso": id_curso,
-                "n_curso": n_curso,
-                "id_certificacion": id_certificacion,
-                "n_certificacion": n_certificacion,
-                "observaciones": observaciones,
-                "usuario": usuario
-            }
-        )
-        conn.commit()
-        return result.fetchone()
+    exito, resultados = crear_equivalencias_con_auditoria(engine, [{
+        "id_curso": id_curso,
+        "n_curso": n_curso,
+        "id_certificacion": id_certificacion,
+        "n_certificacion": n_certificacion,
+        "observaciones": observaciones
+    }], usuario)
+    if not exito:
+        raise RuntimeError(resultados[0]['error'])
+    return resultados[0]['resultado']
+
+@st.cache_data(ttl=TTL_DATOS_REFERENCIA, show_spinner=False)
+def consultar_datos_referencia():
+    """Consulta cursos históricos y certificaciones; el resultado se comparte entre sesiones hasta que vence el TTL.
 
+    Crear o eliminar equivalencias no modifica estas tablas, así que no descarta esta caché.
+    """
+    engine = obtener_engine()
+
+    # Lectura por bloques con cursor del servidor: el resultado nunca está dos veces en memoria
+    df_historico = leer_sql_por_bloques(engine, QUERY_HISTORICO, categoricas=['N_SECTOR'])
+    df_certificaciones = leer_sql_por_bloques(engine, QUERY_CERTIFICACIONES)
+
+    # Procesar el campo N_CERTIFICACION para extraer el sector
+    df_certificaciones['N_SECTOR'] = df_certificaciones['N_CERTIFICACION'].apply(
+        lambda x: x.split(' - ')[1] if ' - ' in x else '')
+    df_certificaciones['N_CERTIFICACION'] = df_certificaciones['N_CERTIFICACION'].apply(
+        lambda x: x.split(' - ')[0] if ' - ' in x else x)
+
+    # Eliminar duplicados después de procesar
+    df_certificaciones = df_certificaciones.drop_duplicates(subset=['N_CERTIFICACION'])
+
+    # Índices por nombre, construidos una sola vez por carga de datos
+    indices = construir_indices_referencia(df_historico, df_certificaciones)
+    # Identifica esta carga, para que los índices de búsqueda se reconstruyan solo cuando se recargan los datos
+    indices['version'] = time.time()
+
+    return df_historico, df_certificaciones, indices
+
+@medir_seccion("comparar_cursos.load_data")
 def load_data():
     try:
         engine = get_database_connection()
         if engine is None:
-            return None, None
-
-        # Cargar datos de cursos históricos con suma de horas desde T_ALUMNOS_X_CURSOS
-        query_historico = """
-           SELECT cs.ID_CURSO, cs.N_CURSO, cs.ID_SECTOR, cs.N_SECTOR, COALESCE(ac.CANTIDAD_HS, 0) AS CANTIDAD_HS
-            FROM T_CURSOS_X_SECTOR cs
-            LEFT JOIN T_ALUMNOS_X_CURSOS ac ON cs.N_CURSO = ac.N_CURSO
-            GROUP BY cs.ID_CURSO, cs.N_CURSO, cs.ID_SECTOR, cs.N_SECTOR, ac.CANTIDAD_HS
-            ORDER BY cs.N_CURSO
-        """
-
-        # Cargar datos de certificaciones
-        query_certificaciones = """
-            SELECT cl.ID_CERTIFICACION, cl.N_CERTIFICACION
-            FROM T_CERTIF_X_LOCALIDAD cl
-            GROUP BY cl.N_CERTIFICACION, cl.ID_CERTIFICACION
-            ORDER BY cl.N_CERTIFICACION
-        """
-
-        df_historico = pd.read_sql(query_historico, engine)
-        df_certificaciones = pd.read_sql(query_certificaciones, engine)
-
-        # Procesar el campo N_CERTIFICACION para extraer el sector
-        df_certificaciones['N_SECTOR'] = df_certificaciones['N_CERTIFICACION'].apply(
-            lambda x: x.split(' - ')[1] if ' - ' in x else '')
-        df_certificaciones['N_CERTIFICACION'] = df_certificaciones['N_CERTIFICACION'].apply(
-            lambda x: x.split(' - ')[0] if ' - ' in x else x)
-
-        # Eliminar duplicados después de procesar
-        df_certificaciones = df_certificaciones.drop_duplicates(subset=['N_CERTIFICACION'])
-
-        return df_historico, df_certificaciones
+            return None, None, None
+
+        return consultar_datos_referencia()
     except Exception as e:
         logger.error(f"Error al cargar datos: {traceback.format_exc()}")
         st.error(f"Error al cargar los datos: {str(e)}")
-        return None, None
+        return None, None, None
 
 def mostrar_cursos_historicos(df_historico):
     """Muestra la tabla de cursos históricos con filtros simplificados"""
@@ -277,27 +374,31 @@ def mostrar_cursos_historicos(df_historico):
     # Filtros simplificados en una línea
     col1, col2 = st.columns([3, 1])
     with col1:
-        busqueda_curso = st.text_input("🔍 Buscar curso", placeholder="Escriba para filtrar...")
+        busqueda_curso = st.text_input("🔍 Buscar curso", placeholder="Escriba para filtrar...", key="busqueda_historicos")
     with col2:
         sector_options = ['Todos'] + sorted(df_historico['N_SECTOR'].unique().tolist())
-        sector_selected = st.selectbox("Sector", sector_options)
+        sector_selected = st.selectbox("Sector", sector_options, key="sector_historicos")
     
-    # Aplicar filtros
-    df_filtrado = df_historico.copy()
+    # Aplicar filtros: una sola máscara sobre los datos en caché, sin copiarlos
+    mascara = np.ones(len(df_historico), dtype=bool)
     
     if sector_selected != 'Todos':
-        df_filtrado = df_filtrado[df_filtrado['N_SECTOR'] == sector_selected]
+        mascara &= (df_historico['N_SECTOR'] == sector_selected).to_numpy()
         
     if busqueda_curso:
-        df_filtrado = df_filtrado[df_filtrado['N_CURSO'].str.contains(busqueda_curso, case=False, na=False)]
+        mascara &= df_historico['N_CURSO'].str.contains(busqueda_curso, case=False, na=False).to_numpy(dtype=bool)
     
-        # Mostrar resultados
-    st.caption(f"Mostrando {len(df_filtrado)} de {len(df_historico)} cursos")
+    filas = np.flatnonzero(mascara)
+    
+    # Mostrar resultados
+    st.caption(f"Mostrando {len(filas)} de {len(df_historico)} cursos")
     
-    if not df_filtrado.empty:
-        st.dataframe(
-            df_filtrado[['N_CURSO', 'N_SECTOR', 'CANTIDAD_HS']],  # Agregamos CANTIDAD_HS
-            use_container_width=True,
+    if len(filas) > 0:
+        mostrar_tabla_por_paginas(
+            df_historico,
+            key="tabla_historicos",
+            filas=filas,
+            columnas=['N_CURSO', 'N_SECTOR', 'CANTIDAD_HS'],  # Agregamos CANTIDAD_HS
             hide_index=True,
             column_config={
                 "N_CURSO": st.column_config.TextColumn("Nombre del Curso"),
@@ -315,27 +416,31 @@ def mostrar_certificaciones(df_certificaciones):
     # Filtros simplificados en una línea
     col1, col2 = st.columns([3, 1])
     with col1:
-        busqueda_cert = st.text_input("🔍 Buscar certificación", placeholder="Escriba para filtrar...")
+        busqueda_cert = st.text_input("🔍 Buscar certificación", placeholder="Escriba para filtrar...", key="busqueda_certificaciones")
     with col2:
         sector_options = ['Todos'] + sorted(df_certificaciones['N_SECTOR'].unique().tolist())
-        sector_selected = st.selectbox("Sector", sector_options)
+        sector_selected = st.selectbox("Sector", sector_options, key="sector_certificaciones")
     
-    # Aplicar filtros
-    df_filtrado = df_certificaciones.copy()
+    # Aplicar filtros: una sola máscara sobre los datos en caché, sin copiarlos
+    mascara = np.ones(len(df_certificaciones), dtype=bool)
     
     if sector_selected != 'Todos':
-        df_filtrado = df_filtrado[df_filtrado['N_SECTOR'] == sector_selected]
+        mascara &= (df_certificaciones['N_SECTOR'] == sector_selected).to_numpy()
         
     if busqueda_cert:
-        df_filtrado = df_filtrado[df_filtrado['N_CERTIFICACION'].str.contains(busqueda_cert, case=False, na=False)]
+        mascara &= df_certificaciones['N_CERTIFICACION'].str.contains(busqueda_cert, case=False, na=False).to_numpy(dtype=bool)
+    
+    filas = np.flatnonzero(mascara)
     
     # Mostrar resultados
-    st.caption(f"Mostrando {len(df_filtrado)} de {len(df_certificaciones)} certificaciones")
+    st.caption(f"Mostrando {len(filas)} de {len(df_certificaciones)} certificaciones")
     
-    if not df_filtrado.empty:
-        st.dataframe(
-            df_filtrado[['N_CERTIFICACION', 'N_SECTOR']],  # Solo mostramos estos campos, pero ID_CERTIFICACION sigue en el DataFrame
-            use_container_width=True,
+    if len(filas) > 0:
+        mostrar_tabla_por_paginas(
+            df_certificaciones,
+            key="tabla_certificaciones",
+            filas=filas,
+            columnas=['N_CERTIFICACION', 'N_SECTOR'],  # Solo mostramos estos campos, pero ID_CERTIFICACION sigue en el DataFrame
             hide_index=True,
             column_config={
                 "N_CERTIFICACION": st.column_config.TextColumn("Nombre de Certificación"),
@@ -345,7 +450,7 @@ def mostrar_certificaciones(df_certificaciones):
     else:
         st.info("No se encontraron certificaciones con los filtros aplicados")
 
-def marcar_equivalencias(df_historico, df_certificaciones):
+def marcar_equivalencias(df_historico, df_certificaciones, indices):
     st.markdown('<div class="header-container"><span class="header-icon">🔗</span><span class="header-text">Crear Equivalencias</span></div>', unsafe_allow_html=True)
     
     # Estilos adicionales para mejorar la presentación
@@ -536,19 +641,34 @@ def marcar_equivalencias(df_historico, df_certificaciones):
     st.markdown('<div class="equivalencias-section">', unsafe_allow_html=True)
     st.markdown('<div class="section-title">Paso 1: Seleccionar cursos históricos</div>', unsafe_allow_html=True)
     
-            # Selector de cursos históricos
-    cursos_historicos = st.multiselect(
+    # Equivalencias activas en memoria, para marcar cursos ya vinculados y descartar duplicados sin ir a la base
+    engine = get_database_connection()
+    equivalencias_activas = obtener_equivalencias_sincronizadas().sincronizar(engine) if engine is not None else None
+    cantidad_por_curso = equivalencias_activas.cantidad_por_curso if equivalencias_activas is not None else {}
+    
+    def formato_curso(nombre):
+        curso_info = indices['cursos'].get(nombre)
+        cantidad = cantidad_por_curso.get(curso_info['ID_CURSO'], 0) if curso_info else 0
+        return f"{nombre} 🔗 {cantidad}" if cantidad else nombre
+    
+    # Selector de cursos históricos: solo se envían al navegador las coincidencias de la búsqueda
+    indice_cursos = construir_indice_nombres(df_historico['N_CURSO'], df_historico['N_SECTOR'], ('cursos', indices['version']))
+    cursos_historicos = selector_con_busqueda(
+        indice_cursos,
         "🔍 Buscar y seleccionar cursos históricos",
-        df_historico['N_CURSO'].unique(),
-        format_func=lambda x: f"{x}",
-        help="Seleccione uno o más cursos históricos para crear equivalencias"
+        key="cursos_equivalencia",
+        multiple=True,
+        ayuda="Seleccione uno o más cursos históricos para crear equivalencias. 🔗 indica cuántas equivalencias activas ya tiene el curso",
+        format_func=formato_curso
     )
+    # Una selección conservada en la sesión puede nombrar cursos que ya no están tras recargar los datos
+    cursos_historicos = [curso for curso in cursos_historicos if curso in indices['cursos']]
     
     # Mostrar cursos seleccionados en un diseño mejorado
     if cursos_historicos:
         
         for curso in cursos_historicos:
-            curso_info = df_historico[df_historico['N_CURSO'] == curso].iloc[0]
+            curso_info = indices['cursos'][curso]
             st.markdown(f"""
             <div class="seleccion-card">
             <div class="card-title"><span class="card-title-icon">📚</span> Cursos seleccionados</div> 
@@ -564,16 +684,19 @@ def marcar_equivalencias(df_historico, df_certificaciones):
     st.markdown('<div class="section-title">Paso 2: Seleccionar certificación</div>', unsafe_allow_html=True)
     
     # Selector de certificación
-    certificacion = st.selectbox(
+    indice_certificaciones = construir_indice_nombres(
+        df_certificaciones['N_CERTIFICACION'], df_certificaciones['N_SECTOR'], ('certificaciones', indices['version'])
+    )
+    certificacion = selector_con_busqueda(
+        indice_certificaciones,
         "🔍 Buscar y seleccionar certificación",
-        df_certificaciones['N_CERTIFICACION'].unique(),
-        format_func=lambda x: f"{x}",
-        help="Seleccione la certificación actual a la que equivalen los cursos históricos"
+        key="certificacion_equivalencia",
+        ayuda="Seleccione la certificación actual a la que equivalen los cursos históricos"
     )
     
     # Mostrar certificación seleccionada en un diseño mejorado
     if certificacion:
-        cert_info = df_certificaciones[df_certificaciones['N_CERTIFICACION'] == certificacion].iloc[0]
+        cert_info = indices['certificaciones'][certificacion]
         st.markdown(f"""
         <div class="seleccion-card">
             <div class="card-title"><span class="card-title-icon">🏆</span> Certificación seleccionada</div>
@@ -584,6 +707,22 @@ def marcar_equivalencias(df_historico, df_certificaciones):
     
     st.markdown('</div>', unsafe_allow_html=True)  # Cierre de sección de certificación
     
+    # Cursos seleccionados que ya son equivalentes a la certificación elegida
+    duplicados = []
+    if cursos_historicos and certificacion and equivalencias_activas is not None:
+        id_certificacion_elegida = indices['certificaciones'][certificacion]['ID_CERTIFICACION']
+        duplicados = [
+            curso for curso in cursos_historicos
+            if equivalencias_activas.existe(indices['cursos'][curso]['ID_CURSO'], id_certificacion_elegida)
+        ]
+        if duplicados:
+            st.markdown(f"""
+            <div class="warning-text">
+            Ya existe una equivalencia activa con "{certificacion}" para: <strong>{', '.join(duplicados)}</strong>.
+            Estos cursos no se volverán a crear.
+            </div>
+            """, unsafe_allow_html=True)
+    
     # Sección de observaciones
     st.markdown('<div class="equivalencias-section">', unsafe_allow_html=True)
     st.markdown('<div class="section-title">Paso 3: Agregar observaciones (opcional)</div>', unsafe_allow_html=True)
@@ -592,7 +731,8 @@ def marcar_equivalencias(df_historico, df_certificaciones):
     observacion = st.text_area(
         "Observaciones",
         placeholder="Ingrese observaciones sobre esta equivalencia...",
-        help="Puede agregar notas o aclaraciones sobre esta equivalencia"
+        help="Puede agregar notas o aclaraciones sobre esta equivalencia",
+        key="observacion_equivalencia"
     )
     
     st.markdown('</div>', unsafe_allow_html=True)  # Cierre de sección de observaciones
@@ -602,7 +742,7 @@ def marcar_equivalencias(df_historico, df_certificaciones):
         st.markdown(f"""
         <div class="resumen-equivalencia">
             <div class="card-title"><span class="card-title-icon">📋</span> Resumen de equivalencia</div>
-            <p>Se establecerá que <strong>{len(cursos_historicos)} curso(s)</strong> histórico(s) son equivalentes a la certificación <strong>"{certificacion}"</strong>.</p>
+            <p>Se establecerá que <strong>{len(cursos_historicos) - len(duplicados)} curso(s)</strong> histórico(s) son equivalentes a la certificación <strong>"{certificacion}"</strong>.</p>
             <p><strong>Observaciones:</strong> {observacion if observacion.strip() else "Sin observaciones adicionales"}</p>
         </div>
         """, unsafe_allow_html=True)
@@ -611,15 +751,15 @@ def marcar_equivalencias(df_historico, df_certificaciones):
     resultado_container = st.container()
     
     # En la parte donde se procesa el botón de crear equivalencia
-    if st.button("Crear Equivalencia", key="crear_equivalencia", disabled=not (cursos_historicos and certificacion)):
+    if st.button("Crear Equivalencia", key="crear_equivalencia", disabled=not (cursos_historicos and certificacion) or len(duplicados) == len(cursos_historicos)):
         if not cursos_historicos or not certificacion:
             st.warning("Debe seleccionar al menos un curso histórico y una certificación.")
         else:
             try:
                 # Obtener el ID de la certificación seleccionada
-                cert_row = df_certificaciones[df_certificaciones['N_CERTIFICACION'] == certificacion]
+                cert_info = indices['certificaciones'].get(certificacion)
                 
-                if cert_row.empty:
+                if cert_info is None:
                     st.error(f"No se encontró el ID para la certificación {certificacion}")
                     # Mostrar información de depuración
                     st.write("Certificaciones disponibles:")
@@ -628,36 +768,56 @@ def marcar_equivalencias(df_historico, df_certificaciones):
                     st.write("Primeros 5 caracteres de cada certificación:")
                     st.write(df_certificaciones['N_CERTIFICACION'].apply(lambda x: x[:5]).head(10))
                 else:
-                    id_certificacion = cert_row.iloc[0]['ID_CERTIFICACION']
+                    id_certificacion = cert_info['ID_CERTIFICACION']
                     
                     # Continuar con la creación de equivalencias
-                    engine = get_database_connection()
                     if engine:
-                        # Crear equivalencias para cada curso seleccionado
+                        # Una equivalencia por curso seleccionado sin equivalencia previa, todas en la misma transacción
+                        equivalencias = []
                         for curso in cursos_historicos:
-                            curso_info = df_historico[df_historico['N_CURSO'] == curso].iloc[0]
-                            id_curso = curso_info['ID_CURSO']
-                            
-                            # Llamar al procedimiento almacenado para crear la equivalencia
-                            crear_equivalencia_con_auditoria(
-                                engine, 
-                                id_curso, 
-                                curso, 
-                                id_certificacion, 
-                                certificacion, 
-                                observacion, 
-                                st.session_state.get('usuario', 'sistema')
+                            if curso in duplicados:
+                                continue
+                            curso_info = indices['cursos'][curso]
+                            equivalencias.append({
+                                "id_curso": curso_info['ID_CURSO'],
+                                "n_curso": curso,
+                                "id_certificacion": id_certificacion,
+                                "n_certificacion": certificacion,
+                                "observaciones": observacion
+                            })
+                        
+                        exito, resultados = crear_equivalencias_con_auditoria(
+                            engine,
+                            equivalencias,
+                            st.session_state.get('usuario', 'sistema')
+                        )
+                        
+                        if not exito:
+                            st.markdown('<div class="error-text">No se creó ninguna equivalencia: la operación se revirtió por completo.</div>', unsafe_allow_html=True)
+                            st.dataframe(
+                                pd.DataFrame(resultados)[['n_curso', 'estado']].assign(
+                                    error=[r.get('error', '') for r in resultados]
+                                ),
+                                use_container_width=True,
+                                hide_index=True,
+                                column_config={
+                                    "n_curso": st.column_config.TextColumn("Curso Histórico"),
+                                    "estado": st.column_config.TextColumn("Estado"),
+                                    "error": st.column_config.TextColumn("Error")
+                                }
                             )
+                            return
                         
                         # Mostrar mensaje de éxito
                         st.markdown(f"""
                         <div class="success-message">
                             <div class="success-title">✅ Equivalencia creada con éxito</div>
-                            <p>Se ha establecido la equivalencia entre {len(cursos_historicos)} curso(s) y la certificación "{certificacion}".</p>
+                            <p>Se ha establecido la equivalencia entre {len(equivalencias)} curso(s) y la certificación "{certificacion}".</p>
                         </div>
                         """, unsafe_allow_html=True)
                         
                         # Limpiar selecciones después de crear la equivalencia
+                        st.session_state.pop('cursos_equivalencia_seleccion', None)
                         st.rerun()
             except Exception as e:
                 st.error(f"Error al crear la equivalencia: {str(e)}")
@@ -665,48 +825,98 @@ def marcar_equivalencias(df_historico, df_certificaciones):
     elif not (cursos_historicos and certificacion):
         resultado_container.markdown("<div class='warning-text'>Debe seleccionar al menos un curso histórico y una certificación.</div>", unsafe_allow_html=True)
 
+def _escapar_like(texto):
+    """Escapa los comodines de LIKE para buscar el texto literal (con ESCAPE '!', válido en MySQL y SQLite)"""
+    return texto.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+def _filtro_busqueda_equivalencias(engine, busqueda):
+    """Condición SQL y parámetros para buscar el texto en cualquier parte del curso o la certificación.
+
+    Igual que el filtro anterior en pandas (str.contains): encuentra también fragmentos de una
+    palabra (p. ej. "formática"), sin depender del largo de las palabras ni de stopwords.
+    """
+    if not busqueda:
+        return "", {}
+    return (
+        " AND (eq.N_CURSO_HISTORICO LIKE :busqueda ESCAPE '!' OR eq.N_CERTIF_ACTUAL LIKE :busqueda ESCAPE '!')",
+        {"busqueda": f"%{_escapar_like(busqueda)}%"}
+    )
+
+def _consulta_equivalencias(filtro, despues_de=None, limite=None):
+    """Arma la consulta paginada por clave (FECH_EQUIVALENCIA, ID_EQUIVALENCIA), de la más reciente a la más antigua"""
+    sql = QUERY_EQUIVALENCIAS + filtro
+    params = {}
+    if despues_de is not None:
+        sql += """ AND (eq.FECH_EQUIVALENCIA < :ultima_fecha
+                   OR (eq.FECH_EQUIVALENCIA = :ultima_fecha AND eq.ID_EQUIVALENCIA < :ultimo_id))"""
+        params.update({"ultima_fecha": despues_de[0], "ultimo_id": despues_de[1]})
+    sql += " ORDER BY eq.FECH_EQUIVALENCIA DESC, eq.ID_EQUIVALENCIA DESC"
+    if limite is not None:
+        sql += " LIMIT :limite"
+        params["limite"] = limite
+    return sql, params
+
+# Las consultas de "Ver Equivalencias" se cachean por versión de las equivalencias sincronizadas
+# (src/utils/equivalencias.py): mientras nadie cree ni elimine equivalencias, los reruns no consultan la base
+@st.cache_data(ttl=TTL_DATOS_REFERENCIA, max_entries=256, show_spinner=False)
+def contar_equivalencias(_engine, busqueda="", version=0):
+    """Cantidad de equivalencias activas que coinciden con la búsqueda (consulta COUNT separada)"""
+    filtro, params = _filtro_busqueda_equivalencias(_engine, busqueda)
+    with _engine.connect() as conn:
+        return conn.execute(text(QUERY_CONTAR_EQUIVALENCIAS + filtro), params).scalar()
+
+@st.cache_data(ttl=TTL_DATOS_REFERENCIA, max_entries=256, show_spinner=False)
+def obtener_pagina_equivalencias(_engine, busqueda="", despues_de=None, filas=FILAS_POR_PAGINA_EQUIVALENCIAS, version=0):
+    """Devuelve (página, hay_más): las `filas` equivalencias siguientes a la clave `despues_de`"""
+    filtro, params_busqueda = _filtro_busqueda_equivalencias(_engine, busqueda)
+    sql, params = _consulta_equivalencias(filtro, despues_de, limite=filas + 1)
+    df_pagina = leer_sql_por_bloques(_engine, sql, {**params_busqueda, **params}, fechas=['fecha_creacion'])
+    return df_pagina.head(filas), len(df_pagina) > filas
+
+def exportar_equivalencias_csv(engine, busqueda=""):
+    """CSV con todas las equivalencias que coinciden, leídas por bloques con un cursor del lado del servidor"""
+    filtro, params_busqueda = _filtro_busqueda_equivalencias(engine, busqueda)
+    sql, params = _consulta_equivalencias(filtro)
+    salida = io.StringIO()
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True)
+        filas = 0
+        for i, chunk in enumerate(pd.read_sql(text(sql), conn, params={**params_busqueda, **params}, chunksize=FILAS_POR_CHUNK_EXPORTACION)):
+            chunk.to_csv(salida, index=False, header=(i == 0))
+            filas += len(chunk)
+        registrar_consulta_por_bloques(conn, filas)
+    return salida.getvalue().encode('utf-8')
+
 def mostrar_equivalencias_existentes():
-    """Función simplificada para mostrar equivalencias existentes"""
+    """Muestra las equivalencias existentes con búsqueda y paginación resueltas en la base"""
     st.markdown('<div class="header-container"><span class="header-icon">📋</span><span class="header-text">Equivalencias Existentes</span></div>', unsafe_allow_html=True)
     
     try:
         engine = get_database_connection()
         if engine is not None:
-            query = """
-                SELECT 
-                    eq.ID_EQUIVALENCIA,
-                    eq.N_CURSO_HISTORICO as curso_historico,
-                    cs.N_SECTOR as sector_curso,
-                    eq.N_CERTIF_ACTUAL as certificacion_actual,
-                    eq.FECH_EQUIVALENCIA as fecha_creacion,
-                    eq.OBSERVACIONES as observaciones,
-                    ee.N_ESTADO as estado
-                FROM T_EQUIVALENCIAS_CURSOS eq
-                JOIN T_ESTADOS_EQUIVALENCIAS ee ON eq.ID_ESTADO = ee.ID_ESTADO
-                LEFT JOIN T_CURSOS_X_SECTOR cs ON eq.ID_CURSO_HISTORICO = cs.ID_CURSO
-                WHERE ee.N_ESTADO = 'ACTIVO'
-                ORDER BY eq.FECH_EQUIVALENCIA DESC
-            """
-            df_equivalencias = pd.read_sql(query, engine)
-            
             # Filtros simplificados
-            busqueda = st.text_input("🔍 Buscar equivalencia", placeholder="Buscar por curso o certificación...")
+            busqueda = st.text_input("🔍 Buscar equivalencia", placeholder="Buscar por curso o certificación...", key="busqueda_equivalencias")
+            
+            # Claves de inicio de cada página visitada; se reinician al cambiar la búsqueda
+            if st.session_state.get('equivalencias_busqueda') != busqueda:
+                st.session_state.equivalencias_busqueda = busqueda
+                st.session_state.equivalencias_cursores = [None]
+            cursores = st.session_state.equivalencias_cursores
             
-            # Aplicar filtro de búsqueda
-            df_eq_filtrado = df_equivalencias.copy()
-            if busqueda:
-                df_eq_filtrado = df_eq_filtrado[
-                    df_eq_filtrado['curso_historico'].str.contains(busqueda, case=False, na=False) |
-                    df_eq_filtrado['certificacion_actual'].str.contains(busqueda, case=False, na=False)
-                ]
+            with medir_seccion("comparar_cursos.consultas_equivalencias"):
+                # Solo se consultan los cambios desde la última sincronización (a lo sumo cada pocos segundos)
+                equivalencias = obtener_equivalencias_sincronizadas().sincronizar(engine)
+                total_equivalencias = len(equivalencias.df)
+                total_filtrado = contar_equivalencias(engine, busqueda, version=equivalencias.version) if busqueda else total_equivalencias
+                df_eq_filtrado, hay_siguiente = obtener_pagina_equivalencias(engine, busqueda, cursores[-1], version=equivalencias.version)
             
             # Mostrar contador de resultados
-            st.caption(f"Mostrando {len(df_eq_filtrado)} de {len(df_equivalencias)} equivalencias")
+            st.caption(f"Mostrando {len(df_eq_filtrado)} de {total_filtrado} equivalencias encontradas ({total_equivalencias} en total) - Página {len(cursores)}")
             
-            if df_equivalencias.empty:
+            if total_equivalencias == 0:
                 st.markdown('<div class="info-text">No hay equivalencias registradas aún. Utilice la sección "Crear Equivalencias" para comenzar.</div>', unsafe_allow_html=True)
             else:
-                # Mostrar tabla de equivalencias
+                # Mostrar tabla de equivalencias (solo la página actual)
                 st.dataframe(
                     df_eq_filtrado,
                     use_container_width=True,
@@ -725,30 +935,43 @@ def mostrar_equivalencias_existentes():
                     }
                 )
                 
-                # Exportar a CSV
-                csv = df_eq_filtrado.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    label="Exportar a CSV",
-                    data=csv,
-                    file_name="equivalencias.csv",
-                    mime="text/csv"
-                )
+                # Navegación por clave: la página siguiente empieza después de la última fila mostrada
+                col1, col2, col3 = st.columns([1, 3, 1])
+                with col1:
+                    if st.button("◀️ Anterior", key="equivalencias_anterior", disabled=len(cursores) == 1):
+                        cursores.pop()
+                        st.rerun()
+                with col3:
+                    if st.button("Siguiente ▶️", key="equivalencias_siguiente", disabled=not hay_siguiente):
+                        ultima = df_eq_filtrado.iloc[-1]
+                        cursores.append((ultima['fecha_creacion'].to_pydatetime(), int(ultima['ID_EQUIVALENCIA'])))
+                        st.rerun()
+                
+                # Exportar a CSV: se genera solo cuando se pide, recorriendo todos los resultados por bloques
+                if st.button("Preparar exportación CSV", key="preparar_exportacion_equivalencias"):
+                    st.download_button(
+                        label="Exportar a CSV",
+                        data=exportar_equivalencias_csv(engine, busqueda),
+                        file_name="equivalencias.csv",
+                        mime="text/csv"
+                    )
                 
                 # Sección para eliminar equivalencias 
                 st.markdown('<div class="header-container"><span class="header-icon">🗑️</span><span class="header-text">Eliminar Equivalencia</span></div>', unsafe_allow_html=True) 
                 
-                # Selector de ID con dropdown 
+                # Selector de ID con dropdown (equivalencias de la página actual)
                 ids_disponibles = df_eq_filtrado['ID_EQUIVALENCIA'].tolist() 
+                equivalencias_por_id = indexar_por(df_eq_filtrado, 'ID_EQUIVALENCIA')
                 if ids_disponibles: 
                     id_seleccionado = st.selectbox( 
                         "Seleccione la equivalencia a eliminar", 
                         options=ids_disponibles, 
-                        format_func=lambda x: f"ID: {x} - {df_eq_filtrado[df_eq_filtrado['ID_EQUIVALENCIA'] == x]['curso_historico'].values[0]} → {df_eq_filtrado[df_eq_filtrado['ID_EQUIVALENCIA'] == x]['certificacion_actual'].values[0]}" 
+                        format_func=lambda x: f"ID: {x} - {equivalencias_por_id[x]['curso_historico']} → {equivalencias_por_id[x]['certificacion_actual']}" 
                     ) 
                     
                     # Mostrar detalles de la equivalencia seleccionada 
                     if id_seleccionado: 
-                        eq_seleccionada = df_eq_filtrado[df_eq_filtrado['ID_EQUIVALENCIA'] == id_seleccionado].iloc[0] 
+                        eq_seleccionada = equivalencias_por_id[id_seleccionado] 
                         st.markdown(f""" 
                         <div class="info-text"> 
                         <strong>Curso:</strong> {eq_seleccionada['curso_historico']}<br> 
@@ -776,8 +999,82 @@ def mostrar_equivalencias_existentes():
         st.markdown(f'<div class="error-text">Error al mostrar equivalencias existentes: {str(e)}</div>', unsafe_allow_html=True)
         logger.error(f"Error al mostrar equivalencias: {traceback.format_exc()}")
 
+def revisar_sugerencias(df_historico, df_certificaciones):
+    """Sugerencias automáticas de equivalencias por similitud de nombres, aceptables con un clic"""
+    st.markdown('<div class="header-container"><span class="header-icon">💡</span><span class="header-text">Sugerencias de Equivalencias</span></div>', unsafe_allow_html=True)
+    
+    engine = get_database_connection()
+    if engine is None:
+        return
+    
+    try:
+        # Se calculan todas juntas y se cachean por versión de los datos; los pares existentes se excluyen después
+        with medir_seccion("comparar_cursos.sugerencias"):
+            sugerencias = calcular_sugerencias(df_historico, df_certificaciones, k=SUGERENCIAS_POR_CURSO + 5)
+            pares_existentes = obtener_equivalencias_sincronizadas().sincronizar(engine).pares()
+            sugerencias = excluir_pares_existentes(sugerencias, pares_existentes)
+    except Exception as e:
+        st.markdown(f'<div class="error-text">Error al calcular sugerencias: {str(e)}</div>', unsafe_allow_html=True)
+        logger.error(f"Error al calcular sugerencias: {traceback.format_exc()}")
+        return
+    
+    # Filtros
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        sector_options = ['Todos'] + sorted(df_historico['N_SECTOR'].dropna().unique().tolist())
+        sector_selected = st.selectbox("Sector del curso", sector_options, key="sector_sugerencias")
+    # Valores iniciales en session_state y no en `value`: el estado se conserva al cambiar de vista
+    st.session_state.setdefault("similitud_sugerencias", 0.5)
+    st.session_state.setdefault("sugerencias_por_curso", 1)
+    with col2:
+        similitud_minima = st.slider("Similitud mínima", min_value=0.0, max_value=1.0, step=0.05, key="similitud_sugerencias")
+    with col3:
+        por_curso = st.number_input("Por curso", min_value=1, max_value=SUGERENCIAS_POR_CURSO, key="sugerencias_por_curso")
+    
+    # Los dos filtros se combinan en una máscara y se seleccionan las filas una sola vez
+    mascara = sugerencias['SIMILITUD'] >= similitud_minima
+    if sector_selected != 'Todos':
+        mascara &= sugerencias['N_SECTOR'] == sector_selected
+    sugerencias = sugerencias[mascara]
+    # Ya vienen ordenadas por similitud: head() por curso deja las mejores
+    sugerencias = sugerencias.groupby('ID_CURSO', sort=False).head(por_curso)
+    
+    st.caption(f"{len(sugerencias)} sugerencias para {sugerencias['ID_CURSO'].nunique()} cursos históricos")
+    if sugerencias.empty:
+        st.info("No hay sugerencias con los filtros aplicados")
+        return
+    
+    total_paginas = (len(sugerencias) + SUGERENCIAS_POR_PAGINA - 1) // SUGERENCIAS_POR_PAGINA
+    st.session_state['pagina_sugerencias'] = min(st.session_state.get('pagina_sugerencias', 1), total_paginas)
+    pagina = st.number_input(f"Página (de {total_paginas})", min_value=1, max_value=total_paginas, step=1, key="pagina_sugerencias")
+    inicio = (pagina - 1) * SUGERENCIAS_POR_PAGINA
+    
+    for sugerencia in sugerencias.iloc[inicio:inicio + SUGERENCIAS_POR_PAGINA].itertuples(index=False):
+        col1, col2, col3, col4 = st.columns([4, 4, 1, 1])
+        col1.markdown(f"**{sugerencia.N_CURSO}**  \n{sugerencia.N_SECTOR}")
+        col2.markdown(f"**{sugerencia.N_CERTIFICACION}**  \n{sugerencia.N_SECTOR_CERTIFICACION}")
+        col3.metric("Similitud", f"{sugerencia.SIMILITUD:.2f}", label_visibility="collapsed")
+        with col4:
+            if st.button("✅ Aceptar", key=f"aceptar_{sugerencia.ID_CURSO}_{sugerencia.ID_CERTIFICACION}"):
+                try:
+                    crear_equivalencia_con_auditoria(
+                        engine,
+                        sugerencia.ID_CURSO,
+                        sugerencia.N_CURSO,
+                        sugerencia.ID_CERTIFICACION,
+                        sugerencia.N_CERTIFICACION,
+                        f"Sugerencia automática (similitud {sugerencia.SIMILITUD:.2f})",
+                        st.session_state.get('usuario', 'sistema')
+                    )
+                    st.rerun()
+                except Exception as e:
+                    st.markdown(f'<div class="error-text">Error al crear la equivalencia: {str(e)}</div>', unsafe_allow_html=True)
+                    logger.error(f"Error al aceptar sugerencia: {traceback.format_exc()}")
+
 def main():
     """Función principal con diseño mejorado"""
+    st.markdown(ESTILOS, unsafe_allow_html=True)
+    
     # Encabezado con logo
     st.markdown("""
     <div class="gobierno-logo">
@@ -787,23 +1084,25 @@ def main():
     """, unsafe_allow_html=True)
     
     # Cargar datos
-    df_historico, df_certificaciones = load_data()
+    df_historico, df_certificaciones, indices = load_data()
     
     if df_historico is None or df_certificaciones is None:
         st.error("No se pudieron cargar los datos. Por favor, verifica la conexión a la base de datos.")
         return
     
     # Menú de navegación mejorado
-    menu = ["Explorar Cursos", "Crear Equivalencias", "Ver Equivalencias"]
+    menu = ["Explorar Cursos", "Crear Equivalencias", "Ver Equivalencias", "Sugerencias"]
     
     # Crear pestañas con estilo mejorado
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     with col1:
         btn1 = st.button("📚 Explorar Cursos y Certificaciones actuales", use_container_width=True)
     with col2:
         btn2 = st.button("🔗 Crear Equivalencias", use_container_width=True)
     with col3:
         btn3 = st.button("📋 Ver Equivalencias", use_container_width=True)
+    with col4:
+        btn4 = st.button("💡 Revisar Sugerencias", use_container_width=True)
     
     # Inicializar estado de sesión si no existe
     if 'menu_option' not in st.session_state:
@@ -816,6 +1115,8 @@ def main():
         st.session_state.menu_option = "Crear Equivalencias"
     elif btn3:
         st.session_state.menu_option = "Ver Equivalencias"
+    elif btn4:
+        st.session_state.menu_option = "Sugerencias"
     
     st.markdown("<hr>", unsafe_allow_html=True)
     
@@ -828,11 +1129,23 @@ def main():
             mostrar_certificaciones(df_certificaciones)
     
     elif st.session_state.menu_option == "Crear Equivalencias":
-        marcar_equivalencias(df_historico, df_certificaciones)
+        marcar_equivalencias(df_historico, df_certificaciones, indices)
     
     elif st.session_state.menu_option == "Ver Equivalencias":
         mostrar_equivalencias_existentes()
     
+    elif st.session_state.menu_option == "Sugerencias":
+        revisar_sugerencias(df_historico, df_certificaciones)
+    
+    # Panel de administración, solo visible con el token de administrador
+    if es_admin():
+        with st.expander("🛠️ Panel de administración"):
+            engine = get_database_connection()
+            if engine is not None:
+                mostrar_estadisticas_pool(engine)
+                mostrar_metricas_consultas()
+            mostrar_tiempos_secciones()
+    
     # Pie de página
     st.markdown("""
     <div class="footer">
@@ -843,4 +1156,12 @@ def main():
 
 # Ejecutar la aplicación
 if __name__ == "__main__":
+    pd.set_option("mode.copy_on_write", True)
+    st.set_page_config(
+        page_title="Comparación de Cursos",
+        page_icon="🔄",
+        layout="wide"
+    )
+    from src.utils.registro import configurar_logging
+    configurar_logging('comparacion_log.txt')
     main()
\ No newline at end of file
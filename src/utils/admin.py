@@ -0,0 +1,87 @@
+import hmac
+
+import streamlit as st
+
+from src.utils.metricas import obtener_registro_metricas
+from src.utils.tiempos import sesion_y_rerun, obtener_registro_tiempos
+
+
+def es_admin() -> bool:
+    """El panel de administración se habilita con ?admin=<token> si coincide con [admin] token de secrets.toml"""
+    try:
+        token = st.secrets["admin"]["token"]
+    except Exception:
+        return False
+    recibido = st.query_params.get("admin", "")
+    return bool(token) and hmac.compare_digest(str(recibido), str(token))
+
+
+def mostrar_estadisticas_pool(engine):
+    """Estado del pool de conexiones a MySQL, para dimensionarlo según la cantidad de operadores"""
+    # Importado al usarse: cursos.py usa este módulo sin base de datos y no debe cargar SQLAlchemy
+    from src.utils.db import estadisticas_pool
+    estadisticas = estadisticas_pool(engine)
+    st.markdown("**Pool de conexiones**")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("En uso", f"{estadisticas['en_uso']} / {estadisticas['tamaño']}")
+    col2.metric("Overflow", f"{estadisticas['overflow']} / {estadisticas['max_overflow']}")
+    col3.metric("Espera promedio", f"{estadisticas.get('espera_promedio_ms', 0)} ms")
+    col4.metric("Espera máxima", f"{estadisticas.get('espera_max_ms', 0)} ms")
+    st.json(estadisticas, expanded=False)
+
+
+def mostrar_metricas_consultas():
+    """Latencia por consulta y espera por conexión, para distinguir lentitud de la base de lentitud de la app"""
+    registro = obtener_registro_metricas()
+    st.markdown(f"**Consultas SQL** (desde {registro.desde:%d/%m/%Y %H:%M})")
+
+    esperas = registro.resumen_esperas()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Conexiones obtenidas", esperas['muestras'])
+    col2.metric("Espera p50", f"{esperas.get('p50_ms', 0)} ms")
+    col3.metric("Espera p95", f"{esperas.get('p95_ms', 0)} ms")
+    col4.metric("Espera p99", f"{esperas.get('p99_ms', 0)} ms")
+
+    resumen = registro.resumen_consultas()
+    if resumen.empty:
+        st.info("Todavía no se ejecutaron consultas")
+    else:
+        st.dataframe(resumen, use_container_width=True, hide_index=True)
+
+    lentas = registro.consultas_lentas()
+    st.markdown(f"**Consultas lentas** (más de {registro.umbral_lento_ms} ms)")
+    if lentas.empty:
+        st.caption("Ninguna consulta superó el umbral")
+    else:
+        st.dataframe(lentas, use_container_width=True, hide_index=True)
+
+    if st.button("Reiniciar métricas", key="reiniciar_metricas"):
+        registro.reiniciar()
+        st.rerun()
+
+
+def mostrar_tiempos_secciones():
+    """Percentiles de duración por sección de los reruns, con exportación en JSON y en formato Prometheus"""
+    registro = obtener_registro_tiempos()
+    st.markdown(f"**Tiempos por sección** (desde {registro.desde:%d/%m/%Y %H:%M})")
+
+    resumen = registro.resumen()
+    if resumen.empty:
+        st.info("Todavía no hay secciones medidas")
+        return
+    st.dataframe(resumen, use_container_width=True, hide_index=True)
+
+    # Desglose del último rerun de esta sesión
+    sesion, rerun = sesion_y_rerun()
+    recientes = registro.recientes(sesion)
+    if not recientes.empty:
+        ultimo = recientes[recientes['rerun'] == recientes['rerun'].max()]
+        st.caption(f"Último rerun medido de esta sesión (#{ultimo['rerun'].iloc[0]}): {ultimo['ms'].sum():.0f} ms en secciones medidas")
+        st.dataframe(ultimo[['seccion', 'ms', 'error']], use_container_width=True, hide_index=True)
+
+    col1, col2, col3 = st.columns(3)
+    col1.download_button("Exportar JSON", registro.exportar_json(), file_name="tiempos_secciones.json", mime="application/json", key="exportar_tiempos_json")
+    col2.download_button("Exportar Prometheus", registro.exportar_prometheus(), file_name="tiempos_secciones.prom", mime="text/plain", key="exportar_tiempos_prometheus")
+    if col3.button("Reiniciar tiempos", key="reiniciar_tiempos"):
+        registro.reiniciar()
+        st.rerun()
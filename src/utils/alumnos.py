@@ -0,0 +1,135 @@
+import io
+import logging
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+
+logger = logging.getLogger(__name__)
+
+# Columnas que usa el dashboard de alumnos y nombres con los que se muestran
+COLUMNAS_ALUMNOS = [
+    'N_CURSO',
+    'N_SECTOR',
+    'N_INSTITUCION',
+    'CUIL',
+    'NOMBRE_ALUMNO',
+    'NRO_DOCUMENTO',
+    'FEC_NACIMIENTO',
+    'N_TIPO_SEXO',
+    'N_LOCALIDAD',
+    'BARRIO',
+    'ASISTENCIA',
+    'FEC_INICIO',
+    'FEC_FIN',
+    'N_TIPO',
+    'NRO_EXPEDIENTE',
+    'NRO_RESOLUCION',
+    'CANTIDAD_HS',
+    'EMAIL',
+    'NRO_TELEFONO'
+]
+
+RENOMBRES_ALUMNOS = {
+    'NOMBRE_ALUMNO': 'NOMBRE',
+    'NRO_DOCUMENTO': 'DNI',
+    'FEC_NACIMIENTO': 'FECHA_NAC',
+    'N_TIPO_SEXO': 'SEXO',
+    'FEC_INICIO': 'INICIO',
+    'FEC_FIN': 'FIN'
+}
+
+FORMATOS_DESCARGA = ["CSV", "Excel", "JSON"]
+
+
+def leer_alumnos(file_path: str) -> pd.DataFrame:
+    """Lee ALUMNOS_X_LOCALIDAD.parquet con las columnas del dashboard ya renombradas"""
+    df = pd.read_parquet(file_path, engine='pyarrow', columns=COLUMNAS_ALUMNOS).rename(columns=RENOMBRES_ALUMNOS)
+    # 'FIN' como datetime una sola vez al leer, y no en cada aplicación de filtros
+    if not is_datetime64_any_dtype(df['FIN']):
+        df['FIN'] = pd.to_datetime(df['FIN'], errors='coerce')
+    return df
+
+
+def anios_fin_disponibles(df: pd.DataFrame) -> list:
+    """Años de FIN presentes en los datos, del más reciente al más antiguo"""
+    return sorted(pd.to_datetime(df['FIN'], errors='coerce').dropna().dt.year.unique(), reverse=True)
+
+
+def _valores_que_contienen(serie: pd.Series, texto: str):
+    return serie[serie.str.contains(texto, case=False, na=False)].unique() if texto else serie.unique()
+
+
+def calcular_filtros(df: pd.DataFrame, curso: str = "", sector: str = "", institucion: str = "",
+                     cuil: str = "", anio_fin: int = None) -> dict:
+    """Valores admitidos por cada filtro de texto (los que contienen lo escrito) y el año de fin elegido"""
+    return {
+        'N_CURSO': _valores_que_contienen(df['N_CURSO'], curso),
+        'N_SECTOR': _valores_que_contienen(df['N_SECTOR'], sector),
+        'N_INSTITUCION': _valores_que_contienen(df['N_INSTITUCION'], institucion),
+        # Se convierte a string antes de la búsqueda porque CUIL puede ser numérico
+        'CUIL': df[df['CUIL'].astype(str).str.contains(cuil, case=False, na=False)]['CUIL'].unique() if cuil else df['CUIL'].unique(),
+        'anio_fin': anio_fin
+    }
+
+
+def mascara_filtros(df: pd.DataFrame, filtros: dict) -> np.ndarray:
+    """Máscara de las filas que cumplen todos los filtros, compuesta columna por columna sin copiar el DataFrame"""
+    mascara = np.ones(len(df), dtype=bool)
+
+    # --- Filtro de año de fin ---
+    if filtros.get('anio_fin') is not None:
+        # leer_alumnos ya deja 'FIN' como datetime; se convierte solo si llega de otra fuente
+        fin = df['FIN'] if is_datetime64_any_dtype(df['FIN']) else pd.to_datetime(df['FIN'], errors='coerce')
+        # NaT nunca coincide con el año elegido
+        mascara &= (fin.dt.year == filtros['anio_fin']).to_numpy()
+
+    # --- Filtros de texto y CUIL ---
+    for col, vals in filtros.items():
+        # 'anio_fin' ya se resolvió arriba y no es una columna de df
+        if col == 'anio_fin':
+            continue
+
+        if vals is not None and len(vals) > 0:
+            if col == 'CUIL' and getattr(vals, 'dtype', None) != df[col].dtype:
+                # Convertir a string para la comparación si CUIL puede ser numérico en df;
+                # con el mismo tipo (valores de calcular_filtros) se evita copiar la columna como texto
+                mascara &= df[col].astype(str).isin(vals.astype(str)).to_numpy()
+            elif col in df.columns:
+                mascara &= df[col].isin(vals).to_numpy()
+            else:
+                logger.warning(f"La columna '{col}' no se encuentra en el DataFrame filtrado. Ignorando este filtro.")
+        elif col in df.columns and not df[col].empty:
+            # Si el filtro predictivo para una columna de texto no encontró coincidencias, no queda ninguna fila
+            mascara[:] = False
+
+    return mascara
+
+
+def filas_filtradas(df: pd.DataFrame, filtros: dict) -> np.ndarray:
+    """Posiciones (para iloc) de las filas que cumplen los filtros; el DataFrame no se copia"""
+    return np.flatnonzero(mascara_filtros(df, filtros))
+
+
+def seleccionar_filas(df: pd.DataFrame, posiciones: np.ndarray) -> pd.DataFrame:
+    """Materializa las filas de `posiciones`; si son todas, devuelve el mismo DataFrame sin copiarlo"""
+    return df if len(posiciones) == len(df) else df.iloc[posiciones]
+
+
+def aplicar_filtros(df: pd.DataFrame, filtros: dict) -> pd.DataFrame:
+    """DataFrame con las filas que cumplen los filtros (p. ej. para exportarlo entero)"""
+    return seleccionar_filas(df, filas_filtradas(df, filtros))
+
+
+def exportar_datos(df: pd.DataFrame, formato: str):
+    """Contenido del archivo de descarga en el formato pedido (CSV, Excel o JSON)"""
+    if formato == "CSV":
+        return df.to_csv(index=False).encode('utf-8')
+    if formato == "Excel":
+        output = io.BytesIO()
+        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+            df.to_excel(writer, index=False, sheet_name='Datos')
+        return output.getvalue()
+    if formato == "JSON":
+        return df.to_json(orient='records')
+    raise ValueError(f"Formato de descarga desconocido: {formato}")
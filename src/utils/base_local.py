@@ -0,0 +1,186 @@
+"""Base SQLite que reemplaza a la base MySQL de CBAMECAPACITA para desarrollo y benchmarks.
+
+Tiene las tablas que usa comparar_cursos.py y equivalentes de los procedimientos de
+auditoría. Los procedimientos se emulan con una vista por procedimiento y un trigger
+INSTEAD OF INSERT. Un hook del engine reescribe `CALL FN_X(...)` como `INSERT INTO FN_X
+VALUES (...)`, de modo que el código de la app no cambia. Como en MySQL, las escrituras
+de un procedimiento forman parte de la transacción de quien lo llama, y un error (p. ej.
+un par duplicado) revierte el lote completo.
+
+La app usa esta base cuando la variable de entorno CBAMECAPACITA_DB_URL apunta a ella
+(ver src/utils/db.py), por ejemplo `CBAMECAPACITA_DB_URL=sqlite:///cba_local.db`.
+"""
+import os
+import random
+import re
+import sqlite3
+
+from sqlalchemy import event
+
+ESQUEMA = """
+CREATE TABLE T_CURSOS_X_SECTOR (
+    ID_CURSO INTEGER PRIMARY KEY,
+    N_CURSO TEXT NOT NULL,
+    ID_SECTOR INTEGER,
+    N_SECTOR TEXT
+);
+CREATE TABLE T_ALUMNOS_X_CURSOS (
+    ID INTEGER PRIMARY KEY,
+    CUIL INTEGER,
+    N_CURSO TEXT,
+    CANTIDAD_HS INTEGER
+);
+CREATE INDEX IX_ALUMNOS_X_CURSOS_CURSO ON T_ALUMNOS_X_CURSOS (N_CURSO);
+CREATE TABLE T_CERTIF_X_LOCALIDAD (
+    ID INTEGER PRIMARY KEY,
+    ID_CERTIFICACION INTEGER,
+    N_CERTIFICACION TEXT,
+    N_LOCALIDAD TEXT
+);
+CREATE TABLE T_RESUMEN_HORAS_CURSO (
+    ID_CURSO INTEGER PRIMARY KEY,
+    CANTIDAD_HS INTEGER NOT NULL DEFAULT 0,
+    FECH_ACTUALIZACION TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE T_ESTADOS_EQUIVALENCIAS (
+    ID_ESTADO INTEGER PRIMARY KEY,
+    N_ESTADO TEXT NOT NULL
+);
+INSERT INTO T_ESTADOS_EQUIVALENCIAS VALUES (1, 'ACTIVO'), (2, 'INACTIVO');
+CREATE TABLE T_EQUIVALENCIAS_CURSOS (
+    ID_EQUIVALENCIA INTEGER PRIMARY KEY AUTOINCREMENT,
+    ID_CURSO_HISTORICO INTEGER NOT NULL,
+    N_CURSO_HISTORICO TEXT,
+    ID_CERTIFICACION INTEGER NOT NULL,
+    N_CERTIF_ACTUAL TEXT,
+    FECH_EQUIVALENCIA TEXT NOT NULL,
+    OBSERVACIONES TEXT,
+    ID_ESTADO INTEGER NOT NULL REFERENCES T_ESTADOS_EQUIVALENCIAS (ID_ESTADO)
+);
+-- Mismos índices que migrations/002_indices_equivalencias.sql
+CREATE INDEX IX_EQUIVALENCIAS_ESTADO_FECHA ON T_EQUIVALENCIAS_CURSOS (ID_ESTADO, FECH_EQUIVALENCIA, ID_EQUIVALENCIA);
+CREATE INDEX IX_EQUIVALENCIAS_PAR ON T_EQUIVALENCIAS_CURSOS (ID_CURSO_HISTORICO, ID_CERTIFICACION);
+CREATE TABLE T_AUDITORIA_EQUIVALENCIAS (
+    ID_AUDITORIA INTEGER PRIMARY KEY,
+    ID_EQUIVALENCIA INTEGER NOT NULL,
+    ACCION TEXT NOT NULL,
+    USUARIO TEXT,
+    FECHA TEXT NOT NULL
+);
+
+-- CALL FN_INSERTA_EQUIVALENCIA_AUDITA (id_curso, n_curso, id_certificacion, n_certificacion, observaciones, usuario)
+CREATE VIEW FN_INSERTA_EQUIVALENCIA_AUDITA AS
+SELECT NULL AS ID_CURSO, NULL AS N_CURSO, NULL AS ID_CERTIFICACION, NULL AS N_CERTIFICACION, NULL AS OBSERVACIONES, NULL AS USUARIO;
+CREATE TRIGGER TR_FN_INSERTA_EQUIVALENCIA_AUDITA INSTEAD OF INSERT ON FN_INSERTA_EQUIVALENCIA_AUDITA
+BEGIN
+    SELECT RAISE(ABORT, 'Ya existe una equivalencia activa para el curso y la certificación')
+    WHERE EXISTS (
+        SELECT 1 FROM T_EQUIVALENCIAS_CURSOS
+        WHERE ID_CURSO_HISTORICO = NEW.ID_CURSO AND ID_CERTIFICACION = NEW.ID_CERTIFICACION AND ID_ESTADO = 1
+    );
+    INSERT INTO T_EQUIVALENCIAS_CURSOS (ID_CURSO_HISTORICO, N_CURSO_HISTORICO, ID_CERTIFICACION, N_CERTIF_ACTUAL, FECH_EQUIVALENCIA, OBSERVACIONES, ID_ESTADO)
+    VALUES (NEW.ID_CURSO, NEW.N_CURSO, NEW.ID_CERTIFICACION, NEW.N_CERTIFICACION, datetime('now', 'localtime'), NEW.OBSERVACIONES, 1);
+    INSERT INTO T_AUDITORIA_EQUIVALENCIAS (ID_EQUIVALENCIA, ACCION, USUARIO, FECHA)
+    VALUES (last_insert_rowid(), 'ALTA', NEW.USUARIO, datetime('now', 'localtime'));
+END;
+
+-- CALL FN_ELIMINA_EQUIVALENCIAS_AUDITA (id_equivalencia, usuario): baja lógica, la fila queda INACTIVO
+CREATE VIEW FN_ELIMINA_EQUIVALENCIAS_AUDITA AS
+SELECT NULL AS ID_EQUIVALENCIA, NULL AS USUARIO;
+CREATE TRIGGER TR_FN_ELIMINA_EQUIVALENCIAS_AUDITA INSTEAD OF INSERT ON FN_ELIMINA_EQUIVALENCIAS_AUDITA
+BEGIN
+    SELECT RAISE(ABORT, 'La equivalencia no existe o ya fue eliminada')
+    WHERE NOT EXISTS (SELECT 1 FROM T_EQUIVALENCIAS_CURSOS WHERE ID_EQUIVALENCIA = NEW.ID_EQUIVALENCIA AND ID_ESTADO = 1);
+    UPDATE T_EQUIVALENCIAS_CURSOS SET ID_ESTADO = 2 WHERE ID_EQUIVALENCIA = NEW.ID_EQUIVALENCIA;
+    INSERT INTO T_AUDITORIA_EQUIVALENCIAS (ID_EQUIVALENCIA, ACCION, USUARIO, FECHA)
+    VALUES (NEW.ID_EQUIVALENCIA, 'BAJA', NEW.USUARIO, datetime('now', 'localtime'));
+END;
+"""
+
+_LLAMADA = re.compile(r"^\s*CALL\s+(\w+)\s*\((.*)\)\s*;?\s*$", re.IGNORECASE | re.DOTALL)
+
+PALABRAS_CURSO = ['Programación', 'Soldadura', 'Electricidad', 'Cocina', 'Panadería', 'Atención al Cliente',
+                  'Mecánica', 'Gestión Administrativa', 'Ventas', 'Carpintería', 'Enfermería', 'Turismo',
+                  'Peluquería', 'Marketing Digital', 'Excel', 'Inglés', 'Construcción en Seco', 'Huerta']
+NIVELES = ['Inicial', 'Básico', 'Intermedio', 'Avanzado', 'para Emprendedores']
+SECTORES = ['Tecnología', 'Gastronomía', 'Salud', 'Construcción', 'Turismo', 'Industria', 'Comercio',
+            'Servicios', 'Agropecuario', 'Administración', 'Automotor', 'Textil', 'Energía', 'Educación']
+
+
+def reescribir_llamada(sentencia: str) -> str:
+    """`CALL FN_X(a, b)` -> `INSERT INTO FN_X VALUES (a, b)`; el resto de las sentencias no cambia"""
+    llamada = _LLAMADA.match(sentencia)
+    if llamada is None:
+        return sentencia
+    return f"INSERT INTO {llamada.group(1)} VALUES ({llamada.group(2)})"
+
+
+def preparar_engine_local(engine):
+    """Agrega al engine SQLite la emulación de los procedimientos y claves foráneas activas"""
+
+    @event.listens_for(engine, "connect")
+    def _al_conectar(conexion_dbapi, registro_conexion):
+        conexion_dbapi.execute("PRAGMA foreign_keys = ON")
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def _reescribir(conn, cursor, statement, parameters, context, executemany):
+        return reescribir_llamada(statement), parameters
+
+    return engine
+
+
+def crear_base_local(ruta: str, cursos: int = 5000, alumnos: int = 100_000, certificaciones: int = 800,
+                     equivalencias: int = 2000, semilla: int = 42):
+    """Crea (o reemplaza) la base en `ruta` y la llena con datos sintéticos reproducibles.
+
+    Alrededor del 10% de las equivalencias quedan INACTIVO, como las dadas de baja.
+    """
+    rng = random.Random(semilla)
+    if os.path.exists(ruta):
+        os.remove(ruta)
+    conn = sqlite3.connect(ruta)
+    try:
+        conn.executescript(ESQUEMA)
+
+        nombres_cursos = [f"{rng.choice(PALABRAS_CURSO)} {rng.choice(NIVELES)} {i}" for i in range(1, cursos + 1)]
+        conn.executemany(
+            "INSERT INTO T_CURSOS_X_SECTOR VALUES (?, ?, ?, ?)",
+            ((i, nombre, i % len(SECTORES), SECTORES[i % len(SECTORES)]) for i, nombre in enumerate(nombres_cursos, start=1))
+        )
+        conn.executemany(
+            "INSERT INTO T_ALUMNOS_X_CURSOS (CUIL, N_CURSO, CANTIDAD_HS) VALUES (?, ?, ?)",
+            ((rng.randint(20_100_000_000, 27_999_999_999), rng.choice(nombres_cursos), rng.choice([20, 40, 60, 80, 120]))
+             for _ in range(alumnos))
+        )
+        # Mismo contenido que la carga inicial de migrations/001_resumen_horas_curso.sql
+        conn.execute("""
+            INSERT INTO T_RESUMEN_HORAS_CURSO (ID_CURSO, CANTIDAD_HS)
+            SELECT cs.ID_CURSO, COALESCE(MAX(ac.CANTIDAD_HS), 0)
+            FROM T_CURSOS_X_SECTOR cs
+            JOIN T_ALUMNOS_X_CURSOS ac ON cs.N_CURSO = ac.N_CURSO
+            GROUP BY cs.ID_CURSO
+        """)
+        # Cada certificación se repite en varias localidades, con el sector después de ' - '
+        nombres_certificaciones = {i: f"{rng.choice(PALABRAS_CURSO)} {rng.choice(NIVELES)} - {SECTORES[i % len(SECTORES)]}"
+                                   for i in range(1, certificaciones + 1)}
+        conn.executemany(
+            "INSERT INTO T_CERTIF_X_LOCALIDAD (ID_CERTIFICACION, N_CERTIFICACION, N_LOCALIDAD) VALUES (?, ?, ?)",
+            ((i, nombre, f"Localidad {rng.randint(1, 400)}") for i, nombre in nombres_certificaciones.items() for _ in range(rng.randint(1, 5)))
+        )
+
+        pares = set()
+        while len(pares) < min(equivalencias, cursos * certificaciones):
+            pares.add((rng.randint(1, cursos), rng.randint(1, certificaciones)))
+        conn.executemany(
+            """INSERT INTO T_EQUIVALENCIAS_CURSOS (ID_CURSO_HISTORICO, N_CURSO_HISTORICO, ID_CERTIFICACION, N_CERTIF_ACTUAL,
+                                                   FECH_EQUIVALENCIA, OBSERVACIONES, ID_ESTADO)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            ((id_curso, nombres_cursos[id_curso - 1], id_certificacion, nombres_certificaciones[id_certificacion].split(' - ')[0],
+              f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(8, 18):02d}:{rng.randint(0, 59):02d}:00",
+              rng.choice(["", "Revisada por el área", None]), 2 if rng.random() < 0.1 else 1)
+             for id_curso, id_certificacion in sorted(pares))
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return ruta
@@ -0,0 +1,146 @@
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+RESULTADOS_POR_BUSQUEDA = 20
+TODOS_LOS_SECTORES = 'Todos'
+
+
+def normalizar(texto) -> str:
+    """Minúsculas, sin acentos y con espacios simples"""
+    texto = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode('ascii')
+    return " ".join(texto.lower().split())
+
+
+def _trigramas(texto: str) -> set:
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceNombres:
+    """Índice en memoria para buscar nombres por subcadena mientras se escribe.
+
+    Cada nombre se normaliza y se indexa por trigramas (para subcadenas de 3+ letras) y por
+    palabras ordenadas (prefijos de 1-2 letras). Una búsqueda solo revisa los candidatos
+    que comparten todos los trigramas del texto, así que su costo depende de cuántos nombres
+    coinciden y no del tamaño del catálogo. El sector funciona como faceta.
+    """
+
+    def __init__(self, nombres: pd.Series, sectores: pd.Series):
+        unicos = pd.DataFrame({'nombre': nombres.to_numpy(), 'sector': sectores.to_numpy()}).dropna(subset=['nombre'])
+        unicos = unicos.drop_duplicates(subset=['nombre']).sort_values('nombre', ignore_index=True)
+        self.nombres = unicos['nombre'].astype(str).tolist()
+        self._conjunto_nombres = set(self.nombres)
+        self._normalizados = [normalizar(nombre) for nombre in self.nombres]
+        codigos, self.sectores = pd.factorize(unicos['sector'].fillna(''), sort=True)
+        self._sector_por_nombre = codigos
+
+        trigramas = {}
+        palabras = []
+        for posicion, texto in enumerate(self._normalizados):
+            for trigrama in _trigramas(texto):
+                trigramas.setdefault(trigrama, []).append(posicion)
+            palabras.extend((palabra, posicion) for palabra in set(texto.split()))
+        self._trigramas = {t: np.array(p, dtype=np.int32) for t, p in trigramas.items()}
+        palabras.sort()
+        self._palabras = [palabra for palabra, _ in palabras]
+        self._posiciones_palabras = np.array([posicion for _, posicion in palabras], dtype=np.int32)
+
+    def __contains__(self, nombre) -> bool:
+        return nombre in self._conjunto_nombres
+
+    def _candidatos(self, palabra: str) -> np.ndarray:
+        """Posiciones de los nombres que contienen `palabra` (o tienen una palabra que empieza con ella, si es corta)"""
+        if len(palabra) < 3:
+            inicio = bisect_left(self._palabras, palabra)
+            fin = bisect_left(self._palabras, palabra + '\uffff')
+            return np.unique(self._posiciones_palabras[inicio:fin])
+        listas = sorted((self._trigramas.get(t, np.empty(0, dtype=np.int32)) for t in _trigramas(palabra)), key=len)
+        candidatos = listas[0]
+        for lista in listas[1:]:
+            if len(candidatos) == 0:
+                break
+            candidatos = np.intersect1d(candidatos, lista, assume_unique=True)
+        if len(palabra) == 3:
+            return candidatos
+        # Compartir los trigramas no garantiza que estén contiguos
+        return np.array([p for p in candidatos if palabra in self._normalizados[p]], dtype=np.int32)
+
+    def coincidencias(self, texto: str) -> np.ndarray:
+        """Posiciones (en orden alfabético) de los nombres que contienen todas las palabras del texto"""
+        palabras = normalizar(texto).split()
+        if not palabras:
+            return np.arange(len(self.nombres), dtype=np.int32)
+        posiciones = None
+        for palabra in sorted(palabras, key=len, reverse=True):
+            candidatos = self._candidatos(palabra)
+            posiciones = candidatos if posiciones is None else np.intersect1d(posiciones, candidatos, assume_unique=True)
+            if len(posiciones) == 0:
+                break
+        return posiciones
+
+    def conteo_por_sector(self, posiciones: np.ndarray) -> dict:
+        conteos = np.bincount(self._sector_por_nombre[posiciones], minlength=len(self.sectores))
+        return dict(zip(self.sectores, conteos.tolist()))
+
+    def buscar(self, texto: str, sector: str = None, limite: int = RESULTADOS_POR_BUSQUEDA):
+        """Devuelve (mejores `limite` nombres, total de coincidencias, conteo por sector).
+
+        Primero van los nombres que empiezan con el texto y después el resto, en orden alfabético.
+        """
+        posiciones = self.coincidencias(texto)
+        conteos = self.conteo_por_sector(posiciones)
+        if sector not in (None, TODOS_LOS_SECTORES):
+            codigo = self.sectores.get_loc(sector) if sector in self.sectores else -1
+            posiciones = posiciones[self._sector_por_nombre[posiciones] == codigo]
+        texto_normalizado = normalizar(texto)
+        if texto_normalizado and len(posiciones) > limite:
+            empiezan = np.fromiter((self._normalizados[p].startswith(texto_normalizado) for p in posiciones), dtype=bool, count=len(posiciones))
+            posiciones = np.concatenate([posiciones[empiezan], posiciones[~empiezan]])
+        elif texto_normalizado:
+            posiciones = sorted(posiciones, key=lambda p: not self._normalizados[p].startswith(texto_normalizado))
+        return [self.nombres[p] for p in posiciones[:limite]], len(posiciones), conteos
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def construir_indice_nombres(_nombres: pd.Series, _sectores: pd.Series, version) -> IndiceNombres:
+    """Índice compartido por todas las sesiones; se reconstruye solo cuando cambia la `version` de los datos"""
+    return IndiceNombres(_nombres, _sectores)
+
+
+def selector_con_busqueda(indice: IndiceNombres, etiqueta: str, key: str, multiple: bool = False,
+                          ayuda: str = None, limite: int = RESULTADOS_POR_BUSQUEDA, format_func=str):
+    """Selector que solo envía al navegador las `limite` mejores coincidencias del texto buscado.
+
+    Con `multiple` devuelve la lista de nombres elegidos (que se conservan entre búsquedas);
+    si no, el nombre elegido entre las coincidencias o None si no hay ninguna.
+    """
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        texto = st.text_input(etiqueta, placeholder="Escriba para buscar...", key=f"{key}_texto", help=ayuda)
+    resultados, total, conteos = indice.buscar(texto, st.session_state.get(f"{key}_sector"), limite)
+    with col2:
+        st.selectbox(
+            "Sector",
+            [TODOS_LOS_SECTORES] + [sector for sector in indice.sectores if sector],
+            format_func=lambda s: s if s == TODOS_LOS_SECTORES else f"{s} ({conteos.get(s, 0)})",
+            key=f"{key}_sector"
+        )
+    st.caption(f"{min(total, limite)} de {total} coincidencias" + (" - refine la búsqueda para ver más" if total > limite else ""))
+
+    clave_seleccion = f"{key}_seleccion"
+    if multiple:
+        # Los elegidos siempre están entre las opciones, aunque ya no coincidan con la búsqueda; los que
+        # ya no existen (los datos se recargaron y el nombre cambió o se quitó) se descartan
+        elegidos = st.session_state.get(clave_seleccion, [])
+        if any(nombre not in indice for nombre in elegidos):
+            elegidos = [nombre for nombre in elegidos if nombre in indice]
+            st.session_state[clave_seleccion] = elegidos
+        opciones = elegidos + [nombre for nombre in resultados if nombre not in elegidos]
+        return st.multiselect("Seleccionados", opciones, key=clave_seleccion, format_func=format_func, label_visibility="collapsed")
+    if st.session_state.get(clave_seleccion) not in resultados:
+        # Una búsqueda nueva reemplaza la elección anterior por la mejor coincidencia
+        st.session_state.pop(clave_seleccion, None)
+    return st.selectbox("Seleccionada", resultados, key=clave_seleccion, format_func=format_func, label_visibility="collapsed")
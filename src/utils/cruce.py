@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+COLUMNAS_HECHOS = ['ID_DOCENTE', 'NRO_DOCUMENTO', 'N_CURSO', 'N_LOCALIDAD', 'N_SECTOR_PRODUCTIVO', 'HS_ASIGNADAS', 'CUPO']
+
+
+def emparejar_por_curso(claves_izquierda: pd.Series, claves_derecha: pd.Series):
+    """Hash join por N_CURSO: devuelve las posiciones (iloc) de cada par izquierda/derecha con la misma clave.
+
+    Ambas columnas se factorizan juntas sobre una única tabla hash, así cada clave
+    recibe el mismo código entero en los dos lados; luego el emparejamiento
+    (incluido el caso muchos a muchos) se resuelve con operaciones de numpy.
+    """
+    n_izquierda = len(claves_izquierda)
+    codigos, claves = pd.factorize(pd.concat([claves_izquierda, claves_derecha], ignore_index=True))
+    codigos_izquierda, codigos_derecha = codigos[:n_izquierda], codigos[n_izquierda:]
+
+    # Filas de la derecha agrupadas por código: orden, inicio y cantidad de cada grupo.
+    # Las claves nulas (código -1) quedan fuera del orden igual que del conteo
+    validas = np.flatnonzero(codigos_derecha >= 0)
+    orden_derecha = validas[np.argsort(codigos_derecha[validas], kind='stable')]
+    cantidad = np.bincount(codigos_derecha[validas], minlength=len(claves))
+    inicio = np.cumsum(cantidad) - cantidad
+
+    # Cada fila de la izquierda se repite tantas veces como filas de la derecha tenga su clave
+    repeticiones = np.where(codigos_izquierda >= 0, cantidad[np.maximum(codigos_izquierda, 0)], 0)
+    pos_izquierda = np.repeat(np.arange(n_izquierda), repeticiones)
+    desplazamiento = np.arange(repeticiones.sum()) - np.repeat(np.cumsum(repeticiones) - repeticiones, repeticiones)
+    pos_derecha = orden_derecha[np.repeat(inicio[np.maximum(codigos_izquierda, 0)], repeticiones) + desplazamiento]
+
+    return pos_izquierda, pos_derecha
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def construir_hechos_docentes_cursos(_df_cursos: pd.DataFrame, _df_docentes: pd.DataFrame, version: tuple) -> pd.DataFrame:
+    """Tabla de hechos docente × curso × localidad, construida una vez por versión de ambos archivos"""
+    docentes = _df_docentes.dropna(subset=['ID_DOCENTE'])
+    cursos = _df_cursos
+
+    pos_docentes, pos_cursos = emparejar_por_curso(docentes['N_CURSO'], cursos['N_CURSO'])
+
+    hechos = pd.DataFrame({
+        'ID_DOCENTE': docentes['ID_DOCENTE'].to_numpy()[pos_docentes],
+        'NRO_DOCUMENTO': docentes['NRO_DOCUMENTO'].to_numpy()[pos_docentes],
+        'N_CURSO': docentes['N_CURSO'].to_numpy()[pos_docentes],
+        'N_LOCALIDAD': cursos['N_LOCALIDAD'].to_numpy()[pos_cursos],
+        'N_SECTOR_PRODUCTIVO': cursos['N_SECTOR_PRODUCTIVO'].to_numpy()[pos_cursos],
+        'HS_ASIGNADAS': pd.to_numeric(docentes['HS_ASIGNADAS'], errors='coerce').to_numpy()[pos_docentes],
+        'CUPO': pd.to_numeric(cursos['CUPO'], errors='coerce').to_numpy()[pos_cursos]
+    }, columns=COLUMNAS_HECHOS)
+    return hechos
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def calcular_carga_docente(_df_cursos: pd.DataFrame, _hechos: pd.DataFrame, version: tuple, columna_grupo: str) -> pd.DataFrame:
+    """Cursos, cupo, docentes y horas por localidad o sector, con sus ratios.
+
+    El cupo sale de la tabla de cursos (cada curso cuenta una vez) y los docentes
+    y horas de la tabla de hechos; los ratios se calculan columna a columna.
+    """
+    cursos = _df_cursos.groupby(columna_grupo).agg(
+        CURSOS=('N_CURSO', 'size'),
+        CUPO=('CUPO', 'sum')
+    )
+    docentes = _hechos.groupby(columna_grupo).agg(
+        DOCENTES=('ID_DOCENTE', 'nunique'),
+        HS_ASIGNADAS=('HS_ASIGNADAS', 'sum')
+    )
+    carga = cursos.join(docentes, how='left').fillna({'DOCENTES': 0, 'HS_ASIGNADAS': 0})
+
+    docentes_sin_cero = carga['DOCENTES'].where(carga['DOCENTES'] > 0)
+    carga['ALUMNOS_POR_DOCENTE'] = (carga['CUPO'] / docentes_sin_cero).round(1)
+    carga['HS_POR_DOCENTE'] = (carga['HS_ASIGNADAS'] / docentes_sin_cero).round(1)
+    carga['DOCENTES_POR_CURSO'] = (carga['DOCENTES'] / carga['CURSOS']).round(2)
+
+    return carga.reset_index().sort_values('ALUMNOS_POR_DOCENTE', ascending=False, ignore_index=True)
@@ -0,0 +1,117 @@
+import logging
+import os
+import threading
+import time
+
+import streamlit as st
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from src.utils.metricas import instrumentar_engine, obtener_registro_metricas
+
+logger = logging.getLogger(__name__)
+
+# Si está definida, se usa esta URL en lugar de [db_credentials]; con sqlite:/// se emulan
+# los procedimientos de auditoría (ver src/utils/base_local.py)
+VARIABLE_URL_BASE = "CBAMECAPACITA_DB_URL"
+
+# Configuración por defecto del pool; se puede sobrescribir desde la sección [db_pool] de secrets.toml
+CONFIG_POOL = {
+    'pool_size': 5,          # conexiones que se mantienen abiertas
+    'max_overflow': 10,      # conexiones extra permitidas en picos
+    'pool_timeout': 30,      # segundos de espera máxima por una conexión libre
+    'pool_recycle': 1800,    # segundos antes de reciclar una conexión (evita cortes por wait_timeout de MySQL)
+    'pool_pre_ping': True    # verifica la conexión antes de entregarla
+}
+
+
+class PoolMedido(QueuePool):
+    """QueuePool que registra cuánto se espera para obtener una conexión"""
+
+    # RegistroMetricas (src/utils/metricas.py) que recibe cada espera, si el engine está instrumentado
+    registro = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock_esperas = threading.Lock()
+        self.esperas = 0
+        self.esperas_agotadas = 0
+        self.tiempo_espera_total = 0.0
+        self.tiempo_espera_max = 0.0
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        agotada = False
+        try:
+            return super()._do_get()
+        except Exception:
+            agotada = True
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            with self._lock_esperas:
+                self.esperas += 1
+                self.esperas_agotadas += agotada
+                self.tiempo_espera_total += espera
+                self.tiempo_espera_max = max(self.tiempo_espera_max, espera)
+            if self.registro is not None:
+                self.registro.registrar_espera(1000 * espera)
+
+    def recreate(self):
+        # engine.dispose() reemplaza el pool; el nuevo sigue informando al mismo registro
+        pool = super().recreate()
+        pool.registro = self.registro
+        return pool
+
+
+def _config_pool() -> dict:
+    config = dict(CONFIG_POOL)
+    try:
+        config.update({k: v for k, v in st.secrets.get("db_pool", {}).items() if k in CONFIG_POOL})
+    except Exception:
+        # Sin secrets.toml o sin sección [db_pool]: se usan los valores por defecto
+        pass
+    return config
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_engine():
+    """Engine único por proceso, compartido por todas las sesiones y reruns"""
+    config = _config_pool()
+    url_local = os.environ.get(VARIABLE_URL_BASE)
+    if url_local:
+        engine = create_engine(url_local, poolclass=PoolMedido, **config)
+        # str(engine.url) oculta la contraseña
+        logger.warning(f"Usando la base indicada en {VARIABLE_URL_BASE} en lugar de la de secrets.toml: {engine.url}")
+        if engine.dialect.name == "sqlite":
+            from src.utils.base_local import preparar_engine_local
+            preparar_engine_local(engine)
+        return instrumentar_engine(engine, obtener_registro_metricas())
+
+    # Obtener credenciales desde secrets.toml
+    db_credentials = st.secrets["db_credentials"]
+    connection_string = f"mysql+pymysql://{db_credentials['DB_USER']}:{db_credentials['DB_PASSWORD']}@{db_credentials['DB_HOST']}:{db_credentials['DB_PORT']}/{db_credentials['DB_NAME']}"
+    logger.info(f"Creando engine de base de datos con pool {config}")
+    engine = create_engine(connection_string, poolclass=PoolMedido, **config)
+    return instrumentar_engine(engine, obtener_registro_metricas())
+
+
+def estadisticas_pool(engine) -> dict:
+    """Estado actual del pool y tiempos de espera acumulados desde que se creó"""
+    pool = engine.pool
+    estadisticas = {
+        'tamaño': pool.size(),
+        'en_uso': pool.checkedout(),
+        'libres': pool.checkedin(),
+        'overflow': max(pool.overflow(), 0),
+        'max_overflow': pool._max_overflow,
+    }
+    if isinstance(pool, PoolMedido):
+        with pool._lock_esperas:
+            estadisticas.update({
+                'esperas': pool.esperas,
+                'esperas_agotadas': pool.esperas_agotadas,
+                'espera_promedio_ms': round(1000 * pool.tiempo_espera_total / pool.esperas, 2) if pool.esperas else 0.0,
+                'espera_max_ms': round(1000 * pool.tiempo_espera_max, 2)
+            })
+    return estadisticas
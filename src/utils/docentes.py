@@ -0,0 +1,53 @@
+import streamlit as st
+import pandas as pd
+
+COLUMNAS_DETALLE_DOCENTES = ['NRO_DOCUMENTO', 'ID_DOCENTE', 'N_CURSO', 'HS_ASIGNADAS']
+
+
+@st.cache_resource(show_spinner=False)
+def calcular_analitica_docentes(_df_docentes: pd.DataFrame, version: str) -> dict:
+    """Precalcula los agregados de docentes una sola vez por versión del archivo.
+
+    El DataFrame no se hashea (prefijo `_`): la clave de caché es `version`,
+    que identifica el archivo descargado.
+    """
+    # Filtrar las filas sin 'ID_DOCENTE'
+    docentes = _df_docentes.dropna(subset=['ID_DOCENTE'])[COLUMNAS_DETALLE_DOCENTES].reset_index(drop=True)
+    docentes['HS_ASIGNADAS'] = pd.to_numeric(docentes['HS_ASIGNADAS'], errors='coerce')
+
+    # Horas y cantidad de cursos por docente, ordenado de mayor a menor carga
+    por_docente = (
+        docentes.groupby('ID_DOCENTE', sort=False)
+        .agg(
+            NRO_DOCUMENTO=('NRO_DOCUMENTO', 'first'),
+            HS_TOTALES=('HS_ASIGNADAS', 'sum'),
+            CURSOS=('N_CURSO', 'nunique')
+        )
+        .reset_index()
+        .sort_values(['HS_TOTALES', 'CURSOS'], ascending=False, ignore_index=True)
+    )
+
+    # Cantidad de docentes por curso, ordenado de mayor a menor
+    por_curso = (
+        docentes.groupby('N_CURSO', sort=False)['NRO_DOCUMENTO']
+        .nunique()
+        .reset_index(name='DOCENTES')
+        .sort_values('DOCENTES', ascending=False, ignore_index=True)
+    )
+
+    return {
+        'total_docentes': docentes['ID_DOCENTE'].nunique(),
+        'detalle': docentes,
+        'por_docente': por_docente,
+        'por_curso': por_curso
+    }
+
+
+def top_n_con_otros(df: pd.DataFrame, etiqueta: str, valor: str, n: int = 10, etiqueta_otros: str = 'Otros') -> pd.DataFrame:
+    """Devuelve las primeras `n` filas de un ranking ya ordenado y agrupa el resto en una sola fila"""
+    top = df[[etiqueta, valor]].head(n)
+    resto = df[valor].iloc[n:]
+    if resto.empty:
+        return top
+    otros = pd.DataFrame({etiqueta: [f"{etiqueta_otros} ({len(resto)})"], valor: [resto.sum()]})
+    return pd.concat([top, otros], ignore_index=True)
@@ -0,0 +1,125 @@
+import logging
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Segundos entre dos consultas de cambios; en ese lapso todas las sesiones usan la copia en memoria
+INTERVALO_SINCRONIZACION = 5
+# Cada cuánto se recarga todo igual, por si algún cambio no se detectó de forma incremental
+INTERVALO_RECARGA_COMPLETA = 600
+
+COLUMNAS_EQUIVALENCIAS_ACTIVAS = ['ID_EQUIVALENCIA', 'ID_CURSO_HISTORICO', 'ID_CERTIFICACION']
+
+_DESDE_EQUIVALENCIAS_ACTIVAS = """
+    FROM T_EQUIVALENCIAS_CURSOS eq
+    JOIN T_ESTADOS_EQUIVALENCIAS ee ON eq.ID_ESTADO = ee.ID_ESTADO
+    WHERE ee.N_ESTADO = 'ACTIVO'
+"""
+
+# Consulta liviana que se hace en cada sincronización: resuelta con el índice IX_EQUIVALENCIAS_ESTADO_FECHA
+QUERY_ESTADO_EQUIVALENCIAS = "SELECT COUNT(*), COALESCE(MAX(eq.ID_EQUIVALENCIA), 0)" + _DESDE_EQUIVALENCIAS_ACTIVAS
+
+# Equivalencias activas nuevas (ID mayor que el último visto) o todas, en la carga completa
+QUERY_EQUIVALENCIAS_ACTIVAS = (
+    "SELECT eq.ID_EQUIVALENCIA, eq.ID_CURSO_HISTORICO, eq.ID_CERTIFICACION" + _DESDE_EQUIVALENCIAS_ACTIVAS
+    + " AND eq.ID_EQUIVALENCIA > :ultimo_id"
+)
+
+# Solo los IDs, para detectar equivalencias que dejaron de estar activas
+QUERY_IDS_EQUIVALENCIAS_ACTIVAS = "SELECT eq.ID_EQUIVALENCIA" + _DESDE_EQUIVALENCIAS_ACTIVAS
+
+
+class EquivalenciasSincronizadas:
+    """Copia en memoria de las equivalencias activas, compartida por todas las sesiones del proceso.
+
+    En lugar de releer la tabla completa después de cada alta o baja, `sincronizar` consulta
+    la cantidad y el máximo ID de las activas: si hay IDs nuevos trae solo esas filas, y si la
+    cantidad no coincide trae solo los IDs activos para descartar las que se dieron de baja.
+    `version` aumenta con cada cambio y sirve como clave de las cachés que dependen de estos datos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.df = pd.DataFrame(columns=COLUMNAS_EQUIVALENCIAS_ACTIVAS, dtype='int64')
+        self.pares_activos = frozenset()
+        self.cantidad_por_curso = {}
+        self.ultimo_id = 0
+        self.version = 0
+        self.consultas = 0
+        self._ultima_sincronizacion = 0.0
+        self._ultima_recarga = 0.0
+
+    def marcar_desactualizada(self):
+        """Fuerza a que la próxima sincronización consulte la base (p. ej. después de una escritura propia)"""
+        self._ultima_sincronizacion = 0.0
+
+    def sincronizar(self, engine) -> 'EquivalenciasSincronizadas':
+        ahora = time.monotonic()
+        if ahora - self._ultima_sincronizacion < INTERVALO_SINCRONIZACION:
+            return self
+        with self._lock:
+            # Otra sesión pudo haber sincronizado mientras se esperaba el lock
+            if ahora - self._ultima_sincronizacion < INTERVALO_SINCRONIZACION:
+                return self
+            if ahora - self._ultima_recarga >= INTERVALO_RECARGA_COMPLETA:
+                self._recargar(engine)
+                self._ultima_recarga = ahora
+            else:
+                self._aplicar_cambios(engine)
+            self._ultima_sincronizacion = time.monotonic()
+        return self
+
+    def _leer(self, conn, query, **params) -> list:
+        self.consultas += 1
+        return conn.execute(text(query), params).fetchall()
+
+    def _recargar(self, engine):
+        with engine.connect() as conn:
+            filas = self._leer(conn, QUERY_EQUIVALENCIAS_ACTIVAS, ultimo_id=0)
+        self._reemplazar(pd.DataFrame(filas, columns=COLUMNAS_EQUIVALENCIAS_ACTIVAS, dtype='int64'))
+        logger.info(f"Equivalencias activas recargadas: {len(self.df)}")
+
+    def _aplicar_cambios(self, engine):
+        with engine.connect() as conn:
+            activas, max_id = self._leer(conn, QUERY_ESTADO_EQUIVALENCIAS)[0]
+            df = self.df
+            if max_id > self.ultimo_id:
+                nuevas = self._leer(conn, QUERY_EQUIVALENCIAS_ACTIVAS, ultimo_id=self.ultimo_id)
+                df = pd.concat([df, pd.DataFrame(nuevas, columns=COLUMNAS_EQUIVALENCIAS_ACTIVAS, dtype='int64')], ignore_index=True)
+            if len(df) != activas:
+                ids_activos = pd.Index([fila[0] for fila in self._leer(conn, QUERY_IDS_EQUIVALENCIAS_ACTIVAS)])
+                if not ids_activos.isin(df['ID_EQUIVALENCIA']).all():
+                    # Una equivalencia vieja volvió a estar activa: no se puede resolver solo con IDs nuevos
+                    df = None
+                else:
+                    df = df[df['ID_EQUIVALENCIA'].isin(ids_activos)].reset_index(drop=True)
+        if df is None:
+            self._recargar(engine)
+        elif df is not self.df:
+            self._reemplazar(df)
+
+    def _reemplazar(self, df: pd.DataFrame):
+        # El DataFrame y los índices se reemplazan enteros, nunca se modifican: las sesiones que los están leyendo no ven cambios a medias
+        self.pares_activos = frozenset(zip(df['ID_CURSO_HISTORICO'].tolist(), df['ID_CERTIFICACION'].tolist()))
+        self.cantidad_por_curso = df['ID_CURSO_HISTORICO'].value_counts().to_dict()
+        self.df = df
+        self.ultimo_id = max(self.ultimo_id, int(df['ID_EQUIVALENCIA'].max()) if not df.empty else 0)
+        self.version += 1
+
+    def pares(self) -> frozenset:
+        """Pares (ID_CURSO_HISTORICO, ID_CERTIFICACION) con equivalencia activa"""
+        return self.pares_activos
+
+    def existe(self, id_curso, id_certificacion) -> bool:
+        return (int(id_curso), int(id_certificacion)) in self.pares_activos
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_equivalencias_sincronizadas() -> EquivalenciasSincronizadas:
+    """Única copia de las equivalencias activas por proceso"""
+    return EquivalenciasSincronizadas()
@@ -0,0 +1,13 @@
+import streamlit as st
+
+
+def conservar_estado_widgets(claves):
+    """Vuelve a guardar el valor de los widgets de `claves` para que sobreviva mientras su vista no se dibuja.
+
+    Streamlit borra el estado de los widgets que no se ejecutan en un rerun; al reasignarlo al
+    comienzo de cada rerun pasa a ser estado de sesión común y se recupera al volver a la vista.
+    Los botones (y los de descarga) no aceptan valores asignados y no deben incluirse.
+    """
+    for clave in claves:
+        if clave in st.session_state:
+            st.session_state[clave] = st.session_state[clave]
@@ -0,0 +1,19 @@
+import pandas as pd
+
+
+def indexar_por(df: pd.DataFrame, clave: str) -> dict:
+    """Diccionario clave -> fila (dict), con la primera aparición de cada clave.
+
+    Reemplaza los filtros `df[df[clave] == valor].iloc[0]`, que recorren todo el
+    DataFrame en cada búsqueda, por un acceso directo por hash.
+    """
+    unicos = df.drop_duplicates(subset=[clave])
+    return dict(zip(unicos[clave], unicos.to_dict('records')))
+
+
+def construir_indices_referencia(df_historico: pd.DataFrame, df_certificaciones: pd.DataFrame) -> dict:
+    """Índices de cursos históricos por N_CURSO y de certificaciones por N_CERTIFICACION"""
+    return {
+        'cursos': indexar_por(df_historico, 'N_CURSO'),
+        'certificaciones': indexar_por(df_certificaciones, 'N_CERTIFICACION')
+    }
@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Fecha usada como fin de los cursos sin FEC_FIN (siguen en curso)
+FIN_ABIERTO = np.iinfo(np.int64).max
+
+
+def _a_enteros(fechas) -> np.ndarray:
+    """Convierte fechas a nanosegundos int64 (NaT queda como el mínimo int64)"""
+    return pd.to_datetime(pd.Series(fechas), errors='coerce').to_numpy(dtype='datetime64[ns]').astype(np.int64)
+
+
+class _NodoIntervalos:
+    """Nodo de un árbol de intervalos centrado.
+
+    Guarda los intervalos que contienen `centro` ordenados por inicio (ascendente)
+    y por fin (descendente); los que terminan antes o empiezan después van a los hijos.
+    """
+
+    __slots__ = ('centro', 'inicios', 'pos_por_inicio', 'fines_desc', 'pos_por_fin', 'izquierda', 'derecha')
+
+    def __init__(self, inicios, fines, posiciones):
+        extremos = np.concatenate([inicios, fines[fines != FIN_ABIERTO]])
+        self.centro = np.median(extremos)
+
+        a_la_izquierda = fines < self.centro
+        a_la_derecha = inicios > self.centro
+        en_centro = ~(a_la_izquierda | a_la_derecha)
+
+        orden = np.argsort(inicios[en_centro], kind='stable')
+        self.inicios = inicios[en_centro][orden]
+        self.pos_por_inicio = posiciones[en_centro][orden]
+
+        orden = np.argsort(-fines[en_centro], kind='stable')
+        self.fines_desc = -fines[en_centro][orden]
+        self.pos_por_fin = posiciones[en_centro][orden]
+
+        self.izquierda = _NodoIntervalos(inicios[a_la_izquierda], fines[a_la_izquierda], posiciones[a_la_izquierda]) if a_la_izquierda.any() else None
+        self.derecha = _NodoIntervalos(inicios[a_la_derecha], fines[a_la_derecha], posiciones[a_la_derecha]) if a_la_derecha.any() else None
+
+
+class IndiceIntervalos:
+    """Índice de intervalos [inicio, fin] sobre las filas de un DataFrame.
+
+    - `contar_activos` / `sumar_activos` usan los arreglos ordenados de inicios y fines
+      (barrido): activos en [desde, hasta] = #inicios <= hasta - #fines < desde, en O(log n).
+    - `activos_en` usa un árbol de intervalos centrado y devuelve las posiciones
+      de las filas activas en O(log n + k).
+    """
+
+    def __init__(self, inicios, fines, pesos=None):
+        inicios = _a_enteros(inicios)
+        fines = _a_enteros(fines)
+        pesos = np.zeros(len(inicios)) if pesos is None else pd.to_numeric(pd.Series(pesos), errors='coerce').fillna(0).to_numpy(dtype=float)
+
+        # Sin inicio no hay intervalo; sin fin el curso sigue abierto. Un fin anterior al inicio
+        # (dato inválido) se descarta: caería a ambos lados de un centro y el árbol no terminaría
+        validos = inicios != np.iinfo(np.int64).min
+        fines = np.where(fines == np.iinfo(np.int64).min, FIN_ABIERTO, fines)
+        validos &= fines >= inicios
+        posiciones = np.flatnonzero(validos)
+        inicios, fines, pesos = inicios[validos], fines[validos], pesos[validos]
+
+        orden = np.argsort(inicios, kind='stable')
+        self._inicios = inicios[orden]
+        self._pesos_acum_inicio = np.concatenate([[0.0], np.cumsum(pesos[orden])])
+
+        orden = np.argsort(fines, kind='stable')
+        self._fines = fines[orden]
+        self._pesos_acum_fin = np.concatenate([[0.0], np.cumsum(pesos[orden])])
+
+        self._raiz = _NodoIntervalos(inicios, fines, posiciones) if len(posiciones) else None
+
+    def __len__(self):
+        return len(self._inicios)
+
+    def _rango(self, desde, hasta):
+        desde = pd.Timestamp(desde).value
+        hasta = desde if hasta is None else pd.Timestamp(hasta).value
+        return desde, hasta
+
+    def contar_activos(self, desde, hasta=None) -> int:
+        """Cantidad de intervalos que se superponen con [desde, hasta]"""
+        desde, hasta = self._rango(desde, hasta)
+        return int(np.searchsorted(self._inicios, hasta, side='right') - np.searchsorted(self._fines, desde, side='left'))
+
+    def sumar_activos(self, desde, hasta=None) -> float:
+        """Suma de los pesos (p. ej. CUPO) de los intervalos que se superponen con [desde, hasta]"""
+        desde, hasta = self._rango(desde, hasta)
+        return float(
+            self._pesos_acum_inicio[np.searchsorted(self._inicios, hasta, side='right')]
+            - self._pesos_acum_fin[np.searchsorted(self._fines, desde, side='left')]
+        )
+
+    def serie(self, desdes, hastas) -> pd.DataFrame:
+        """Cantidad y suma de pesos activos en cada ventana [desdes[i], hastas[i]], vectorizado"""
+        desdes = pd.DatetimeIndex(desdes)
+        d = desdes.asi8
+        h = pd.DatetimeIndex(hastas).asi8
+        iniciados = np.searchsorted(self._inicios, h, side='right')
+        terminados = np.searchsorted(self._fines, d, side='left')
+        return pd.DataFrame({
+            'FECHA': desdes,
+            'CURSOS': iniciados - terminados,
+            'CUPO': self._pesos_acum_inicio[iniciados] - self._pesos_acum_fin[terminados]
+        })
+
+    def activos_en(self, fecha) -> np.ndarray:
+        """Posiciones (iloc) de las filas cuyo intervalo contiene `fecha`"""
+        x = pd.Timestamp(fecha).value
+        resultado = []
+        nodo = self._raiz
+        while nodo is not None:
+            if x < nodo.centro:
+                resultado.append(nodo.pos_por_inicio[:np.searchsorted(nodo.inicios, x, side='right')])
+                nodo = nodo.izquierda
+            elif x > nodo.centro:
+                resultado.append(nodo.pos_por_fin[:np.searchsorted(nodo.fines_desc, -x, side='right')])
+                nodo = nodo.derecha
+            else:
+                resultado.append(nodo.pos_por_inicio)
+                break
+        return np.sort(np.concatenate(resultado)) if resultado else np.array([], dtype=np.intp)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def construir_indice_cursos(_df_cursos: pd.DataFrame, version: str, columna_grupo: str, filtros: tuple = ()) -> dict:
+    """Construye un índice general y uno por grupo (sector o localidad) sobre FEC_INICIO/FEC_FIN.
+
+    Se cachea por versión del archivo, columna de agrupación y filtros aplicados
+    (tupla de pares columna/valor), por lo que no se reconstruye en cada rerun.
+    """
+    df = _df_cursos
+    if filtros:
+        # Una máscara combinada: las filas se seleccionan una sola vez
+        mascara = np.ones(len(df), dtype=bool)
+        for columna, valor in filtros:
+            mascara &= (df[columna] == valor).to_numpy()
+        df = df[mascara]
+    df = df.reset_index(drop=True)
+
+    grupos = {}
+    for grupo, posiciones in df.groupby(columna_grupo, sort=False).indices.items():
+        sub = df.iloc[posiciones]
+        grupos[grupo] = IndiceIntervalos(sub['FEC_INICIO'], sub['FEC_FIN'], sub['CUPO'])
+
+    return {
+        'cursos': df,
+        'general': IndiceIntervalos(df['FEC_INICIO'], df['FEC_FIN'], df['CUPO']),
+        'grupos': grupos
+    }
+
+
+def serie_concurrencia(indices: dict, frecuencia: str = 'W-MON', max_grupos: int = 8) -> pd.DataFrame:
+    """Serie temporal de cursos y cupo activos por grupo, una fila por ventana y grupo.
+
+    Los grupos con menor pico de cupo se suman en "Otros".
+    """
+    general = indices['general']
+    if len(general) == 0:
+        return pd.DataFrame(columns=['FECHA', 'CURSOS', 'CUPO', 'GRUPO'])
+
+    primera = pd.Timestamp(general._inicios[0])
+    fines_cerrados = general._fines[general._fines != FIN_ABIERTO]
+    ultima = pd.Timestamp(fines_cerrados[-1]) if len(fines_cerrados) else pd.Timestamp.today()
+    desdes = pd.date_range(primera.normalize() - pd.Timedelta(days=6), max(ultima, primera), freq=frecuencia)
+    hastas = desdes + pd.tseries.frequencies.to_offset(frecuencia) - pd.Timedelta(nanoseconds=1)
+
+    series = {grupo: indice.serie(desdes, hastas) for grupo, indice in indices['grupos'].items()}
+    picos = sorted(series, key=lambda g: series[g]['CUPO'].max(), reverse=True)
+
+    resultado = []
+    for grupo in picos[:max_grupos]:
+        resultado.append(series[grupo].assign(GRUPO=grupo))
+    if len(picos) > max_grupos:
+        otros = sum(series[g][['CURSOS', 'CUPO']] for g in picos[max_grupos:])
+        resultado.append(otros.assign(FECHA=desdes, GRUPO=f"Otros ({len(picos) - max_grupos})"))
+    return pd.concat(resultado, ignore_index=True)
@@ -0,0 +1,54 @@
+import pandas as pd
+import pyarrow as pa
+from sqlalchemy import text
+
+from src.utils.metricas import registrar_consulta_por_bloques
+
+FILAS_POR_BLOQUE = 5000
+
+# Las columnas de texto quedan en memoria de Arrow (sin un objeto str de Python por celda)
+_TIPOS_PANDAS = {
+    pa.string(): pd.StringDtype("pyarrow"),
+    pa.large_string(): pd.StringDtype("pyarrow"),
+}
+
+
+def _bloque_a_arrow(columnas: list, filas: list, categoricas) -> pa.Table:
+    """Convierte un bloque de filas del cursor en una tabla de Arrow con tipos por columna"""
+    valores = zip(*filas)
+    arrays = []
+    for columna, datos in zip(columnas, valores):
+        array = pa.array(datos)
+        if columna in categoricas and pa.types.is_string(array.type):
+            array = array.dictionary_encode()
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=columnas)
+
+
+def leer_sql_por_bloques(conectable, query, params: dict = None, filas_por_bloque: int = FILAS_POR_BLOQUE,
+                         categoricas=(), fechas=()) -> pd.DataFrame:
+    """Equivalente a `pd.read_sql` que no retiene el resultado completo en el cliente.
+
+    Usa un cursor del lado del servidor (`stream_results`, SSCursor en PyMySQL) y consume
+    las filas de a `filas_por_bloque`, convirtiendo cada bloque a columnas de Arrow tipadas
+    antes de leer el siguiente. Las columnas de `categoricas` se codifican como diccionario
+    (categorías en pandas) y las de `fechas` se convierten con `pd.to_datetime`. En las métricas
+    de consultas se registra al terminar de leer, con las filas y el tiempo de la transferencia.
+    """
+    sentencia = text(query) if isinstance(query, str) else query
+    bloques = []
+    with conectable.connect() as conn:
+        resultado = conn.execution_options(stream_results=True, max_row_buffer=filas_por_bloque).execute(sentencia, params or {})
+        columnas = list(resultado.keys())
+        for filas in resultado.partitions(filas_por_bloque):
+            bloques.append(_bloque_a_arrow(columnas, filas, categoricas))
+        registrar_consulta_por_bloques(conn, sum(bloque.num_rows for bloque in bloques))
+
+    if not bloques:
+        return pd.DataFrame(columns=columnas)
+    # Un bloque con una columna toda nula tiene tipo null; se promueve al tipo de los demás bloques
+    tabla = pa.concat_tables(bloques, promote_options="default").unify_dictionaries()
+    df = tabla.to_pandas(types_mapper=_TIPOS_PANDAS.get)
+    for columna in fechas:
+        df[columna] = pd.to_datetime(df[columna])
+    return df
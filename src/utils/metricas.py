@@ -0,0 +1,175 @@
+import logging
+import re
+import threading
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# Configuración por defecto; se puede sobrescribir desde la sección [db_metricas] de secrets.toml
+CONFIG_METRICAS = {
+    'umbral_lento_ms': 500,      # consultas más lentas que esto se registran en el log y en la lista de lentas
+    'muestras_por_consulta': 1000,  # últimas duraciones que se guardan por consulta para los percentiles
+    'consultas_lentas': 50       # cantidad de consultas lentas recientes que se conservan
+}
+
+PERCENTILES = (50, 95, 99)
+# Clave de conn.info con la consulta leída por bloques que todavía no se registró
+CLAVE_CONSULTA_POR_BLOQUES = 'consulta_por_bloques'
+
+
+def _config_metricas() -> dict:
+    config = dict(CONFIG_METRICAS)
+    try:
+        config.update({k: v for k, v in st.secrets.get("db_metricas", {}).items() if k in CONFIG_METRICAS})
+    except Exception:
+        # Sin secrets.toml o sin sección [db_metricas]: se usan los valores por defecto
+        pass
+    return config
+
+
+def etiqueta_sentencia(sentencia: str) -> str:
+    """Nombre corto para agrupar ejecuciones de la misma consulta: el procedimiento en los CALL, el texto compactado en el resto"""
+    compacta = " ".join(sentencia.split())
+    llamada = re.match(r"CALL\s+(\w+)", compacta, re.IGNORECASE)
+    if llamada:
+        return f"CALL {llamada.group(1)}"
+    return compacta if len(compacta) <= 120 else compacta[:117] + "..."
+
+
+class RegistroMetricas:
+    """Duraciones, filas y errores por consulta, y esperas por conexiones del pool, dentro del proceso"""
+
+    def __init__(self, umbral_lento_ms=500, muestras_por_consulta=1000, consultas_lentas=50):
+        self.umbral_lento_ms = umbral_lento_ms
+        self._muestras_por_consulta = muestras_por_consulta
+        self._lock = threading.Lock()
+        self.lentas = deque(maxlen=consultas_lentas)
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self._duraciones = defaultdict(lambda: deque(maxlen=self._muestras_por_consulta))
+            self._totales = defaultdict(lambda: {'ejecuciones': 0, 'errores': 0, 'filas': 0, 'tiempo_total_ms': 0.0})
+            self._esperas = deque(maxlen=self._muestras_por_consulta)
+            self.lentas.clear()
+            self.desde = pd.Timestamp.now()
+
+    def registrar_consulta(self, sentencia: str, duracion_ms: float, filas: int = None, error: bool = False):
+        etiqueta = etiqueta_sentencia(sentencia)
+        with self._lock:
+            self._duraciones[etiqueta].append(duracion_ms)
+            totales = self._totales[etiqueta]
+            totales['ejecuciones'] += 1
+            totales['errores'] += error
+            totales['filas'] += filas if filas and filas > 0 else 0
+            totales['tiempo_total_ms'] += duracion_ms
+            if duracion_ms >= self.umbral_lento_ms:
+                self.lentas.appendleft({'fecha': pd.Timestamp.now(), 'consulta': etiqueta, 'duracion_ms': round(duracion_ms, 1), 'filas': filas, 'error': error})
+        if duracion_ms >= self.umbral_lento_ms:
+            logger.warning(f"Consulta lenta ({duracion_ms:.0f} ms, {filas} filas): {etiqueta}")
+
+    def registrar_espera(self, espera_ms: float):
+        with self._lock:
+            self._esperas.append(espera_ms)
+
+    def resumen_consultas(self) -> pd.DataFrame:
+        """Una fila por consulta, ordenadas por tiempo total en la base"""
+        with self._lock:
+            filas = []
+            for etiqueta, totales in self._totales.items():
+                percentiles = np.percentile(self._duraciones[etiqueta], PERCENTILES)
+                filas.append({
+                    'consulta': etiqueta,
+                    **totales,
+                    'filas_promedio': round(totales['filas'] / totales['ejecuciones'], 1),
+                    **{f'p{p}_ms': round(v, 1) for p, v in zip(PERCENTILES, percentiles)},
+                    'max_ms': round(max(self._duraciones[etiqueta]), 1)
+                })
+        if not filas:
+            return pd.DataFrame()
+        resumen = pd.DataFrame(filas)
+        resumen['tiempo_total_ms'] = resumen['tiempo_total_ms'].round(1)
+        return resumen.sort_values('tiempo_total_ms', ascending=False, ignore_index=True)
+
+    def consultas_lentas(self) -> pd.DataFrame:
+        """Consultas que superaron el umbral, de la más reciente a la más antigua"""
+        with self._lock:
+            return pd.DataFrame(list(self.lentas))
+
+    def resumen_esperas(self) -> dict:
+        """Percentiles de la espera por una conexión del pool (últimas muestras)"""
+        with self._lock:
+            esperas = list(self._esperas)
+        if not esperas:
+            return {'muestras': 0}
+        return {'muestras': len(esperas), **{f'p{p}_ms': round(v, 2) for p, v in zip(PERCENTILES, np.percentile(esperas, PERCENTILES))}}
+
+
+def filas_informadas(rowcount):
+    """Filas que informó el cursor, o None si no se saben.
+
+    El SSCursor de PyMySQL (stream_results) informa -1 como entero sin signo (2**64 - 1).
+    """
+    if rowcount is None or rowcount < 0 or rowcount >= 2 ** 63:
+        return None
+    return rowcount
+
+
+def instrumentar_engine(engine, registro: RegistroMetricas):
+    """Registra en `registro` la duración, las filas y los errores de cada sentencia que ejecuta el engine.
+
+    La duración va desde que se envía la sentencia hasta que el driver la devuelve; con el
+    cursor por defecto de PyMySQL eso incluye recibir todas las filas, así que el tiempo de
+    armar el DataFrame queda fuera y se puede distinguir del tiempo en la base.
+
+    Con `stream_results` (cursor del lado del servidor) las filas se reciben después, mientras
+    se leen: la consulta queda pendiente en `conn.info` y la registra `registrar_consulta_por_bloques`
+    cuando el lector termina, con las filas reales y el tiempo hasta la última fila.
+    """
+    # Importado al usarse: el registro de métricas también lo leen páginas sin base de datos
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('inicio_consultas', []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _despues(conn, cursor, statement, parameters, context, executemany):
+        inicio = conn.info['inicio_consultas'].pop()
+        if context is not None and context.execution_options.get('stream_results'):
+            conn.info[CLAVE_CONSULTA_POR_BLOQUES] = (registro, statement, inicio)
+            return
+        duracion_ms = 1000 * (time.perf_counter() - inicio)
+        registro.registrar_consulta(statement, duracion_ms, filas_informadas(cursor.rowcount))
+
+    @event.listens_for(engine, "handle_error")
+    def _error(contexto):
+        inicios = contexto.connection.info.get('inicio_consultas') if contexto.connection is not None else None
+        if inicios and contexto.statement:
+            duracion_ms = 1000 * (time.perf_counter() - inicios.pop())
+            registro.registrar_consulta(contexto.statement, duracion_ms, error=True)
+
+    # PoolMedido (src/utils/db.py) informa cuánto se esperó por cada conexión
+    engine.pool.registro = registro
+    return engine
+
+
+def registrar_consulta_por_bloques(conn, filas: int):
+    """Registra la consulta con stream_results de `conn` una vez leída entera: `filas` leídas y tiempo total"""
+    pendiente = conn.info.pop(CLAVE_CONSULTA_POR_BLOQUES, None)
+    if pendiente is None:
+        # Engine sin instrumentar
+        return
+    registro, sentencia, inicio = pendiente
+    registro.registrar_consulta(sentencia, 1000 * (time.perf_counter() - inicio), filas)
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_registro_metricas() -> RegistroMetricas:
+    """Registro único por proceso, compartido por todas las sesiones"""
+    return RegistroMetricas(**_config_metricas())
@@ -0,0 +1,114 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+from src.utils.tiempos import sesion_y_rerun
+
+# Variables de entorno para ajustar el log sin tocar el código
+VARIABLE_LOG_JSON = "CBAMECAPACITA_LOG_JSON"          # "1": una línea JSON por registro
+VARIABLE_LOG_NIVEL = "CBAMECAPACITA_LOG_NIVEL"        # p. ej. DEBUG para ver el tiempo de cada sección
+VARIABLE_LOG_MAX_MB = "CBAMECAPACITA_LOG_MAX_MB"      # tamaño a partir del cual se rota el archivo
+VARIABLE_LOG_COPIAS = "CBAMECAPACITA_LOG_COPIAS"      # archivos rotados que se conservan
+VARIABLE_LOG_ROTAR_CADA = "CBAMECAPACITA_LOG_ROTAR_CADA"  # rotación por tiempo (p. ej. "midnight") en lugar de tamaño
+
+FORMATO_TEXTO = '%(asctime)s - %(levelname)s - %(message)s'
+MAX_MB_POR_DEFECTO = 20
+COPIAS_POR_DEFECTO = 5
+# Campos que agregan FiltroSesion y medir_seccion (extra=...) y se incluyen en el JSON si están
+CAMPOS_EXTRA = ('sesion', 'rerun', 'seccion', 'ms')
+
+_lock = threading.Lock()
+_listener = None
+
+
+class FiltroSesion(logging.Filter):
+    """Agrega la sesión y el rerun de Streamlit al registro, en el hilo que lo emite (ahí está el contexto)"""
+
+    def filter(self, record):
+        record.sesion, record.rerun = sesion_y_rerun()
+        return True
+
+
+class ManejadorCola(logging.handlers.QueueHandler):
+    """Encola el registro sin formatearlo: el formato (texto o JSON) lo aplica el hilo escritor.
+
+    Solo se resuelven en el momento el mensaje y la traza, que dependen de objetos que pueden
+    cambiar o retener memoria después de la llamada.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro, con la sesión y los tiempos de sección si están"""
+
+    def format(self, record):
+        datos = {
+            'fecha': self.formatTime(record),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage()
+        }
+        for campo in CAMPOS_EXTRA:
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                datos[campo] = valor
+        if record.exc_text:
+            datos['excepcion'] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False)
+
+
+def _manejador_archivo(archivo: str) -> logging.Handler:
+    """Archivo con rotación por tiempo si se pidió, si no por tamaño; nunca crece sin límite"""
+    copias = int(os.environ.get(VARIABLE_LOG_COPIAS, COPIAS_POR_DEFECTO))
+    rotar_cada = os.environ.get(VARIABLE_LOG_ROTAR_CADA)
+    if rotar_cada:
+        return logging.handlers.TimedRotatingFileHandler(archivo, when=rotar_cada, backupCount=copias, encoding='utf-8')
+    max_bytes = int(float(os.environ.get(VARIABLE_LOG_MAX_MB, MAX_MB_POR_DEFECTO)) * 1024 * 1024)
+    return logging.handlers.RotatingFileHandler(archivo, maxBytes=max_bytes, backupCount=copias, encoding='utf-8')
+
+
+def configurar_logging(archivo: str, nivel=None, formato_json: bool = None):
+    """Log en consola y en `archivo` escrito por un hilo aparte; se configura una vez por proceso.
+
+    Los loggers solo encolan el registro (QueueHandler): la escritura en disco, la rotación y el
+    formateo los hace un QueueListener, así una sesión nunca espera al disco para seguir con el
+    rerun. Se puede llamar en cada rerun: las llamadas siguientes no hacen nada.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        nivel = nivel or os.environ.get(VARIABLE_LOG_NIVEL, 'INFO').upper()
+        if formato_json is None:
+            formato_json = os.environ.get(VARIABLE_LOG_JSON, '') == '1'
+        formato = FormatoJSON() if formato_json else logging.Formatter(FORMATO_TEXTO)
+
+        manejadores = [logging.StreamHandler(sys.stdout), _manejador_archivo(archivo)]
+        for manejador in manejadores:
+            manejador.setFormatter(formato)
+
+        cola = queue.Queue(-1)
+        manejador_cola = ManejadorCola(cola)
+        manejador_cola.addFilter(FiltroSesion())
+        raiz = logging.getLogger()
+        raiz.setLevel(nivel)
+        raiz.addHandler(manejador_cola)
+
+        _listener = logging.handlers.QueueListener(cola, *manejadores, respect_handler_level=True)
+        _listener.start()
+        # Al salir se vacía la cola antes de cerrar los archivos
+        atexit.register(_listener.stop)
@@ -0,0 +1,86 @@
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+COLUMNAS_SUGERENCIAS = [
+    'ID_CURSO', 'N_CURSO', 'N_SECTOR', 'ID_CERTIFICACION', 'N_CERTIFICACION', 'N_SECTOR_CERTIFICACION', 'SIMILITUD'
+]
+
+
+def _normalizar_sector(sector) -> str:
+    """Sector en minúsculas y sin acentos, para comparar los de cursos históricos con los de certificaciones"""
+    texto = unicodedata.normalize('NFKD', str(sector or '')).encode('ascii', 'ignore').decode('ascii')
+    return texto.strip().lower()
+
+
+@st.cache_data(show_spinner="Calculando sugerencias...")
+def calcular_sugerencias(df_historico: pd.DataFrame, df_certificaciones: pd.DataFrame, k: int = 5,
+                         bonificacion_sector: float = 0.1, filas_por_lote: int = 2000) -> pd.DataFrame:
+    """Para cada curso histórico, las `k` certificaciones con nombre más parecido.
+
+    Los nombres se vectorizan con TF-IDF de n-gramas de caracteres (3 a 4) y la similitud
+    coseno se obtiene con productos de matrices dispersas, por lotes de `filas_por_lote`
+    cursos para acotar la memoria. Si el sector del curso coincide con el de la
+    certificación se suma `bonificacion_sector`, solo a pares con algún parecido de nombre:
+    los pares con similitud de texto 0 nunca son sugerencias. Se cachea por contenido de los DataFrames,
+    es decir, una vez por versión de los datos de referencia.
+    """
+    historico = df_historico.drop_duplicates(subset=['ID_CURSO']).reset_index(drop=True)
+    certificaciones = df_certificaciones.reset_index(drop=True)
+    if historico.empty or certificaciones.empty:
+        return pd.DataFrame(columns=COLUMNAS_SUGERENCIAS)
+
+    # scikit-learn tarda cerca de un segundo en importarse: se carga recién cuando hay que calcular
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizador = TfidfVectorizer(analyzer='char_wb', ngram_range=(3, 4), strip_accents='unicode', lowercase=True, sublinear_tf=True)
+    vectorizador.fit(pd.concat([historico['N_CURSO'], certificaciones['N_CERTIFICACION']]).fillna(''))
+    # TfidfVectorizer normaliza cada fila (L2), así que el producto punto es la similitud coseno
+    matriz_cursos = vectorizador.transform(historico['N_CURSO'].fillna(''))
+    matriz_certificaciones_t = vectorizador.transform(certificaciones['N_CERTIFICACION'].fillna('')).T.tocsr()
+
+    # Sectores de ambos lados codificados con los mismos enteros (-1 = sin sector)
+    codigos, _ = pd.factorize(pd.concat([
+        historico['N_SECTOR'].map(_normalizar_sector),
+        certificaciones['N_SECTOR'].map(_normalizar_sector)
+    ]).replace('', np.nan))
+    sector_cursos, sector_certificaciones = codigos[:len(historico)], codigos[len(historico):]
+
+    k = min(k, len(certificaciones))
+    filas, columnas, puntajes = [], [], []
+    for inicio in range(0, len(historico), filas_por_lote):
+        fin = min(inicio + filas_por_lote, len(historico))
+        similitud_texto = (matriz_cursos[inicio:fin] @ matriz_certificaciones_t).toarray()
+        mismo_sector = (sector_cursos[inicio:fin, None] == sector_certificaciones[None, :]) & (sector_cursos[inicio:fin, None] >= 0)
+        similitud = similitud_texto + bonificacion_sector * (mismo_sector & (similitud_texto > 0))
+
+        # Las k mayores de cada fila sin ordenar la fila completa; se descartan las que no se parecen en nada
+        mejores = np.argpartition(-similitud, k - 1, axis=1)[:, :k]
+        con_parecido = (np.take_along_axis(similitud_texto, mejores, axis=1) > 0).ravel()
+        filas.append(np.repeat(np.arange(inicio, fin), k)[con_parecido])
+        columnas.append(mejores.ravel()[con_parecido])
+        puntajes.append(np.take_along_axis(similitud, mejores, axis=1).ravel()[con_parecido])
+
+    filas, columnas, puntajes = np.concatenate(filas), np.concatenate(columnas), np.concatenate(puntajes)
+    sugerencias = pd.DataFrame({
+        'ID_CURSO': historico['ID_CURSO'].to_numpy()[filas],
+        'N_CURSO': historico['N_CURSO'].to_numpy()[filas],
+        'N_SECTOR': historico['N_SECTOR'].to_numpy()[filas],
+        'ID_CERTIFICACION': certificaciones['ID_CERTIFICACION'].to_numpy()[columnas],
+        'N_CERTIFICACION': certificaciones['N_CERTIFICACION'].to_numpy()[columnas],
+        'N_SECTOR_CERTIFICACION': certificaciones['N_SECTOR'].to_numpy()[columnas],
+        'SIMILITUD': np.round(puntajes, 3)
+    })
+    sugerencias = sugerencias[sugerencias['SIMILITUD'] > 0]
+    return sugerencias.sort_values(['SIMILITUD', 'ID_CURSO'], ascending=[False, True], ignore_index=True)
+
+
+def excluir_pares_existentes(sugerencias: pd.DataFrame, pares_existentes: set) -> pd.DataFrame:
+    """Quita las sugerencias cuyo par (ID_CURSO, ID_CERTIFICACION) ya es una equivalencia activa"""
+    if not pares_existentes or sugerencias.empty:
+        return sugerencias
+    existentes = pd.MultiIndex.from_tuples(list(pares_existentes))
+    pares = pd.MultiIndex.from_arrays([sugerencias['ID_CURSO'], sugerencias['ID_CERTIFICACION']])
+    return sugerencias[~pares.isin(existentes)]
@@ -0,0 +1,71 @@
+import numpy as np
+import streamlit as st
+import pandas as pd
+
+SIN_ORDEN = "(sin orden)"
+
+
+def filtrar_por_texto(df: pd.DataFrame, columnas: list, texto: str) -> pd.Series:
+    """Máscara de filas donde alguna de las columnas contiene el texto (sin distinguir mayúsculas)"""
+    mascara = pd.Series(False, index=df.index)
+    for columna in columnas:
+        mascara |= df[columna].astype(str).str.contains(texto, case=False, na=False, regex=False)
+    return mascara
+
+
+def mostrar_tabla_por_paginas(df: pd.DataFrame, key: str, filas_por_pagina: int = 25, columnas: list = None,
+                              columnas_busqueda: list = None, ordenable: bool = True, filas=None, **kwargs):
+    """Muestra solo la página actual del DataFrame; el resto de las filas no se envía al navegador.
+
+    La búsqueda (sobre `columnas_busqueda`) y el orden se resuelven en el servidor sobre
+    posiciones de filas, y recién la página visible se materializa con las `columnas` pedidas.
+    Con `filas` (posiciones para iloc, p. ej. las que dejó un filtro) se muestran solo esas, sin
+    que el llamador tenga que copiar el subconjunto. Los `kwargs` se pasan a `st.dataframe`
+    (p. ej. `hide_index`, `column_config`).
+    """
+    columnas = list(df.columns) if columnas is None else columnas
+    posiciones = np.arange(len(df)) if filas is None else np.asarray(filas)
+
+    if columnas_busqueda or ordenable:
+        col1, col2, col3 = st.columns([3, 2, 1])
+        if columnas_busqueda:
+            with col1:
+                busqueda = st.text_input("🔍 Buscar en la tabla", placeholder="Escriba para filtrar...", key=f"{key}_busqueda")
+            if busqueda:
+                # Solo se leen las columnas de búsqueda de las filas vigentes
+                posiciones = posiciones[filtrar_por_texto(df[columnas_busqueda].iloc[posiciones], columnas_busqueda, busqueda).to_numpy()]
+        if ordenable:
+            with col2:
+                orden = st.selectbox("Ordenar por", [SIN_ORDEN] + columnas, key=f"{key}_orden")
+            with col3:
+                descendente = st.toggle("Descendente", key=f"{key}_descendente")
+
+    total_registros = len(posiciones)
+    if total_registros == 0:
+        st.info("No hay registros para mostrar")
+        return
+
+    # Posiciones de las filas en el orden pedido; la tabla completa nunca se reordena ni se copia
+    if ordenable and orden != SIN_ORDEN:
+        posiciones = posiciones[
+            df[orden].iloc[posiciones].reset_index(drop=True)
+            .sort_values(ascending=not descendente, na_position='last', kind='stable')
+            .index.to_numpy()
+        ]
+
+    total_paginas = (total_registros + filas_por_pagina - 1) // filas_por_pagina
+    clave_pagina = f"{key}_pagina"
+    # Si la búsqueda achica la tabla, la página guardada puede quedar fuera de rango
+    st.session_state[clave_pagina] = min(st.session_state.get(clave_pagina, 1), total_paginas)
+    pagina = st.number_input(
+        f"Página (de {total_paginas})",
+        min_value=1,
+        max_value=total_paginas,
+        step=1,
+        key=clave_pagina
+    )
+
+    inicio = (pagina - 1) * filas_por_pagina
+    fin = min(inicio + filas_por_pagina, total_registros)
+    st.dataframe(df.iloc[posiciones[inicio:fin]][columnas], use_container_width=True, **kwargs)
+    st.caption(f"Mostrando registros {inicio + 1} a {fin} de {total_registros}")
@@ -0,0 +1,136 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict, deque
+from contextlib import ContextDecorator
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Límites (en segundos) de los buckets del histograma, como en los histogramas de Prometheus
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PERCENTILES = (50, 95, 99)
+MUESTRAS_POR_SECCION = 1000
+MEDICIONES_RECIENTES = 500
+
+logger = logging.getLogger(__name__)
+
+
+def sesion_y_rerun():
+    """ID de la sesión de Streamlit y número de rerun de esa sesión (ver iniciar_rerun)"""
+    # Sin aviso: fuera de un rerun (hilo escritor del log, benchmarks) es normal no tener contexto
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None, None
+    return ctx.session_id, st.session_state.get('_id_rerun', 0)
+
+
+class RegistroTiempos:
+    """Duración de cada sección de los reruns, agregada en el proceso para todas las sesiones"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self._muestras = defaultdict(lambda: deque(maxlen=MUESTRAS_POR_SECCION))
+            self._buckets = defaultdict(lambda: [0] * (len(BUCKETS_SEGUNDOS) + 1))
+            self._cantidad = defaultdict(int)
+            self._suma = defaultdict(float)
+            self._errores = defaultdict(int)
+            self._recientes = deque(maxlen=MEDICIONES_RECIENTES)
+            self.desde = pd.Timestamp.now()
+
+    def registrar(self, seccion: str, segundos: float, error: bool = False):
+        sesion, rerun = sesion_y_rerun()
+        with self._lock:
+            self._muestras[seccion].append(segundos)
+            self._buckets[seccion][bisect_left(BUCKETS_SEGUNDOS, segundos)] += 1
+            self._cantidad[seccion] += 1
+            self._suma[seccion] += segundos
+            self._errores[seccion] += error
+            self._recientes.append({
+                'fecha': pd.Timestamp.now(), 'sesion': sesion, 'rerun': rerun,
+                'seccion': seccion, 'ms': round(1000 * segundos, 2), 'error': error
+            })
+
+    def resumen(self) -> pd.DataFrame:
+        """Una fila por sección con cantidad, errores y percentiles en ms, ordenadas por tiempo total"""
+        with self._lock:
+            filas = [{
+                'seccion': seccion,
+                'cantidad': self._cantidad[seccion],
+                'errores': self._errores[seccion],
+                'total_s': round(self._suma[seccion], 3),
+                **{f'p{p}_ms': round(1000 * v, 2) for p, v in zip(PERCENTILES, np.percentile(muestras, PERCENTILES))},
+                'max_ms': round(1000 * max(muestras), 2)
+            } for seccion, muestras in self._muestras.items()]
+        if not filas:
+            return pd.DataFrame()
+        return pd.DataFrame(filas).sort_values('total_s', ascending=False, ignore_index=True)
+
+    def recientes(self, sesion=None) -> pd.DataFrame:
+        """Últimas mediciones, opcionalmente solo las de una sesión"""
+        with self._lock:
+            recientes = [m for m in self._recientes if sesion is None or m['sesion'] == sesion]
+        return pd.DataFrame(recientes)
+
+    def exportar_json(self) -> str:
+        resumen = self.resumen()
+        return json.dumps({
+            'desde': self.desde.isoformat(),
+            'secciones': resumen.to_dict('records')
+        }, ensure_ascii=False, indent=2)
+
+    def exportar_prometheus(self, prefijo: str = 'cbamecapacita_seccion_duracion_segundos') -> str:
+        """Histogramas en el formato de texto de Prometheus"""
+        lineas = [f"# HELP {prefijo} Duración de las secciones de los reruns de Streamlit", f"# TYPE {prefijo} histogram"]
+        with self._lock:
+            for seccion in sorted(self._cantidad):
+                etiqueta = seccion.replace('\\', '\\\\').replace('"', '\\"')
+                acumulado = 0
+                for limite, cantidad in zip(BUCKETS_SEGUNDOS + ('+Inf',), self._buckets[seccion]):
+                    acumulado += cantidad
+                    lineas.append(f'{prefijo}_bucket{{seccion="{etiqueta}",le="{limite}"}} {acumulado}')
+                lineas.append(f'{prefijo}_sum{{seccion="{etiqueta}"}} {self._suma[seccion]:.6f}')
+                lineas.append(f'{prefijo}_count{{seccion="{etiqueta}"}} {self._cantidad[seccion]}')
+        return "\n".join(lineas) + "\n"
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_registro_tiempos() -> RegistroTiempos:
+    """Registro único por proceso, compartido por todas las sesiones"""
+    return RegistroTiempos()
+
+
+def iniciar_rerun():
+    """Numera los reruns de la sesión; se llama una vez al principio del script"""
+    st.session_state['_id_rerun'] = st.session_state.get('_id_rerun', 0) + 1
+
+
+class medir_seccion(ContextDecorator):
+    """Mide una sección del rerun; se usa como `with medir_seccion("nombre"):` o como decorador"""
+
+    def __init__(self, seccion: str):
+        self.seccion = seccion
+
+    def _recreate_cm(self):
+        # Como decorador, cada llamada usa su propia instancia: varias sesiones pueden estar midiendo a la vez
+        return type(self)(self.seccion)
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        # Las excepciones de control de Streamlit (st.rerun, st.stop) también cierran la sección
+        segundos = time.perf_counter() - self._inicio
+        obtener_registro_tiempos().registrar(self.seccion, segundos, error=tipo is not None and issubclass(tipo, Exception))
+        # En DEBUG cada sección queda también en el log (con campos propios en el formato JSON)
+        logger.debug("Sección %s: %.1f ms", self.seccion, 1000 * segundos, extra={'seccion': self.seccion, 'ms': round(1000 * segundos, 2)})
+        return False
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from src.utils.cruce import emparejar_por_curso
+
+
+def pares(izquierda, derecha):
+    pos_izquierda, pos_derecha = emparejar_por_curso(pd.Series(izquierda, dtype=object), pd.Series(derecha, dtype=object))
+    return sorted(zip(pos_izquierda.tolist(), pos_derecha.tolist()))
+
+
+def test_claves_nulas_a_la_derecha_no_desplazan_los_grupos():
+    assert pares(['A', 'B'], [None, 'A', 'B']) == [(0, 1), (1, 2)]
+
+
+def test_claves_nulas_en_ambos_lados_no_se_emparejan():
+    assert pares([None, 'A', None], ['A', None, 'A', None]) == [(1, 0), (1, 2)]
+
+
+def test_coincide_con_merge_de_pandas():
+    rng = np.random.default_rng(0)
+    opciones = np.array(['A', 'B', 'C', 'D', None], dtype=object)
+    izquierda, derecha = opciones[rng.integers(0, 5, 200)], opciones[rng.integers(0, 5, 300)]
+
+    esperado = pd.merge(
+        pd.DataFrame({'clave': izquierda, 'i': np.arange(200)}).dropna(),
+        pd.DataFrame({'clave': derecha, 'd': np.arange(300)}).dropna(),
+        on='clave'
+    )
+    assert pares(izquierda, derecha) == sorted(zip(esperado['i'].tolist(), esperado['d'].tolist()))
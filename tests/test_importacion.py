@@ -0,0 +1,28 @@
+"""Controla el arranque en frío: importar las páginas no supera el presupuesto, no carga dependencias pesadas ni crea archivos.
+
+Cada importación corre en un proceso nuevo (ver benchmarks/importacion.py). Se compara el
+mínimo de varias corridas, no la mediana: en un runner compartido el ruido solo suma tiempo, y
+una dependencia pesada que vuelva a importarse al inicio lo sube en todas. El presupuesto se
+puede ajustar en máquinas lentas con CBAMECAPACITA_PRESUPUESTO_IMPORTACION_MS.
+"""
+import os
+import pytest
+
+from benchmarks.importacion import PRESUPUESTO_MS, PROHIBIDOS, medir_importacion, tiempo_importacion_ms
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPETICIONES = 5
+PRESUPUESTO = float(os.environ.get("CBAMECAPACITA_PRESUPUESTO_IMPORTACION_MS", PRESUPUESTO_MS))
+
+
+@pytest.mark.parametrize("modulo", ["app", "cursos"])
+def test_importacion_en_frio(modulo, tmp_path):
+    corridas = [medir_importacion(modulo, RAIZ, str(tmp_path)) for _ in range(REPETICIONES)]
+    # Importar no tiene efectos: ni el archivo de log ni ningún otro se crean hasta ejecutar la página
+    assert list(tmp_path.iterdir()) == []
+
+    importados = {nombre for nombre, _, _ in corridas[-1]}
+    assert [prohibido for prohibido in PROHIBIDOS if prohibido in importados] == []
+
+    minimo_ms = min(tiempo_importacion_ms(corrida, modulo) for corrida in corridas)
+    assert minimo_ms <= PRESUPUESTO, f"{modulo} tarda {minimo_ms:.0f} ms en importarse (presupuesto {PRESUPUESTO:.0f} ms)"
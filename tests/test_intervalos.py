@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.intervalos import IndiceIntervalos
+
+
+@pytest.fixture
+def cursos():
+    """Intervalos al azar más los casos borde: sin fin (abiertos), sin inicio (NaT) e invertidos"""
+    rng = np.random.default_rng(0)
+    inicios = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 365, 300), 'D')
+    fines = inicios + pd.to_timedelta(rng.integers(-20, 120, 300), 'D')
+    inicios = pd.Series(inicios)
+    fines = pd.Series(fines)
+    fines[rng.random(300) < 0.1] = pd.NaT
+    inicios[rng.random(300) < 0.05] = pd.NaT
+    return inicios, fines, rng.integers(1, 30, 300)
+
+
+def fuerza_bruta(inicios, fines, pesos, desde, hasta):
+    """Filas activas en [desde, hasta] recorriendo todas: con inicio, sin invertir, y fin abierto o >= desde"""
+    fin = fines.fillna(pd.Timestamp.max)
+    activas = inicios.notna() & (fin >= inicios) & (inicios <= hasta) & (fin >= desde)
+    return int(activas.sum()), float(pesos[activas.to_numpy()].sum()), np.flatnonzero(activas.to_numpy())
+
+
+def test_intervalos_invertidos_no_rompen_el_indice():
+    indice = IndiceIntervalos(pd.to_datetime(['2024-03-10', '2024-01-01']), pd.to_datetime(['2024-03-01', '2024-02-01']), [10, 20])
+    assert indice.contar_activos('2024-01-15') == 1
+    assert indice.sumar_activos('2024-01-15') == 20
+    assert indice.activos_en('2024-03-05').tolist() == []
+
+
+def test_coincide_con_fuerza_bruta(cursos):
+    inicios, fines, pesos = cursos
+    indice = IndiceIntervalos(inicios, fines, pesos)
+    for desde in pd.date_range('2022-12-01', '2024-06-01', freq='17D'):
+        for dias in (0, 7, 45):
+            hasta = desde + pd.Timedelta(days=dias)
+            cantidad, suma, _ = fuerza_bruta(inicios, fines, pesos, desde, hasta)
+            assert indice.contar_activos(desde, hasta) == cantidad
+            assert indice.sumar_activos(desde, hasta) == suma
+
+
+def test_activos_en_coincide_con_fuerza_bruta(cursos):
+    inicios, fines, pesos = cursos
+    indice = IndiceIntervalos(inicios, fines, pesos)
+    for fecha in pd.date_range('2022-12-01', '2024-06-01', freq='11D'):
+        assert indice.activos_en(fecha).tolist() == fuerza_bruta(inicios, fines, pesos, fecha, fecha)[2].tolist()
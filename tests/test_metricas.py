@@ -0,0 +1,39 @@
+from sqlalchemy import create_engine, text
+
+from src.utils.lectura import leer_sql_por_bloques
+from src.utils.metricas import RegistroMetricas, filas_informadas, instrumentar_engine
+
+
+def engine_instrumentado(filas):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER, nombre TEXT)"))
+        conn.execute(text("INSERT INTO t VALUES (:id, :nombre)"), [{'id': i, 'nombre': f"n{i}"} for i in range(filas)])
+    registro = RegistroMetricas()
+    return instrumentar_engine(engine, registro), registro
+
+
+def test_rowcount_desconocido_no_cuenta_filas():
+    # SSCursor de PyMySQL: -1 como entero sin signo
+    assert filas_informadas(2 ** 64 - 1) is None
+    assert filas_informadas(-1) is None
+    assert filas_informadas(None) is None
+    assert filas_informadas(12) == 12
+
+
+def test_lectura_por_bloques_registra_filas_leidas_una_vez():
+    engine, registro = engine_instrumentado(1234)
+    df = leer_sql_por_bloques(engine, "SELECT id, nombre FROM t", filas_por_bloque=100)
+    assert len(df) == 1234
+
+    fila = registro.resumen_consultas().set_index('consulta').loc["SELECT id, nombre FROM t"]
+    assert fila['ejecuciones'] == 1
+    assert fila['filas'] == 1234
+
+
+def test_consulta_sin_bloques_usa_el_rowcount():
+    engine, registro = engine_instrumentado(10)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE t SET nombre = 'x' WHERE id < 4"))
+    resumen = registro.resumen_consultas().set_index('consulta')
+    assert resumen.loc["UPDATE t SET nombre = 'x' WHERE id < 4", 'filas'] == 4
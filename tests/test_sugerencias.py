@@ -0,0 +1,49 @@
+import pandas as pd
+
+from src.utils.sugerencias import calcular_sugerencias, excluir_pares_existentes
+
+
+def historico(*filas):
+    return pd.DataFrame(filas, columns=['ID_CURSO', 'N_CURSO', 'N_SECTOR'])
+
+
+def certificaciones(*filas):
+    return pd.DataFrame(filas, columns=['ID_CERTIFICACION', 'N_CERTIFICACION', 'N_SECTOR'])
+
+
+def test_mismo_sector_sin_parecido_de_nombre_no_es_sugerencia():
+    sugerencias = calcular_sugerencias(
+        historico((1, 'Soldadura Básica', 'Industria')),
+        certificaciones((10, 'Xyzw Qvjk', 'Industria'), (20, 'Soldador Básico', 'Construcción'))
+    )
+    assert sugerencias['ID_CERTIFICACION'].tolist() == [20]
+    assert (sugerencias['SIMILITUD'] > 0).all()
+
+
+def test_ordena_por_parecido_y_el_sector_desempata():
+    sugerencias = calcular_sugerencias(
+        historico((1, 'Programación Web', 'Tecnología')),
+        certificaciones(
+            (10, 'Programación Web Inicial', 'Tecnología'),
+            (20, 'Programación Web Inicial', 'Gastronomía'),
+            (30, 'Cocina Regional', 'Gastronomía'),
+            (40, 'Programación', 'tecnologia')
+        ),
+        k=4
+    )
+    assert sugerencias['ID_CERTIFICACION'].tolist() == [40, 10, 20, 30]
+    # Mismo nombre: la única diferencia es la bonificación por sector (comparado sin acentos ni mayúsculas)
+    por_id = sugerencias.set_index('ID_CERTIFICACION')['SIMILITUD']
+    assert round(por_id[10] - por_id[20], 3) == 0.1
+
+
+def test_a_lo_sumo_k_por_curso_y_sin_pares_existentes():
+    sugerencias = calcular_sugerencias(
+        historico((1, 'Electricidad Domiciliaria', 'Energía'), (2, 'Electricidad Industrial', 'Energía')),
+        certificaciones(*[(i, f'Electricista Nivel {i}', 'Energía') for i in range(10, 16)]),
+        k=2
+    )
+    assert sugerencias.groupby('ID_CURSO').size().tolist() == [2, 2]
+    pares = {(1, sugerencias.loc[sugerencias['ID_CURSO'] == 1, 'ID_CERTIFICACION'].iloc[0])}
+    restantes = excluir_pares_existentes(sugerencias, pares)
+    assert len(restantes) == 3 and not any((fila.ID_CURSO, fila.ID_CERTIFICACION) in pares for fila in restantes.itertuples())